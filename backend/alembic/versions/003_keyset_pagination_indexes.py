@@ -0,0 +1,43 @@
+"""keyset pagination indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+
+# (name, table, columns) matching the (timestamp, id) keyset of each listing
+INDEXES = [
+    ('ix_security_events_org_timestamp', 'security_events', 'organization_id, timestamp DESC, id DESC'),
+    ('ix_security_events_agent_timestamp', 'security_events', 'agent_id, timestamp DESC, id DESC'),
+    ('ix_agents_org_created', 'agents', 'organization_id, created_at, id'),
+    ('ix_organizations_created', 'organizations', 'created_at, id')
+]
+
+def upgrade():
+    # Copy each event's organization so listings filter on it without a join
+    op.add_column(
+        'security_events',
+        sa.Column('organization_id', sa.String(36), sa.ForeignKey('organizations.id'))
+    )
+    op.execute("""
+        UPDATE security_events
+        SET organization_id = agents.organization_id
+        FROM agents
+        WHERE agents.id = security_events.agent_id
+    """)
+
+    # CONCURRENTLY keeps large tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})')
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    op.drop_column('security_events', 'organization_id')
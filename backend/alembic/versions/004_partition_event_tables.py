@@ -0,0 +1,76 @@
+"""partition security_events and threat_events by time
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 13:00:00.000000
+"""
+from datetime import timedelta
+from alembic import op
+from app.core.config import settings
+from app.db.partitioning import create_partitions, maintain
+
+revision = '004'
+down_revision = '003'
+
+# Indexes are recreated on the partitioned parents, which cascade them to every partition
+INDEXES = {
+    'security_events': [
+        ('ix_security_events_org_timestamp', 'organization_id, timestamp DESC, id DESC'),
+        ('ix_security_events_agent_timestamp', 'agent_id, timestamp DESC, id DESC')
+    ],
+    'threat_events': [
+        ('ix_threat_events_org_timestamp', 'organization_id, timestamp DESC, id DESC')
+    ]
+}
+
+# LIKE does not copy foreign keys
+FOREIGN_KEYS = {
+    'security_events': [
+        ('agent_id', 'agents(id)'),
+        ('organization_id', 'organizations(id)')
+    ],
+    'threat_events': []
+}
+
+def _swap(table, partitioned):
+    """Rebuild ``table`` (partitioned or plain) and copy its rows across"""
+    bind = op.get_bind()
+    legacy = f'{table}_legacy'
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {table}_pkey')
+    for name, _ in INDEXES[table]:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    if partitioned:
+        # The partition key has to be part of the primary key
+        op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN timestamp SET NOT NULL')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp)')
+        op.execute(f"UPDATE {legacy} SET timestamp = now() AT TIME ZONE 'utc' WHERE timestamp IS NULL")
+        oldest, newest = bind.exec_driver_sql(f'SELECT min(timestamp), max(timestamp) FROM {legacy}').one()
+        if oldest is not None:
+            create_partitions(
+                bind, table, oldest, newest + timedelta(microseconds=1), settings.PARTITION_INTERVAL
+            )
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+
+    for name, columns in INDEXES[table]:
+        op.execute(f'CREATE INDEX {name} ON {table} ({columns})')
+    for column, target in FOREIGN_KEYS[table]:
+        op.execute(f'ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {target}')
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    op.execute(f'DROP TABLE {legacy}')
+
+def upgrade():
+    for table in INDEXES:
+        _swap(table, partitioned=True)
+    # Partitions ahead of today, and retention applied to what was copied
+    maintain(op.get_bind())
+
+def downgrade():
+    for table in INDEXES:
+        _swap(table, partitioned=False)
+    # Added by this revision; 003's indexes stay
+    op.execute('DROP INDEX IF EXISTS ix_threat_events_org_timestamp')
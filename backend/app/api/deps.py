@@ -1,65 +1,94 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Any, AsyncGenerator, Dict, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_db, get_async_db
+from app.db.session import AsyncSessionLocal, get_async_db
 from app.core import security
-from app.models.user import User
+from app.core.principal import Principal, principal_cache
+from app.core.response_cache import ALL_ORGANIZATIONS
 from app.services.user import user_service
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-# Sync database dependency
-def get_db_sync() -> Generator:
-    try:
-        db = next(get_db())
-        yield db
-    finally:
-        db.close()
-
-# Async database dependency
-async def get_db_async() -> AsyncSession:
+# Async database dependency; every request handler uses this session
+async def get_db_async() -> AsyncGenerator[AsyncSession, None]:
     async for session in get_async_db():
         yield session
 
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Claims of a validly signed, unexpired token with a subject, else None"""
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+    return payload if payload.get("sub") is not None else None
+
+def cache_scope(principal: Principal) -> str:
+    """Response cache scope of what the principal may see"""
+    return ALL_ORGANIZATIONS if principal.is_superuser else str(principal.organization_id)
+
+async def authenticate_cache_scope(request: Request) -> Optional[str]:
+    """Cache scope of the request's bearer token, or None unless it belongs to an active user.
+
+    Used by the response cache before any handler runs, so a principal that
+    has to be loaded gets its own short-lived session.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    if payload is None:
+        return None
+
+    async def load():
+        async with AsyncSessionLocal() as db:
+            return await user_service.get(db, id=payload["sub"])
+
+    user = await principal_cache.resolve(payload, load)
+    if user is None or not user.is_active:
+        return None
+    return cache_scope(user)
+
 async def get_current_user(
-    db: Session = Depends(get_db_sync),
+    request: Request,
+    db: AsyncSession = Depends(get_db_async),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id: Optional[int] = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
+    user_id: str = payload["sub"]
         
-    user = user_service.get(db, id=user_id)
+    # The session only connects if the principal has to be loaded
+    user = await principal_cache.resolve(
+        payload, lambda: user_service.get(db, id=user_id)
+    )
     if user is None:
         raise credentials_exception
+    # Scopes cached responses and the writes that invalidate them
+    request.state.cache_scope = cache_scope(user)
     return user
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
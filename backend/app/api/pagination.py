@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, literal, tuple_
+
+# Response header holding the ``after`` value of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page: its sort timestamp and id"""
+    timestamp: datetime
+    id: str
+
+    @classmethod
+    def parse(cls, value: str) -> "Cursor":
+        timestamp, _, id = value.partition(",")
+        if not id:
+            raise ValueError("cursor must be '<timestamp>,<id>'")
+        return cls(datetime.fromisoformat(timestamp), id)
+
+    def __str__(self) -> str:
+        return f"{self.timestamp.isoformat()},{self.id}"
+
+def cursor_param(
+    after: Optional[str] = Query(None, description="X-Next-Cursor of the previous page")
+) -> Optional[Cursor]:
+    if after is None:
+        return None
+    try:
+        return Cursor.parse(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def keyset_page(
+    query: Select,
+    timestamp_column: Any,
+    id_column: Any,
+    after: Optional[Cursor],
+    limit: int,
+    descending: bool = False
+) -> Select:
+    """Order by (timestamp, id) and start after ``after`` instead of an OFFSET.
+
+    The row-value comparison is answered from a (timestamp, id) index, so
+    every page costs the same however deep it is.
+    """
+    key = tuple_(timestamp_column, id_column)
+    if after is not None:
+        bound = tuple_(literal(after.timestamp), literal(after.id))
+        query = query.where(key < bound if descending else key > bound)
+    if descending:
+        query = query.order_by(timestamp_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(timestamp_column, id_column)
+    return query.limit(limit)
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, timestamp_attr: str) -> None:
+    """Point the client at the next page if this one was full"""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = str(Cursor(getattr(last, timestamp_attr), str(last.id)))
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
-from .endpoints import auth, agents, organizations, users
+from .endpoints import auth, agents, events, organizations, users, rules
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(organizations.router, prefix="/organizations", tags=["organizations"])
-api_router.include_router(users.router, prefix="/users", tags=["users"]) 
\ No newline at end of file
+api_router.include_router(users.router, prefix="/users", tags=["users"]) 
+api_router.include_router(rules.router, prefix="/rules", tags=["rules"])
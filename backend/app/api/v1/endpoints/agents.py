@@ -1,9 +1,11 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
 
 from app.api import deps
+from app.api.pagination import Cursor, cursor_param, keyset_page, set_next_cursor
 from app import schemas
 from app.models.agent import Agent
 from app.core.config import settings
@@ -13,7 +15,7 @@ router = APIRouter()
 @router.post("/register", response_model=schemas.Agent)
 async def register_agent(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     agent_in: schemas.AgentCreate,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -34,41 +36,39 @@ async def register_agent(
         api_key=secrets.token_urlsafe(32)
     )
     db.add(agent)
-    db.commit()
-    db.refresh(agent)
+    await db.commit()
+    await db.refresh(agent)
     return agent
 
 @router.get("/", response_model=List[schemas.Agent])
 async def get_agents(
-    db: Session = Depends(deps.get_db_sync),
+    response: Response,
+    db: AsyncSession = Depends(deps.get_db_async),
+    after: Optional[Cursor] = Depends(cursor_param),
     skip: int = 0,
     limit: int = 100,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Retrieve agents"""
-    # If user is superuser, return all agents
-    if current_user.is_superuser:
-        agents = db.query(Agent).offset(skip).limit(limit).all()
-    else:
-        # Otherwise, return only agents from user's organization
-        agents = (
-            db.query(Agent)
-            .filter(Agent.organization_id == current_user.organization_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+    """Retrieve agents, oldest first; page with ``after`` (the X-Next-Cursor header)"""
+    # Superusers see all agents, others only their organization's
+    query = select(Agent)
+    if not current_user.is_superuser:
+        query = query.where(Agent.organization_id == current_user.organization_id)
+    query = keyset_page(query, Agent.created_at, Agent.id, after, limit)
+    result = await db.execute(query.offset(skip))
+    agents = result.scalars().all()
+    set_next_cursor(response, agents, limit, "created_at")
     return agents
 
 @router.get("/{agent_id}", response_model=schemas.Agent)
 async def get_agent(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     agent_id: int,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
     """Get agent by ID"""
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = await db.get(Agent, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
@@ -80,13 +80,13 @@ async def get_agent(
 @router.put("/{agent_id}", response_model=schemas.Agent)
 async def update_agent(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     agent_id: int,
     agent_in: schemas.AgentUpdate,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
     """Update agent"""
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = await db.get(Agent, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
@@ -99,19 +99,19 @@ async def update_agent(
         setattr(agent, field, value)
     
     db.add(agent)
-    db.commit()
-    db.refresh(agent)
+    await db.commit()
+    await db.refresh(agent)
     return agent
 
 @router.delete("/{agent_id}", response_model=schemas.Agent)
 async def delete_agent(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     agent_id: int,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
     """Delete agent"""
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = await db.get(Agent, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
@@ -119,6 +119,6 @@ async def delete_agent(
     if not current_user.is_superuser and agent.organization_id != current_user.organization_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db.delete(agent)
-    db.commit()
+    await db.delete(agent)
+    await db.commit()
     return agent
\ No newline at end of file
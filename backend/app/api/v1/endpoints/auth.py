@@ -2,10 +2,12 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
 from app.core.config import settings
+from app.core.principal import principal_cache
 from app.core.security import get_password_hash, verify_password
 from app.schemas.user import User, UserCreate
 from app.models.user import User as UserModel
@@ -15,13 +17,17 @@ router = APIRouter()
 
 @router.post("/login/access-token")
 async def login_access_token(
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests"""
-    user = db.query(UserModel).filter(UserModel.email == form_data.username).first()
+    result = await db.execute(select(UserModel).where(UserModel.email == form_data.username))
+    user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    # Re-read the user after its version stamp, so the token's claims are no older than the stamp
+    version = await principal_cache.version(user.id)
+    await db.refresh(user)
     if not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     if not user.is_active:
@@ -30,7 +36,9 @@ async def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id,
+            expires_delta=access_token_expires,
+            claims=principal_cache.claims(user, version)
         ),
         "token_type": "bearer",
     }
@@ -38,11 +46,12 @@ async def login_access_token(
 @router.post("/register", response_model=User)
 async def register_user(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     user_in: UserCreate,
 ) -> Any:
     """Register new user"""
-    user = db.query(UserModel).filter(UserModel.email == user_in.email).first()
+    result = await db.execute(select(UserModel).where(UserModel.email == user_in.email))
+    user = result.scalar_one_or_none()
     if user:
         raise HTTPException(
             status_code=400,
@@ -57,6 +66,6 @@ async def register_user(
         organization_id=user_in.organization_id
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user 
\ No newline at end of file
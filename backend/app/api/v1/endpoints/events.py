@@ -1,73 +1,167 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+import math
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ....schemas import schemas
 from ....api import deps
+from ....api.pagination import Cursor, cursor_param, keyset_page, set_next_cursor
+from ....core.config import settings
+from ....core.principal import Principal
 from ....models import models
-from ....services import ml_service, notification_service
+from ....services.event_ingest import EventBatchTooLarge, bulk_insert_events, chunked, parse_event_batch
+from ....services.event_queue import event_queue
+from ....services.threat_analysis import threat_analysis_service
 
 router = APIRouter()
 
+async def _get_agent(db: AsyncSession, agent_id: str, organization_id: str) -> models.Agent:
+    """Agent by id, if it belongs to the organization"""
+    result = await db.execute(select(models.Agent).where(
+        models.Agent.id == agent_id,
+        models.Agent.organization_id == organization_id
+    ))
+    agent = result.scalar_one_or_none()
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return agent
+
+def _check_backlog() -> None:
+    """Push back on producers while analysis is too far behind"""
+    if event_queue.saturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Event analysis backlog is full, retry later",
+            headers={"Retry-After": str(math.ceil(settings.EVENT_QUEUE_LAG_INTERVAL))}
+        )
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """Request body, rejected with 413 as soon as it exceeds ``max_bytes``"""
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"At most {max_bytes} bytes per batch"
+    )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
 @router.post("/", response_model=schemas.SecurityEvent)
 async def create_event(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db_async),
     event_in: schemas.SecurityEventCreate,
     agent_id: str,
     background_tasks: BackgroundTasks,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: Principal = Depends(deps.get_current_active_user)
 ) -> Any:
     """Create new security event"""
+    _check_backlog()
     # Verify agent belongs to organization
-    agent = db.query(models.Agent).filter(
-        models.Agent.id == agent_id,
-        models.Agent.organization_id == current_user.organization_id
-    ).first()
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
+    await _get_agent(db, agent_id, current_user.organization_id)
 
     # Create event
     event = models.SecurityEvent(
         agent_id=agent_id,
+        organization_id=current_user.organization_id,
         event_type=event_in.event_type,
         severity=event_in.severity,
         description=event_in.description,
         raw_data=event_in.raw_data
     )
     db.add(event)
-    db.commit()
-    db.refresh(event)
-
-    # Process event in background
-    background_tasks.add_task(
-        ml_service.analyze_event,
-        event.id,
-        current_user.organization_id
-    )
-    
-    # Send notifications for high severity events
-    if event.severity >= schemas.EventSeverity.HIGH:
-        background_tasks.add_task(
-            notification_service.send_alert,
-            event.id,
-            current_user.organization_id
-        )
+    await db.commit()
+    await db.refresh(event)
+
+    # Hand off to the analysis workers; analyze in-process if Redis is down
+    queued = schemas.SecurityEvent.model_validate(event)
+    if not await event_queue.publish([queued]):
+        background_tasks.add_task(threat_analysis_service.analyze_event, queued)
 
     return event
 
+@router.post("/batch", response_model=schemas.SecurityEventBatchResult)
+async def create_events_batch(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db_async),
+    agent_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(deps.get_current_active_user)
+) -> Any:
+    """Create many security events from a JSON array or NDJSON body.
+
+    Events are written with one multi-row INSERT per chunk in a single
+    transaction, then appended to the analysis queue.
+    """
+    _check_backlog()
+    body = await _read_body(request, settings.EVENT_BATCH_MAX_BYTES)
+    try:
+        events = parse_event_batch(
+            body,
+            request.headers.get("content-type", "application/json"),
+            max_events=settings.EVENT_BATCH_MAX_SIZE
+        )
+    except EventBatchTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.EVENT_BATCH_MAX_SIZE} events per batch"
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    await _get_agent(db, agent_id, current_user.organization_id)
+    rows = await bulk_insert_events(db, agent_id, current_user.organization_id, events)
+
+    analyzed = [schemas.SecurityEvent(**row) for row in rows]
+    queued = await event_queue.publish(analyzed)
+    if not queued:
+        for chunk in chunked(analyzed, settings.EVENT_BATCH_CHUNK_SIZE):
+            background_tasks.add_task(threat_analysis_service.analyze_events, chunk)
+
+    return schemas.SecurityEventBatchResult(
+        ids=[row["id"] for row in rows],
+        accepted=len(rows),
+        queued=len(rows) if queued else 0
+    )
+
 @router.get("/", response_model=List[schemas.SecurityEvent])
 async def get_events(
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: AsyncSession = Depends(deps.get_db_async),
+    after: Optional[Cursor] = Depends(cursor_param),
+    agent_id: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: Principal = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Get all security events for organization"""
-    events = db.query(models.SecurityEvent).join(
-        models.Agent
-    ).filter(
-        models.Agent.organization_id == current_user.organization_id
-    ).order_by(
-        models.SecurityEvent.timestamp.desc()
-    ).offset(skip).limit(limit).all()
-    return events 
\ No newline at end of file
+    """Get security events for organization, newest first.
+
+    Page with ``after`` set to the previous page's X-Next-Cursor header;
+    ``skip`` still works but gets slower the deeper it goes.
+    """
+    query = select(models.SecurityEvent).where(
+        models.SecurityEvent.organization_id == current_user.organization_id
+    )
+    if agent_id is not None:
+        query = query.where(models.SecurityEvent.agent_id == agent_id)
+    query = keyset_page(
+        query,
+        models.SecurityEvent.timestamp,
+        models.SecurityEvent.id,
+        after,
+        limit,
+        descending=True
+    )
+    result = await db.execute(query.offset(skip))
+    events = result.scalars().all()
+    set_next_cursor(response, events, limit, "timestamp")
+    return events
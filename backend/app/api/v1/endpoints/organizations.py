@@ -1,9 +1,11 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
 
 from app.api import deps
+from app.api.pagination import Cursor, cursor_param, keyset_page, set_next_cursor
 from app.models.organization import Organization
 from app.schemas.organization import OrganizationCreate, Organization as OrganizationSchema
 
@@ -13,10 +15,10 @@ def generate_api_key() -> str:
     return secrets.token_urlsafe(32)
 
 @router.post("/", response_model=OrganizationSchema)
-def create_organization(
+async def create_organization(
     request: Request,
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     organization_in: OrganizationCreate
 ) -> Any:
     """
@@ -31,43 +33,49 @@ def create_organization(
     )
     db.add(organization)
     try:
-        db.commit()
-        db.refresh(organization)
+        await db.commit()
+        await db.refresh(organization)
         return organization
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Could not create organization: {str(e)}"
         )
 
 @router.get("/", response_model=List[OrganizationSchema])
-def get_organizations(
-    db: Session = Depends(deps.get_db_sync),
+async def get_organizations(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_db_async),
+    after: Optional[Cursor] = Depends(cursor_param),
     skip: int = 0,
     limit: int = 100,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
     """
-    Retrieve organizations.
+    Retrieve organizations, oldest first. Page with ``after`` (the X-Next-Cursor header).
     """
     if current_user.is_superuser:
-        organizations = db.query(Organization).offset(skip).limit(limit).all()
-    else:
-        organizations = [current_user.organization]
-    return organizations
+        query = keyset_page(select(Organization), Organization.created_at, Organization.id, after, limit)
+        result = await db.execute(query.offset(skip))
+        organizations = result.scalars().all()
+        set_next_cursor(response, organizations, limit, "created_at")
+        return organizations
+    # Relationships cannot lazy-load on an AsyncSession, so fetch it explicitly
+    organization = await db.get(Organization, current_user.organization_id)
+    return [organization] if organization else []
 
 @router.get("/{organization_id}", response_model=OrganizationSchema)
-def get_organization(
+async def get_organization(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     organization_id: str,
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     Get organization by ID.
     """
-    organization = db.query(Organization).filter(Organization.id == organization_id).first()
+    organization = await db.get(Organization, organization_id)
     if not organization:
         raise HTTPException(status_code=404, detail="Organization not found")
     if not current_user.is_superuser and current_user.organization_id != organization.id:
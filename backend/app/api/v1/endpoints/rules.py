@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from ....schemas.schemas import RuleSetInfo, RuleStats
+from ....services.rule_engine import rule_engine
+from ....api import deps
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _rule_set_info(changed: Optional[bool] = None) -> RuleSetInfo:
+    ruleset = rule_engine.ruleset
+    return RuleSetInfo(
+        content_hash=ruleset.content_hash,
+        rule_count=len(ruleset.rules),
+        created_at=ruleset.created_at,
+        source=rule_engine.rules_path,
+        cost_ordered=ruleset.cost_ordered,
+        changed=changed
+    )
+
+@router.get("/", response_model=RuleSetInfo)
+async def get_rule_set(
+    current_user = Depends(deps.get_current_active_superuser)
+):
+    """Get the active rule set version"""
+    return _rule_set_info()
+
+@router.post("/reload", response_model=RuleSetInfo)
+async def reload_rules(
+    current_user = Depends(deps.get_current_active_superuser)
+):
+    """Recompile the rule file and swap it in; the active rules are kept on error"""
+    try:
+        changed = await rule_engine.reload_rules()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Rule reload failed: {str(e)}")
+        raise HTTPException(status_code=422, detail=f"Could not reload rules: {str(e)}")
+    return _rule_set_info(changed)
+
+@router.get("/stats", response_model=List[RuleStats])
+async def get_rule_stats(
+    limit: int = 100,
+    current_user = Depends(deps.get_current_active_superuser)
+):
+    """Get per-rule evaluation statistics, most expensive rules first"""
+    return rule_engine.rule_stats()[:limit]
+
+@router.post("/optimize", response_model=RuleSetInfo)
+async def optimize_rules(
+    current_user = Depends(deps.get_current_active_superuser)
+):
+    """Reorder rule conditions by their observed cost and selectivity now"""
+    changed = await rule_engine.optimize_rules()
+    return _rule_set_info(changed)
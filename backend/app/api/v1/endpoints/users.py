@@ -1,47 +1,55 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.principal import Principal
 from app.models.user import User
+from app.services.user import user_service
 from app.schemas.user import User as UserSchema
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user(
-    current_user: User = Depends(deps.get_current_active_user)
+async def get_current_user(
+    db: AsyncSession = Depends(deps.get_db_async),
+    current_user: Principal = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     Get current user.
     """
-    return current_user
+    # The principal may come from token claims alone, without the profile fields
+    user = await user_service.get(db, id=current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.get("/", response_model=List[UserSchema])
-def get_users(
-    db: Session = Depends(deps.get_db_sync),
+async def get_users(
+    db: AsyncSession = Depends(deps.get_db_async),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_superuser)
+    current_user: Principal = Depends(deps.get_current_active_superuser)
 ) -> Any:
     """
     Retrieve users. Only accessible by superusers.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    result = await db.execute(select(User).offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/{user_id}", response_model=UserSchema)
-def get_user(
+async def get_user(
     *,
-    db: Session = Depends(deps.get_db_sync),
+    db: AsyncSession = Depends(deps.get_db_async),
     user_id: str,
-    current_user: User = Depends(deps.get_current_active_user)
+    current_user: Principal = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     Get user by ID. Only accessible by superusers or the user themselves.
     """
     if current_user.id == user_id or current_user.is_superuser:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from typing import List, Dict, Any
 from ....schemas.schemas import SecurityEvent, ZeroDayDetection
-from ....services.ml.zero_day_detection import ZeroDayDetector
+from ....services.ml.batching import zero_day_batcher
+from ....services.ml.feature_cache import feature_cache
 from ....api import deps
 from ....core.config import settings
 import logging
@@ -11,6 +12,9 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Bump whenever _extract_features changes so cached vectors are not reused
+FEATURE_SCHEMA_VERSION = f"1-{settings.FEATURE_DIMENSION}"
+
 @router.post(
     "/detect",
     response_model=ZeroDayDetection,
@@ -65,13 +69,16 @@ async def detect_zero_day(
     Returns detailed analysis of potential zero-day threats.
     """
     try:
-        detector = ZeroDayDetector()
-        
-        # Extract features from the security event
-        features = await _extract_features(event)
+        # Extract features from the security event (reused if seen before)
+        features = (await feature_cache.get_or_compute(
+            "zero_day",
+            FEATURE_SCHEMA_VERSION,
+            {"event_type": event.event_type, "raw_data": event.raw_data},
+            lambda: _extract_features(event)
+        )).reshape(1, -1)
         
-        # Perform zero-day detection
-        result = await detector.detect_zero_day(features)
+        # Perform zero-day detection; concurrent requests share one model pass
+        result = (await zero_day_batcher.submit(features))[0]
         
         # If a potential zero-day attack is detected, trigger response
         if result["is_zero_day"] and result["confidence"] > settings.HIGH_CONFIDENCE_THRESHOLD:
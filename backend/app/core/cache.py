@@ -1,16 +1,307 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+from collections import OrderedDict
+import asyncio
+import inspect
+import struct
+import time
+import orjson
 from redis import asyncio as aioredis
-from ..core.config import settings
+from .config import settings
+from .metrics import MetricsCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+Compute = Callable[[], Union[Any, Awaitable[Any]]]
+
+_MISSING = object()
+# Redis could not answer: unlike _MISSING, says nothing about the key
+_UNAVAILABLE = object()
+
+# Redis values are the time the entry goes stale followed by the orjson payload
+_HEADER = struct.Struct("!d")
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class _Entry:
+    __slots__ = ("value", "size", "fresh_until", "expires_at")
+
+    def __init__(self, value: Any, size: int, fresh_until: float, expires_at: float):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
 
 class CacheManager:
-    def __init__(self):
-        self.redis = aioredis.from_url(settings.REDIS_URL)
-        self.default_ttl = 300  # 5 minutes
-        
-    async def get(self, key: str) -> str:
-        return await self.redis.get(key)
-        
-    async def set(self, key: str, value: str, ttl: int = None):
-        await self.redis.set(key, value, ex=ttl or self.default_ttl)
-        
-    async def delete(self, key: str):
-        await self.redis.delete(key) 
\ No newline at end of file
+    """Two-tier cache: an in-process LRU in front of Redis.
+
+    The local tier is bounded by the serialized size of its values and
+    keeps an entry for at most ``local_ttl`` seconds, which bounds how long
+    a worker can miss another worker's delete. Values are serialized with
+    orjson, so they must be JSON-compatible (numpy arrays included) and are
+    shared between callers on local hits: treat them as read-only.
+
+    ``get_or_set`` coalesces concurrent misses for a key into one
+    ``compute`` call. With ``stale_ttl`` an expired value keeps being served
+    for that long while a single background task recomputes it.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = settings.REDIS_URL,
+        max_bytes: int = settings.CACHE_LOCAL_MAX_BYTES,
+        local_ttl: float = settings.CACHE_LOCAL_TTL,
+        default_ttl: int = settings.CACHE_DEFAULT_TTL,
+        prefix: str = "cache"
+    ):
+        self.redis_url = redis_url
+        self.max_bytes = max_bytes
+        self.local_ttl = local_ttl
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._redis = None
+
+    async def get(
+        self,
+        key: str,
+        namespace: str = "default",
+        default: Any = None,
+        unavailable: Any = _MISSING
+    ) -> Any:
+        """Fresh cached value, or ``default``.
+
+        If given, ``unavailable`` is returned instead of ``default`` when
+        Redis could not be asked (it is down or not configured), for callers
+        that must tell a missing key from an unknown one.
+        """
+        full_key = self._key(namespace, key)
+        entry = self._get_local(full_key)
+        if entry is not None and entry.fresh_until > time.time():
+            MetricsCollector.record_cache_request(namespace, "hit_local")
+            return entry.value
+
+        value, fresh = await self._get_remote(full_key)
+        if value is _UNAVAILABLE:
+            MetricsCollector.record_cache_request(namespace, "miss")
+            return default if unavailable is _MISSING else unavailable
+        if value is not _MISSING and fresh:
+            MetricsCollector.record_cache_request(namespace, "hit_redis")
+            return value
+        MetricsCollector.record_cache_request(namespace, "miss")
+        return default
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        namespace: str = "default",
+        stale_ttl: int = 0
+    ) -> bool:
+        """Store a value fresh for ``ttl`` seconds, then stale for ``stale_ttl``"""
+        return await self._store(self._key(namespace, key), value, ttl, stale_ttl)
+
+    def set_local(self, key: str, value: Any, ttl: Optional[float] = None, namespace: str = "default") -> None:
+        """Store a value in this worker's tier only, for at most ``local_ttl`` seconds.
+
+        For remembering that Redis has no value for a key: writing the
+        default back to Redis could overwrite another worker's set.
+        """
+        ttl = self.local_ttl if ttl is None else ttl
+        payload = orjson.dumps(value, option=_ORJSON_OPTIONS)
+        fresh_until = time.time() + ttl
+        self._put_local(self._key(namespace, key), value, len(payload), fresh_until, fresh_until)
+
+    async def delete(self, key: str, namespace: str = "default") -> bool:
+        full_key = self._key(namespace, key)
+        self._drop_local(full_key)
+        if not self.redis_url:
+            return True
+        try:
+            await self._client().delete(full_key)
+            return True
+        except Exception as e:
+            logger.error(f"Cache delete error: {str(e)}")
+            return False
+
+    async def clear_namespace(self, namespace: str) -> bool:
+        """Delete every key of a namespace (SCAN, so Redis is never blocked)"""
+        prefix = self._key(namespace, "")
+        for full_key in [k for k in self._entries if k.startswith(prefix)]:
+            self._drop_local(full_key)
+        if not self.redis_url:
+            return True
+        try:
+            redis = self._client()
+            batch = []
+            async for full_key in redis.scan_iter(match=f"{prefix}*", count=500):
+                batch.append(full_key)
+                if len(batch) >= 500:
+                    await redis.unlink(*batch)
+                    batch = []
+            if batch:
+                await redis.unlink(*batch)
+            return True
+        except Exception as e:
+            logger.error(f"Cache clear namespace error: {str(e)}")
+            return False
+
+    async def get_or_set(
+        self,
+        key: str,
+        compute: Compute,
+        ttl: Optional[int] = None,
+        namespace: str = "default",
+        stale_ttl: int = 0
+    ) -> Any:
+        """Cached value, computing and storing it on a miss"""
+        full_key = self._key(namespace, key)
+        entry = self._get_local(full_key)
+        if entry is not None:
+            if entry.fresh_until > time.time():
+                MetricsCollector.record_cache_request(namespace, "hit_local")
+                return entry.value
+            MetricsCollector.record_cache_request(namespace, "stale")
+            self._refresh(full_key, compute, ttl, stale_ttl)
+            return entry.value
+
+        loading = self._loading.get(full_key)
+        if loading is not None:
+            MetricsCollector.record_cache_request(namespace, "coalesced")
+        else:
+            loading = asyncio.ensure_future(
+                self._load(namespace, full_key, compute, ttl, stale_ttl)
+            )
+            self._loading[full_key] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(full_key, None))
+        # Shielded: one cancelled caller must not cancel the others' load
+        return await asyncio.shield(loading)
+
+    def clear_local(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        MetricsCollector.update_cache_local_bytes(0)
+
+    async def _load(
+        self,
+        namespace: str,
+        full_key: str,
+        compute: Compute,
+        ttl: Optional[int],
+        stale_ttl: int
+    ) -> Any:
+        value, fresh = await self._get_remote(full_key)
+        if value is not _MISSING and value is not _UNAVAILABLE:
+            if fresh:
+                MetricsCollector.record_cache_request(namespace, "hit_redis")
+            else:
+                MetricsCollector.record_cache_request(namespace, "stale")
+                self._refresh(full_key, compute, ttl, stale_ttl)
+            return value
+
+        MetricsCollector.record_cache_request(namespace, "miss")
+        value = await _run(compute)
+        await self._store(full_key, value, ttl, stale_ttl)
+        return value
+
+    def _refresh(self, full_key: str, compute: Compute, ttl: Optional[int], stale_ttl: int) -> None:
+        if full_key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._store(full_key, await _run(compute), ttl, stale_ttl)
+            except Exception as e:
+                logger.error(f"Cache refresh error for {full_key}: {str(e)}")
+            finally:
+                self._refreshing.pop(full_key, None)
+
+        self._refreshing[full_key] = asyncio.create_task(refresh())
+
+    async def _store(self, full_key: str, value: Any, ttl: Optional[int], stale_ttl: int) -> bool:
+        ttl = self.default_ttl if ttl is None else ttl
+        payload = orjson.dumps(value, option=_ORJSON_OPTIONS)
+        fresh_until = time.time() + ttl
+        self._put_local(full_key, value, len(payload), fresh_until, fresh_until + stale_ttl)
+        if not self.redis_url:
+            return True
+        try:
+            await self._client().set(
+                full_key,
+                _HEADER.pack(fresh_until) + payload,
+                ex=max(1, ttl + stale_ttl)
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Cache set error: {str(e)}")
+            return False
+
+    async def _get_remote(self, full_key: str) -> Tuple[Any, bool]:
+        """(value, _MISSING or _UNAVAILABLE, whether it is still fresh)"""
+        if not self.redis_url:
+            return _UNAVAILABLE, False
+        try:
+            data = await self._client().get(full_key)
+        except Exception as e:
+            logger.error(f"Cache get error: {str(e)}")
+            return _UNAVAILABLE, False
+        if data is None:
+            return _MISSING, False
+
+        fresh_until, = _HEADER.unpack_from(data)
+        payload = memoryview(data)[_HEADER.size:]
+        value = orjson.loads(payload)
+        # The Redis TTL already covers the stale window
+        self._put_local(full_key, value, len(payload), fresh_until, time.time() + self.local_ttl)
+        return value, fresh_until > time.time()
+
+    def _get_local(self, full_key: str) -> Optional[_Entry]:
+        entry = self._entries.get(full_key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._drop_local(full_key)
+            return None
+        self._entries.move_to_end(full_key)
+        return entry
+
+    def _put_local(self, full_key: str, value: Any, size: int, fresh_until: float, expires_at: float) -> None:
+        if size > self.max_bytes:
+            self._drop_local(full_key)
+            return
+        self._drop_local(full_key)
+        expires_at = min(expires_at, time.time() + self.local_ttl)
+        self._entries[full_key] = _Entry(value, size, fresh_until, expires_at)
+        self._bytes += size
+
+        # Evict least recently used entries until back under budget
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+        MetricsCollector.update_cache_local_bytes(self._bytes)
+
+    def _drop_local(self, full_key: str) -> None:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+async def _run(compute: Compute) -> Any:
+    result = compute()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+cache_manager = CacheManager(
+    redis_url=settings.REDIS_URL if settings.CACHE_REDIS_ENABLED else None
+)
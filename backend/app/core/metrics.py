@@ -28,7 +28,124 @@ MODEL_PREDICTION_TIME = Histogram(
     buckets=[0.01, 0.05, 0.1, 0.5, 1.0]
 )
 
+MODEL_QUEUE_TIME = Histogram(
+    'ml_model_queue_time_seconds',
+    'Time inference calls wait for a worker before running',
+    ['model_name'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0]
+)
+
+INFERENCE_QUEUE_DEPTH = Gauge(
+    'ml_inference_queue_depth',
+    'Number of inference requests waiting for the next batch',
+    ['model_name']
+)
+
+INFERENCE_BATCH_SIZE = Histogram(
+    'ml_inference_batch_size',
+    'Number of rows scored per batched inference pass',
+    ['model_name'],
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+)
+
+FEATURE_CACHE_REQUESTS = Counter(
+    'ml_feature_cache_requests_total',
+    'Feature vector cache lookups by pipeline stage and outcome',
+    ['stage', 'result']
+)
+
+FEATURE_CACHE_BYTES = Gauge(
+    'ml_feature_cache_bytes',
+    'Bytes of feature vectors held in the in-process cache tier'
+)
+
+# Rule action metrics
+RULE_ACTIONS = Counter(
+    'cyber_defense_rule_actions_total',
+    'Rule actions by type and outcome (queued, coalesced, dropped, succeeded, failed)',
+    ['action_type', 'result']
+)
+
+RULE_ACTION_QUEUE_DEPTH = Gauge(
+    'cyber_defense_rule_action_queue_size',
+    'Number of rule actions waiting for a worker'
+)
+
+RULE_ACTION_QUEUE_TIME = Histogram(
+    'cyber_defense_rule_action_queue_time_seconds',
+    'Time rule actions wait in the queue before a worker runs them',
+    ['action_type'],
+    buckets=[0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 30.0]
+)
+
+RULE_ACTION_DURATION = Histogram(
+    'cyber_defense_rule_action_duration_seconds',
+    'Time spent executing rule actions',
+    ['action_type'],
+    buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0]
+)
+
+# Rule evaluation metrics
+RULE_EVALUATIONS = Counter(
+    'cyber_defense_rule_evaluations_total',
+    'Number of times a rule was evaluated against an event',
+    ['rule_id']
+)
+
+RULE_MATCHES = Counter(
+    'cyber_defense_rule_matches_total',
+    'Number of events a rule matched',
+    ['rule_id']
+)
+
+RULE_PROFILED_EVALUATIONS = Counter(
+    'cyber_defense_rule_profiled_evaluations_total',
+    'Number of sampled rule evaluations that were timed',
+    ['rule_id']
+)
+
+RULE_PROFILED_TIME = Counter(
+    'cyber_defense_rule_profiled_seconds_total',
+    'Cumulative time of the sampled rule evaluations',
+    ['rule_id']
+)
+
+RULE_EVALUATION_P99 = Gauge(
+    'cyber_defense_rule_evaluation_p99_seconds',
+    'p99 evaluation time of a rule over sampled evaluations',
+    ['rule_id']
+)
+
+RULE_CONDITION_SELECTIVITY = Gauge(
+    'cyber_defense_rule_condition_pass_rate',
+    'Fraction of sampled evaluations in which a rule condition held',
+    ['rule_id', 'condition']
+)
+
 # System metrics
+RATE_LIMITED_REQUESTS = Counter(
+    'cyber_defense_rate_limited_requests_total',
+    'Requests rejected by the rate limiter',
+    ['route']
+)
+
+CACHE_REQUESTS = Counter(
+    'cyber_defense_cache_requests_total',
+    'Cache lookups by namespace and outcome',
+    ['namespace', 'result']
+)
+
+CACHE_LOCAL_BYTES = Gauge(
+    'cyber_defense_cache_local_bytes',
+    'Serialized bytes held in the in-process cache tier'
+)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    'cyber_defense_response_cache_requests_total',
+    'Cacheable GET requests by route and outcome',
+    ['route', 'result']
+)
+
 ACTIVE_CONNECTIONS = Gauge(
     'cyber_defense_active_connections',
     'Number of active agent connections'
@@ -39,6 +156,12 @@ EVENT_PROCESSING_QUEUE = Gauge(
     'Number of events waiting to be processed'
 )
 
+EVENT_QUEUE_MESSAGES = Counter(
+    'cyber_defense_event_queue_messages_total',
+    'Event queue entries by outcome (published, acked, retried, failed, dead_lettered)',
+    ['result']
+)
+
 class MetricsCollector:
     @staticmethod
     def record_threat_detection(threat_type: str, severity: str):
@@ -56,10 +179,91 @@ class MetricsCollector:
     def record_prediction_time(model_name: str, duration: float):
         MODEL_PREDICTION_TIME.labels(model_name=model_name).observe(duration)
 
+    @staticmethod
+    def record_inference_queue_time(model_name: str, duration: float):
+        MODEL_QUEUE_TIME.labels(model_name=model_name).observe(duration)
+
+    @staticmethod
+    def update_inference_queue_depth(model_name: str, depth: int):
+        INFERENCE_QUEUE_DEPTH.labels(model_name=model_name).set(depth)
+
+    @staticmethod
+    def record_inference_batch_size(model_name: str, size: int):
+        INFERENCE_BATCH_SIZE.labels(model_name=model_name).observe(size)
+
+    @staticmethod
+    def record_feature_cache_lookups(stage: str, result: str, count: int = 1):
+        if count:
+            FEATURE_CACHE_REQUESTS.labels(stage=stage, result=result).inc(count)
+
+    @staticmethod
+    def update_feature_cache_bytes(size: int):
+        FEATURE_CACHE_BYTES.set(size)
+
+    @staticmethod
+    def record_rule_action(action_type: str, result: str):
+        RULE_ACTIONS.labels(action_type=action_type, result=result).inc()
+
+    @staticmethod
+    def update_rule_action_queue_depth(depth: int):
+        RULE_ACTION_QUEUE_DEPTH.set(depth)
+
+    @staticmethod
+    def record_rule_action_queue_time(action_type: str, duration: float):
+        RULE_ACTION_QUEUE_TIME.labels(action_type=action_type).observe(duration)
+
+    @staticmethod
+    def record_rule_action_duration(action_type: str, duration: float):
+        RULE_ACTION_DURATION.labels(action_type=action_type).observe(duration)
+
+    @staticmethod
+    def record_rule_evaluations(
+        rule_id: str,
+        evaluations: int,
+        matches: int,
+        profiled: int,
+        profiled_time: float
+    ):
+        if evaluations:
+            RULE_EVALUATIONS.labels(rule_id=rule_id).inc(evaluations)
+        if matches:
+            RULE_MATCHES.labels(rule_id=rule_id).inc(matches)
+        if profiled:
+            RULE_PROFILED_EVALUATIONS.labels(rule_id=rule_id).inc(profiled)
+            RULE_PROFILED_TIME.labels(rule_id=rule_id).inc(profiled_time)
+
+    @staticmethod
+    def update_rule_latency(rule_id: str, p99: float):
+        RULE_EVALUATION_P99.labels(rule_id=rule_id).set(p99)
+
+    @staticmethod
+    def update_rule_condition_selectivity(rule_id: str, condition: str, pass_rate: float):
+        RULE_CONDITION_SELECTIVITY.labels(rule_id=rule_id, condition=condition).set(pass_rate)
+
+    @staticmethod
+    def record_rate_limited(route: str):
+        RATE_LIMITED_REQUESTS.labels(route=route).inc()
+
+    @staticmethod
+    def record_cache_request(namespace: str, result: str):
+        CACHE_REQUESTS.labels(namespace=namespace, result=result).inc()
+
+    @staticmethod
+    def update_cache_local_bytes(size: int):
+        CACHE_LOCAL_BYTES.set(size)
+
+    @staticmethod
+    def record_response_cache(route: str, result: str):
+        RESPONSE_CACHE_REQUESTS.labels(route=route, result=result).inc()
+
     @staticmethod
     def update_connection_count(count: int):
         ACTIVE_CONNECTIONS.set(count)
 
     @staticmethod
     def update_event_queue_size(size: int):
-        EVENT_PROCESSING_QUEUE.set(size) 
\ No newline at end of file
+        EVENT_PROCESSING_QUEUE.set(size)
+
+    @staticmethod
+    def record_event_queue(result: str, count: int = 1):
+        EVENT_QUEUE_MESSAGES.labels(result=result).inc(count) 
\ No newline at end of file
@@ -0,0 +1,136 @@
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+import time
+from .cache import CacheManager, cache_manager
+from .config import settings
+
+_MISSING = object()
+_UNKNOWN = object()
+
+PRINCIPAL_NAMESPACE = "principal"
+VERSION_NAMESPACE = "principal_version"
+
+class Principal(NamedTuple):
+    """The authenticated caller, as much of the user row as authorization needs"""
+    id: str
+    organization_id: Optional[str]
+    is_superuser: bool
+    is_active: bool = True
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=str(user.id),
+            organization_id=user.organization_id,
+            is_superuser=bool(user.is_superuser),
+            is_active=bool(user.is_active),
+            email=user.email,
+            full_name=user.full_name
+        )
+
+class PrincipalCache:
+    """Resolves token claims to a Principal without a users-table query.
+
+    Each user has a version stamp: the time, in milliseconds, of the last
+    change to their status, role or organization (0 if none is recorded).
+    Tokens carry the stamp they were issued under with the organization and
+    superuser claims, so while it is current the principal is built from the
+    claims alone. Otherwise the user is loaded once and cached for ``ttl``
+    seconds under their id, tagged with the stamp it was loaded under.
+
+    ``invalidate`` writes a new stamp, which retires every outstanding
+    token's claims and cached principal at once. Other workers may see the
+    old stamp for up to the cache's ``local_ttl``. Stamps are kept as long
+    as an access token lives, so none can be forgotten while a token issued
+    before it is still valid.
+
+    Stamps only reach other workers through Redis, so while it is down or
+    disabled the stamp is unknown and every request loads the user.
+    """
+
+    def __init__(
+        self,
+        cache: CacheManager = cache_manager,
+        ttl: int = settings.PRINCIPAL_CACHE_TTL,
+        version_ttl: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    ):
+        self.cache = cache
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+
+    async def version(self, user_id: str) -> Optional[int]:
+        """The user's current stamp, or None if Redis cannot tell"""
+        user_id = str(user_id)
+        version = await self.cache.get(
+            user_id,
+            namespace=VERSION_NAMESPACE,
+            default=_MISSING,
+            unavailable=_UNKNOWN
+        )
+        if version is _UNKNOWN:
+            return None
+        if version is _MISSING:
+            # Most users have no stamp; remember that locally rather than asking Redis every request
+            self.cache.set_local(user_id, 0, namespace=VERSION_NAMESPACE)
+            return 0
+        return version
+
+    def claims(self, user: Any, version: Optional[int]) -> Dict[str, Any]:
+        """Claims to embed in a new access token for ``user``.
+
+        ``version`` must be read before ``user`` is: a change committed after
+        that read writes a newer stamp, which retires the claims. Without a
+        known stamp there are none, and the token always loads the user.
+        """
+        if version is None:
+            return {}
+        return {
+            "org": user.organization_id,
+            "su": bool(user.is_superuser),
+            "ver": version
+        }
+
+    async def resolve(
+        self,
+        claims: Dict[str, Any],
+        load: Callable[[], Awaitable[Any]]
+    ) -> Optional[Principal]:
+        """Principal for decoded token claims; ``load`` fetches the user row on a miss"""
+        user_id = str(claims["sub"])
+        version = await self.version(user_id)
+        if version is None:
+            user = await load()
+            return None if user is None else Principal.from_user(user)
+
+        if claims.get("ver") == version and "org" in claims and "su" in claims:
+            return Principal(id=user_id, organization_id=claims["org"], is_superuser=bool(claims["su"]))
+
+        cached = await self.cache.get(user_id, namespace=PRINCIPAL_NAMESPACE)
+        if cached is not None and cached["version"] == version:
+            return Principal(**cached["principal"])
+
+        user = await load()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        await self.cache.set(
+            user_id,
+            {"version": version, "principal": principal._asdict()},
+            ttl=self.ttl,
+            namespace=PRINCIPAL_NAMESPACE
+        )
+        return principal
+
+    async def invalidate(self, user_id: str) -> None:
+        """Retire the claims and cached principal of every token issued to ``user_id``"""
+        user_id = str(user_id)
+        await self.cache.set(
+            user_id,
+            int(time.time() * 1000),
+            ttl=self.version_ttl,
+            namespace=VERSION_NAMESPACE
+        )
+        await self.cache.delete(user_id, namespace=PRINCIPAL_NAMESPACE)
+
+principal_cache = PrincipalCache()
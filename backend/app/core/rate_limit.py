@@ -0,0 +1,120 @@
+from typing import NamedTuple, Optional
+from collections import OrderedDict
+import time
+from redis import asyncio as aioredis
+from .config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int  # requests still allowed right now
+    retry_after: float  # seconds until the next request is allowed (0 if allowed)
+
+def _gcra(tat: float, now: float, limit: int, period: float):
+    """One GCRA step: (new TAT or None if rejected, result).
+
+    Each request advances the theoretical arrival time (TAT) by one emission
+    interval; a request is allowed while the TAT stays within ``period`` of
+    now, which permits bursts of up to ``limit`` requests.
+    """
+    interval = period / limit
+    tat = max(tat, now)
+    new_tat = tat + interval
+    allow_at = new_tat - period
+    if now < allow_at:
+        return None, RateLimitResult(False, 0, allow_at - now)
+    remaining = int((now - allow_at) / interval + 1e-9)
+    return new_tat, RateLimitResult(True, remaining, 0.0)
+
+class InMemoryRateLimiter:
+    """GCRA rate limiter storing one timestamp per client in this process.
+
+    Keys are kept in least-recently-updated order, so expired keys are
+    evicted from the front as new requests arrive and each request costs
+    O(1) regardless of the number of clients.
+    """
+
+    def __init__(self):
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, period: float = 60.0) -> RateLimitResult:
+        return self.hit_sync(key, limit, period)
+
+    def hit_sync(self, key: str, limit: int, period: float = 60.0, now: Optional[float] = None) -> RateLimitResult:
+        now = time.monotonic() if now is None else now
+        new_tat, result = _gcra(self._tats.get(key, now), now, limit, period)
+        if new_tat is not None:
+            self._tats[key] = new_tat
+            self._tats.move_to_end(key)
+
+        # A key whose TAT has passed is indistinguishable from a new key
+        while self._tats:
+            oldest_key, oldest_tat = next(iter(self._tats.items()))
+            if oldest_tat > now:
+                break
+            del self._tats[oldest_key]
+        return result
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+# TAT is kept in Redis server time so every worker shares one clock
+_GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local interval = period / limit
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, math.floor((now - allow_at) / interval + 1e-9), '0'}
+"""
+
+class RedisRateLimiter:
+    """GCRA rate limiter shared by all workers through Redis.
+
+    Each request is a single EVALSHA round trip. If Redis is unreachable the
+    limiter falls back to per-process limits rather than rejecting or
+    admitting every request.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "ratelimit"):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.fallback = InMemoryRateLimiter()
+        self._redis = None
+        self._script = None
+
+    async def hit(self, key: str, limit: int, period: float = 60.0) -> RateLimitResult:
+        try:
+            allowed, remaining, retry_after = await self._gcra_script()(
+                keys=[f"{self.prefix}:{key}"],
+                args=[limit, period]
+            )
+            return RateLimitResult(bool(allowed), int(remaining), float(retry_after))
+        except Exception as e:
+            logger.error(f"Redis rate limiter error, using local limits: {str(e)}")
+            return self.fallback.hit_sync(key, limit, period)
+
+    def _gcra_script(self):
+        if self._script is None:
+            self._redis = aioredis.from_url(self.redis_url)
+            self._script = self._redis.register_script(_GCRA_SCRIPT)
+        return self._script
+
+rate_limiter = (
+    RedisRateLimiter(settings.REDIS_URL)
+    if settings.RATE_LIMIT_BACKEND == "redis"
+    else InMemoryRateLimiter()
+)
@@ -0,0 +1,171 @@
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import hashlib
+import zlib
+from redis import asyncio as aioredis
+from .config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Scope of superusers' responses, which may include every organization
+ALL_ORGANIZATIONS = "*"
+
+# Response headers stored with the body and replayed on hits
+CACHED_HEADERS = ("x-next-cursor",)
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: Optional[str]
+    etag: str
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def from_body(
+        cls,
+        body: bytes,
+        media_type: Optional[str],
+        headers: Iterable[Tuple[str, str]] = ()
+    ) -> "CachedResponse":
+        return cls(
+            body,
+            media_type,
+            f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            tuple(headers)
+        )
+
+class ResponseCache:
+    """Compressed GET responses in Redis, invalidated by version counters.
+
+    Every entry records the versions of the counters its scope depends on.
+    A write bumps its organization's counter (and the ``all`` counter read by
+    superusers' entries), so every cached response of that organization goes
+    stale at once without scanning keys; stale entries simply expire. Writes
+    whose organization is unknown bump the ``global`` counter, which every
+    organization's entries also depend on.
+    """
+
+    def __init__(self, redis_url: str, ttl: int, prefix: str = "respcache"):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = None
+
+    async def lookup(
+        self,
+        key: str,
+        scope: Optional[str] = None
+    ) -> Tuple[Optional[CachedResponse], Optional[bytes]]:
+        """Fresh entry for ``key`` (or None) and the current ``all`` version.
+
+        With ``scope``, an entry stored under any other scope is a miss.
+
+        The version is read before the response is rendered on a miss so
+        ``store`` can tell whether a write landed in the meantime; it is None
+        if Redis is unavailable.
+        """
+        try:
+            redis = self._client()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(self._entry_key(key))
+                pipe.get(self._version_key(ALL_ORGANIZATIONS))
+                entry, generation = await pipe.execute()
+            generation = generation or b"0"
+            if not entry:
+                return None, generation
+            entry_scope = entry[b"scope"].decode()
+            if scope is not None and entry_scope != scope:
+                return None, generation
+
+            dependencies = self._dependencies(entry_scope)
+            if dependencies == [self._version_key(ALL_ORGANIZATIONS)]:
+                versions = [generation]
+            else:
+                versions = await redis.mget(dependencies)
+            if entry[b"versions"] != _encode_versions(versions):
+                return None, generation
+
+            return CachedResponse(
+                zlib.decompress(entry[b"body"]),
+                entry[b"media_type"].decode() or None,
+                entry[b"etag"].decode(),
+                tuple(
+                    (field[len(b"header:"):].decode(), value.decode())
+                    for field, value in entry.items()
+                    if field.startswith(b"header:")
+                )
+            ), generation
+        except Exception as e:
+            logger.error(f"Response cache lookup error: {str(e)}")
+            return None, None
+
+    async def store(
+        self,
+        key: str,
+        scope: str,
+        response: CachedResponse,
+        generation: bytes
+    ) -> bool:
+        """Cache a response rendered after ``lookup`` returned ``generation``"""
+        try:
+            redis = self._client()
+            dependencies = self._dependencies(scope)
+            current, *versions = await redis.mget(
+                [self._version_key(ALL_ORGANIZATIONS)] + dependencies
+            )
+            if (current or b"0") != generation:
+                return False  # A write landed while rendering; the body may predate it
+
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(self._entry_key(key), mapping={
+                    "scope": scope,
+                    "versions": _encode_versions(versions),
+                    "etag": response.etag,
+                    "media_type": response.media_type or "",
+                    "body": zlib.compress(response.body, 6),
+                    **{f"header:{name}": value for name, value in response.headers}
+                })
+                pipe.expire(self._entry_key(key), self.ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Response cache store error: {str(e)}")
+            return False
+
+    async def invalidate(self, organization_id: Optional[str] = None) -> None:
+        """Expire cached responses of an organization (of every one if None)"""
+        if organization_id is None or organization_id == ALL_ORGANIZATIONS:
+            bumped = [self._version_key("global"), self._version_key(ALL_ORGANIZATIONS)]
+        else:
+            bumped = [self._version_key(organization_id), self._version_key(ALL_ORGANIZATIONS)]
+        try:
+            async with self._client().pipeline(transaction=True) as pipe:
+                for version_key in bumped:
+                    pipe.incr(version_key)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Response cache invalidation error: {str(e)}")
+
+    def _dependencies(self, scope: str) -> List[str]:
+        if scope == ALL_ORGANIZATIONS:
+            return [self._version_key(ALL_ORGANIZATIONS)]
+        return [self._version_key(scope), self._version_key("global")]
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _version_key(self, scope: str) -> str:
+        if scope == ALL_ORGANIZATIONS:
+            return f"{self.prefix}:version:all"
+        if scope == "global":
+            return f"{self.prefix}:version:global"
+        return f"{self.prefix}:version:org:{scope}"
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+def _encode_versions(versions: Sequence[Optional[bytes]]) -> bytes:
+    return b",".join(version or b"0" for version in versions)
+
+response_cache = ResponseCache(settings.REDIS_URL, ttl=settings.RESPONSE_CACHE_TTL)
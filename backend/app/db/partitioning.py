@@ -0,0 +1,150 @@
+"""Daily or weekly range partitions for the time-series tables.
+
+security_events and threat_events are partitioned by ``timestamp``
+(migration 004). The maintenance job keeps ``PARTITION_PREMAKE`` partitions
+ready ahead of the current one, and enforces retention by dropping whole
+partitions whose range ended before the cutoff, which costs no more than
+dropping a table, instead of deleting rows.
+"""
+from datetime import datetime, timedelta
+import asyncio
+from typing import Dict, List, NamedTuple
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> setting holding its retention period in days
+RETENTION_SETTINGS = {
+    "security_events": "METRICS_RETENTION_PERIOD",
+    "threat_events": "ALERT_RETENTION_PERIOD"
+}
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+class Partition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+def interval_delta(interval: str) -> timedelta:
+    if interval == "day":
+        return timedelta(days=1)
+    if interval == "week":
+        return timedelta(weeks=1)
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+def partition_start(moment: datetime, interval: str) -> datetime:
+    """Start of the partition holding ``moment`` (weeks start on Monday)"""
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m%d}"
+
+def list_partitions(conn: Connection, table: str) -> List[Partition]:
+    rows = conn.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+    """), {"table": table})
+    partitions = []
+    for name, bound in rows:
+        match = _BOUNDS.search(bound or "")
+        if match:  # A DEFAULT partition has no range
+            partitions.append(Partition(
+                name,
+                datetime.fromisoformat(match.group(1)),
+                datetime.fromisoformat(match.group(2))
+            ))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+def create_partitions(
+    conn: Connection,
+    table: str,
+    start: datetime,
+    end: datetime,
+    interval: str
+) -> List[str]:
+    """Create the missing partitions covering [start, end); returns their names.
+
+    Ranges already covered by an existing partition are skipped, so changing
+    the interval only affects partitions created from then on.
+    """
+    existing = list_partitions(conn, table)
+    step = interval_delta(interval)
+    created = []
+    lower = partition_start(start, interval)
+    while lower < end:
+        covering = next((p for p in existing if p.start <= lower < p.end), None)
+        if covering is not None:
+            lower = covering.end
+            continue
+        # Stop short of the next existing partition so ranges never overlap
+        upper = min([lower + step] + [p.start for p in existing if lower < p.start < lower + step])
+        name = partition_name(table, lower)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{lower.isoformat(sep=' ')}') TO ('{upper.isoformat(sep=' ')}')"
+        ))
+        created.append(name)
+        lower = upper
+    return created
+
+def drop_partitions_before(conn: Connection, table: str, cutoff: datetime) -> List[str]:
+    """Drop partitions whose whole range is older than ``cutoff``"""
+    dropped = []
+    for partition in list_partitions(conn, table):
+        if partition.end <= cutoff:
+            conn.execute(text(f"DROP TABLE IF EXISTS {partition.name}"))
+            dropped.append(partition.name)
+    return dropped
+
+def maintain(conn: Connection, now: datetime = None) -> Dict[str, Dict[str, List[str]]]:
+    """Create upcoming partitions and drop expired ones for every partitioned table"""
+    now = now or datetime.utcnow()
+    interval = settings.PARTITION_INTERVAL
+    horizon = partition_start(now, interval) + interval_delta(interval) * (settings.PARTITION_PREMAKE + 1)
+    summary = {}
+    for table, retention_setting in RETENTION_SETTINGS.items():
+        cutoff = now - timedelta(days=getattr(settings, retention_setting))
+        summary[table] = {
+            "created": create_partitions(conn, table, now, horizon, interval),
+            "dropped": drop_partitions_before(conn, table, cutoff)
+        }
+    return summary
+
+async def run_partition_maintenance() -> None:
+    """Partition upkeep and retention on the async engine"""
+    # Imported here so migrations can use this module without creating engines
+    from app.db.session import async_engine
+
+    if async_engine.dialect.name != "postgresql":
+        return
+    try:
+        async with async_engine.begin() as conn:
+            summary = await conn.run_sync(maintain)
+        for table, changes in summary.items():
+            if changes["created"] or changes["dropped"]:
+                logger.info(
+                    f"Partitions of {table}: created {changes['created']}, dropped {changes['dropped']}"
+                )
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {str(e)}")
+
+async def maintain_partitions(interval: float = settings.PARTITION_MAINTENANCE_INTERVAL) -> None:
+    """Rerun maintenance every ``interval`` seconds while the process lives.
+
+    Partitions are only made ``PARTITION_PREMAKE`` intervals ahead, so a
+    process started once would run out of them.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await run_partition_maintenance()
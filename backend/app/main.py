@@ -1,13 +1,22 @@
 from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.sql import text
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.middleware.cache import CacheMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, async_engine
 from app.db.init_db import init_db
+from app.db.partitioning import maintain_partitions, run_partition_maintenance
+from app.services.ml.inference import inference_executor
+from app.services.ml.registry import model_registry
+from app.services.ml import feature_kernels
+from app.services.rule_engine import rule_engine
+from app.services.event_queue import event_queue
+from app.services.threat_analysis import threat_analysis_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -18,9 +27,36 @@ async def lifespan(app: FastAPI):
         init_db(db)
     finally:
         db.close()
+    # Inserts fail without a partition for today
+    await run_partition_maintenance()
+    partition_maintenance = asyncio.create_task(
+        maintain_partitions(settings.PARTITION_MAINTENANCE_INTERVAL)
+    )
+    feature_kernels.warm_up()
+    inference_executor.start()
+    if settings.MODEL_REFRESH_INTERVAL > 0:
+        model_registry.watch(settings.MODEL_REFRESH_INTERVAL)
+    if settings.RULES_PATH:
+        await rule_engine.load_rules(settings.RULES_PATH)
+        if settings.RULES_RELOAD_INTERVAL > 0:
+            rule_engine.watch_rules(settings.RULES_RELOAD_INTERVAL)
+    if rule_engine.profiler.enabled:
+        rule_engine.profile_rules()
+    # Ingestion falls back to in-process analysis while Redis is unreachable
+    await event_queue.start(threat_analysis_service.analyze_events)
     yield
     # Shutdown: Clean up resources
     print("Shutting down...")
+    await event_queue.close()
+    await model_registry.close()
+    inference_executor.shutdown()
+    await rule_engine.close()
+    partition_maintenance.cancel()
+    try:
+        await partition_maintenance
+    except asyncio.CancelledError:
+        pass
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -37,6 +73,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cache list responses (inside rate limiting, so cache hits still count)
+app.add_middleware(CacheMiddleware)
+
 # Add rate limiting
 app.add_middleware(RateLimitMiddleware)
 
@@ -62,18 +101,16 @@ async def health_check():
     
     try:
         # Check database connection
-        db = SessionLocal()
-        try:
-            # Try to execute a simple query
-            db.execute(text("SELECT 1"))
-            health_status["database"] = "healthy"
-            health_status["components"]["database"] = "healthy"
-        except Exception as e:
-            health_status["database"] = f"unhealthy: {str(e)}"
-            health_status["components"]["database"] = "unhealthy"
-            health_status["status"] = "degraded"
-        finally:
-            db.close()
+        async with async_engine.connect() as conn:
+            try:
+                # Try to execute a simple query
+                await conn.execute(text("SELECT 1"))
+                health_status["database"] = "healthy"
+                health_status["components"]["database"] = "healthy"
+            except Exception as e:
+                health_status["database"] = f"unhealthy: {str(e)}"
+                health_status["components"]["database"] = "unhealthy"
+                health_status["status"] = "degraded"
     except Exception as e:
         health_status["database"] = f"connection_failed: {str(e)}"
         health_status["components"]["database"] = "unavailable"
@@ -1,27 +1,96 @@
 from fastapi import Request
-from ..services.cache import RedisCache
-from ..core.config import settings
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response, StreamingResponse
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 import hashlib
+from ..api.deps import authenticate_cache_scope
+from ..core.config import settings
+from ..core.metrics import MetricsCollector
+from ..core.response_cache import CACHED_HEADERS, CachedResponse, response_cache
+
+class CacheMiddleware(BaseHTTPMiddleware):
+    """Serves GET requests on the configured list endpoints from Redis.
+
+    Entries are keyed by path, query and credentials, and scoped to the
+    caller's organization, which the auth dependency records in
+    ``request.state.cache_scope``. Credentials are authenticated before
+    every lookup and a hit is served only under the caller's current scope,
+    so expired, revoked or deactivated callers fall through to the endpoint.
+    Any other request on those paths bumps that organization's version,
+    expiring its cached lists; a successful unauthenticated write expires
+    every organization's. Responses carry an ETag, and a matching
+    ``If-None-Match`` is answered with 304.
+    """
+
+    def __init__(
+        self,
+        app,
+        cache=None,
+        authenticate: Optional[Callable[[Request], Awaitable[Optional[str]]]] = None
+    ):
+        super().__init__(app)
+        self.cache = cache or response_cache
+        self.authenticate = authenticate or authenticate_cache_scope
+        self.max_bytes = settings.RESPONSE_CACHE_MAX_BYTES
+        self.cache_enabled_paths = sorted(settings.RESPONSE_CACHE_PATHS, key=len, reverse=True)
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        route = self._route(request.url.path)
+        if route is None or not settings.RESPONSE_CACHE_ENABLED:
+            return await call_next(request)
+
+        if request.method != "GET":
+            response = await call_next(request)
+            scope = getattr(request.state, "cache_scope", None)
+            if scope is not None:
+                await self.cache.invalidate(scope)
+            elif response.status_code < 400:
+                # An unauthenticated write (e.g. creating an organization)
+                # could belong to anyone
+                await self.cache.invalidate(None)
+            return response
+
+        scope = await self.authenticate(request)
+        if scope is None:
+            # Let the endpoint reject (or serve) the request itself
+            return await call_next(request)
+
+        cache_key = self._generate_cache_key(request)
+        cached, generation = await self.cache.lookup(cache_key, scope)
+        if cached is not None:
+            return self._cached_response(request, route, cached, "hit")
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
 
-class CacheMiddleware:
-    def __init__(self):
-        self.cache = RedisCache()
-        self.cache_enabled_paths = {
-            "/api/v1/organizations": ["GET"],
-            "/api/v1/agents": ["GET"],
-            "/api/v1/events": ["GET"],
-        }
-
-    def _should_cache(self, request: Request) -> bool:
-        """Check if request should be cached"""
-        if request.method not in ["GET"]:
-            return False
-            
-        return any(
-            path in request.url.path
-            for path in self.cache_enabled_paths
-            if request.method in self.cache_enabled_paths[path]
+        chunks, complete = await self._read_body(response)
+        if not complete:
+            MetricsCollector.record_response_cache(route, "too_large")
+            return StreamingResponse(
+                _prepend(chunks, response.body_iterator),
+                status_code=response.status_code,
+                headers=MutableHeaders(raw=list(response.raw_headers))
+            )
+
+        cached = CachedResponse.from_body(
+            b"".join(chunks),
+            response.headers.get("content-type"),
+            [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers]
         )
+        # Only if the endpoint authorized the request under the same scope
+        if getattr(request.state, "cache_scope", None) == scope and generation is not None:
+            await self.cache.store(cache_key, scope, cached, generation)
+        return self._cached_response(request, route, cached, "miss", raw_headers=response.raw_headers)
+
+    def _route(self, path: str) -> Optional[str]:
+        for prefix in self.cache_enabled_paths:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return prefix
+        return None
 
     def _generate_cache_key(self, request: Request) -> str:
         """Generate unique cache key for request"""
@@ -30,30 +99,58 @@ class CacheMiddleware:
             str(request.query_params),
             request.headers.get("authorization", "")
         ]
-        return hashlib.md5(
+        return hashlib.sha256(
             "|".join(key_parts).encode()
         ).hexdigest()
 
-    async def __call__(self, request: Request, call_next):
-        if not self._should_cache(request):
-            return await call_next(request)
+    async def _read_body(self, response: Response) -> Tuple[List[bytes], bool]:
+        """Buffer the body up to ``max_bytes``; False if it is larger"""
+        chunks, size = [], 0
+        async for chunk in response.body_iterator:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(response.charset)
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_bytes:
+                return chunks, False
+        return chunks, True
 
-        cache_key = self._generate_cache_key(request)
-        
-        # Try to get from cache
-        cached_response = await self.cache.get(cache_key)
-        if cached_response is not None:
-            return JSONResponse(content=cached_response)
+    def _cached_response(
+        self,
+        request: Request,
+        route: str,
+        cached: CachedResponse,
+        result: str,
+        raw_headers=None
+    ) -> Response:
+        # Kept as raw pairs so repeated headers (e.g. Set-Cookie) survive
+        if raw_headers is None:
+            headers = MutableHeaders()
+            for name, value in cached.headers:
+                headers.append(name, value)
+        else:
+            headers = MutableHeaders(raw=list(raw_headers))
+        del headers["content-length"]
+        headers.update({
+            "ETag": cached.etag,
+            "Cache-Control": "private, no-cache",
+            "Vary": "Authorization"
+        })
+        etags = _etags(request.headers.get("if-none-match", ""))
+        if cached.etag in etags or "*" in etags:
+            MetricsCollector.record_response_cache(route, "not_modified")
+            return Response(status_code=304, headers=headers)
 
-        # Get fresh response
-        response = await call_next(request)
-        
-        # Cache the response
-        if response.status_code == 200:
-            await self.cache.set(
-                cache_key,
-                response.body,
-                settings.CACHE_TTL
-            )
+        MetricsCollector.record_response_cache(route, result)
+        del headers["content-type"]
+        return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+def _etags(header: str) -> List[str]:
+    # Weak comparison, as If-None-Match requires
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
 
-        return response 
\ No newline at end of file
+async def _prepend(chunks: List[bytes], rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+    async for chunk in rest:
+        yield chunk
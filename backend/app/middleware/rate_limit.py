@@ -1,34 +1,53 @@
-from fastapi import Request, HTTPException
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import Response
-import time
+from typing import Tuple
+import math
 from ..core.config import settings
+from ..core.metrics import MetricsCollector
+from ..core.rate_limit import rate_limiter
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
+    def __init__(self, app, limiter=None):
         super().__init__(app)
-        self.requests = {}
+        self.limiter = limiter or rate_limiter
         self.window = 60  # 1 minute window
+        route_limits = {path: settings.ML_RATE_LIMIT_PER_MINUTE for path in settings.ML_RATE_LIMIT_PATHS}
+        route_limits.update(settings.RATE_LIMIT_ROUTES)
+        # Longest prefix first, so specific routes override general ones
+        self.route_limits = sorted(
+            route_limits.items(),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
         
     async def dispatch(
         self, request: Request, call_next: RequestResponseEndpoint
     ) -> Response:
-        client_ip = request.client.host
-        current_time = time.time()
+        client_ip = request.client.host if request.client else "unknown"
+        route, limit = self._route_limit(request.url.path)
         
-        # Clean old requests
-        self.requests = {
-            ip: times for ip, times in self.requests.items()
-            if current_time - times[-1] < self.window
+        result = await self.limiter.hit(f"{route}:{client_ip}", limit, self.window)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(result.remaining)
         }
-        
-        # Check rate limit
-        if client_ip in self.requests:
-            if len(self.requests[client_ip]) >= settings.RATE_LIMIT_PER_MINUTE:
-                raise HTTPException(status_code=429, detail="Too many requests")
-            self.requests[client_ip].append(current_time)
-        else:
-            self.requests[client_ip] = [current_time]
+        if not result.allowed:
+            MetricsCollector.record_rate_limited(route)
+            headers["Retry-After"] = str(max(1, math.ceil(result.retry_after)))
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers=headers
+            )
             
         response = await call_next(request)
-        return response 
\ No newline at end of file
+        response.headers.update(headers)
+        return response
+        
+    def _route_limit(self, path: str) -> Tuple[str, int]:
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
+        return "default", settings.RATE_LIMIT_PER_MINUTE
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey
+from sqlalchemy import Column, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -20,4 +20,7 @@ class Agent(BaseModel):
     # Relationships
     organization = relationship("Organization", back_populates="agents")
     user = relationship("User", back_populates="agents")
-    events = relationship("Event", back_populates="agent") 
\ No newline at end of file
+    events = relationship("Event", back_populates="agent")
+
+# Keyset pagination index (migration 003)
+Index("ix_agents_org_created", Agent.organization_id, Agent.created_at, Agent.id)
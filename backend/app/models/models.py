@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db.base_class import Base
@@ -48,14 +48,23 @@ class Agent(Base):
 
 class SecurityEvent(Base):
     __tablename__ = "security_events"
+    # Daily/weekly partitions are created and dropped by app.db.partitioning
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     id = Column(String, primary_key=True, default=generate_uuid)
     agent_id = Column(String, ForeignKey("agents.id"))
+    # The agent's organization, copied so listings need no join (migration 003)
+    organization_id = Column(String, ForeignKey("organizations.id"))
     event_type = Column(String, nullable=False)
     severity = Column(Integer)
     description = Column(String)
     raw_data = Column(JSON)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    # Part of the primary key because it is the partition key
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
     is_resolved = Column(Boolean, default=False)
 
-    agent = relationship("Agent", back_populates="events") 
\ No newline at end of file
+    agent = relationship("Agent", back_populates="events")
+
+# Keyset pagination indexes (migration 003)
+Index("ix_security_events_org_timestamp", SecurityEvent.organization_id, SecurityEvent.timestamp.desc(), SecurityEvent.id.desc())
+Index("ix_security_events_agent_timestamp", SecurityEvent.agent_id, SecurityEvent.timestamp.desc(), SecurityEvent.id.desc())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON
+from sqlalchemy import Column, String, DateTime, Boolean, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -19,4 +19,7 @@ class Organization(BaseModel):
 
     # Relationships
     users = relationship("User", back_populates="organization")
-    agents = relationship("Agent", back_populates="organization") 
\ No newline at end of file
+    agents = relationship("Agent", back_populates="organization")
+
+# Keyset pagination index (migration 003)
+Index("ix_organizations_created", Organization.created_at, Organization.id)
@@ -1,5 +1,5 @@
 from typing import Generic, TypeVar, Type, Optional, List, Union, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from pydantic import BaseModel
 from ..db.base_class import Base
@@ -13,14 +13,14 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
-    async def get(self, db: Session, id: Any) -> Optional[ModelType]:
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         query = select(self.model).where(self.model.id == id)
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
     async def get_multi(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         skip: int = 0,
         limit: int = 100,
@@ -39,7 +39,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     async def create(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         obj_in: CreateSchemaType
     ) -> ModelType:
@@ -52,7 +52,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     async def update(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
@@ -72,7 +72,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await db.refresh(db_obj)
         return db_obj
 
-    async def delete(self, db: Session, *, id: Any) -> ModelType:
+    async def delete(self, db: AsyncSession, *, id: Any) -> ModelType:
         obj = await self.get(db, id)
         if not obj:
             raise AppError(status_code=404, detail="Object not found")
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..models.models import Organization, User
 from ..schemas import schemas
@@ -9,14 +9,14 @@ class OrganizationRepository(BaseRepository[Organization, schemas.OrganizationCr
     def __init__(self):
         super().__init__(Organization)
 
-    async def get_by_api_key(self, db: Session, api_key: str) -> Optional[Organization]:
+    async def get_by_api_key(self, db: AsyncSession, api_key: str) -> Optional[Organization]:
         query = select(self.model).where(self.model.api_key == api_key)
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
     async def get_users(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         org_id: str,
         skip: int = 0,
@@ -30,7 +30,7 @@ class OrganizationRepository(BaseRepository[Organization, schemas.OrganizationCr
 
     async def get_active_organizations(
         self,
-        db: Session,
+        db: AsyncSession,
         skip: int = 0,
         limit: int = 100
     ) -> List[Organization]:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -63,4 +63,50 @@ class SecurityEvent(SecurityEventCreate):
     is_resolved: bool
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class SecurityEventBatchResult(BaseModel):
+    ids: List[str]
+    accepted: int
+    queued: int  # handed to the durable analysis queue; 0 if analyzed in-process instead
+
+# Detection rule schemas
+class Rule(BaseModel):
+    id: str
+    name: str
+    description: str = ""
+    severity: str
+    conditions: List[Dict[str, Any]]
+    actions: List[Dict[str, Any]] = []
+    logic: Optional[str] = "AND"
+
+class RuleSetInfo(BaseModel):
+    content_hash: str
+    rule_count: int
+    created_at: datetime
+    source: Optional[str] = None
+    cost_ordered: bool = False
+    changed: Optional[bool] = None
+
+class RuleConditionStats(BaseModel):
+    condition: str  # Position in the rule as written, e.g. "2.0"
+    evaluations: int
+    pass_rate: float
+    mean_time: float
+
+class RuleStats(BaseModel):
+    rule_id: str
+    evaluations: int
+    matches: int
+    profiled_evaluations: int
+    mean_time: float
+    p99_time: float
+    estimated_total_time: float
+    conditions: List[RuleConditionStats] = []
+
+class RuleMatch(BaseModel):
+    rule_id: str
+    event_id: str
+    timestamp: datetime
+    severity: str
+    matched_conditions: List[Dict[str, Any]]
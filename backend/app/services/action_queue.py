@@ -0,0 +1,128 @@
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+import asyncio
+import time
+from ..core.config import settings
+from ..core.metrics import MetricsCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+class ActionQueue:
+    """Bounded queue of rule actions run by background worker tasks.
+
+    ``submit`` never waits: it enqueues the action and returns, so rule
+    evaluation latency does not depend on how slow a firewall or alerting
+    API is. Actions sharing a dedup key (e.g. ``("block", ip)``) are
+    coalesced for a window after the first one is queued. When the queue is
+    full new actions are dropped and counted rather than blocking the
+    caller. ``close`` gives queued actions up to ``drain_timeout`` seconds
+    to run before stopping the workers.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        workers: int,
+        dedup_window: float,
+        timeout: float,
+        drain_timeout: float = settings.RULE_ACTION_DRAIN_TIMEOUT
+    ):
+        self.max_size = max_size
+        self.workers = workers
+        self.dedup_window = dedup_window
+        self.timeout = timeout
+        self.drain_timeout = drain_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._recent: Dict[Hashable, float] = {}
+
+    def submit(
+        self,
+        action_type: str,
+        job: Job,
+        dedup_key: Optional[Hashable] = None,
+        dedup_window: Optional[float] = None
+    ) -> bool:
+        """Queue ``job`` for a worker; returns False if it was coalesced or dropped"""
+        now = time.monotonic()
+        if dedup_key is not None and self._recent.get(dedup_key, 0.0) > now:
+            MetricsCollector.record_rule_action(action_type, "coalesced")
+            return False
+
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((action_type, job, dedup_key, now))
+        except asyncio.QueueFull:
+            logger.warning(f"Rule action queue full, dropping {action_type} action")
+            MetricsCollector.record_rule_action(action_type, "dropped")
+            return False
+
+        if dedup_key is not None:
+            window = self.dedup_window if dedup_window is None else dedup_window
+            self._recent[dedup_key] = now + window
+            self._prune(now)
+        MetricsCollector.record_rule_action(action_type, "queued")
+        MetricsCollector.update_rule_action_queue_depth(self._queue.qsize())
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued action has run"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Run the queued actions (up to ``drain_timeout``), then stop the workers"""
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self.join(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Rule action queue not drained after {self.drain_timeout}s, "
+                    f"abandoning {self._queue.qsize()} queued actions"
+                )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        MetricsCollector.update_rule_action_queue_depth(0)
+
+    def _ensure_workers(self) -> None:
+        if self._workers and not all(worker.done() for worker in self._workers):
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    def _prune(self, now: float) -> None:
+        # Expired windows are only swept once the table outgrows the queue
+        if len(self._recent) > self.max_size:
+            self._recent = {key: expires for key, expires in self._recent.items() if expires > now}
+
+    async def _run(self) -> None:
+        while True:
+            action_type, job, dedup_key, queued_at = await self._queue.get()
+            started = time.monotonic()
+            MetricsCollector.record_rule_action_queue_time(action_type, started - queued_at)
+            MetricsCollector.update_rule_action_queue_depth(self._queue.qsize())
+            try:
+                await asyncio.wait_for(job(), self.timeout)
+                MetricsCollector.record_rule_action(action_type, "succeeded")
+            except Exception as e:
+                logger.error(f"Error executing {action_type} action: {str(e)}")
+                MetricsCollector.record_rule_action(action_type, "failed")
+                # Let the next matching event retry instead of waiting out the window
+                if dedup_key is not None:
+                    self._recent.pop(dedup_key, None)
+            finally:
+                MetricsCollector.record_rule_action_duration(action_type, time.monotonic() - started)
+                self._queue.task_done()
+
+action_queue = ActionQueue(
+    max_size=settings.RULE_ACTION_QUEUE_SIZE,
+    workers=settings.RULE_ACTION_WORKERS,
+    dedup_window=settings.RULE_ACTION_DEDUP_WINDOW,
+    timeout=settings.RULE_ACTION_TIMEOUT,
+    drain_timeout=settings.RULE_ACTION_DRAIN_TIMEOUT
+)
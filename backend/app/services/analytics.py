@@ -2,8 +2,11 @@ from typing import Dict, Any, List
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+from sqlalchemy import select
 from ..schemas.schemas import AnalyticsReport, ThreatMetrics, SystemMetrics
 from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.models import SecurityEvent
 import logging
 
 logger = logging.getLogger(__name__)
@@ -150,22 +153,19 @@ class AnalyticsService:
         end_date: datetime
     ) -> List[Dict]:
         """Get threat data from database"""
-        query = """
-            SELECT *
-            FROM security_events
-            WHERE organization_id = :org_id
-            AND timestamp BETWEEN :start_date AND :end_date
-        """
+        # Bare comparisons on the partition key let PostgreSQL skip every
+        # partition outside [start_date, end_date]
+        events = SecurityEvent.__table__
+        query = select(events).where(
+            events.c.organization_id == organization_id,
+            events.c.timestamp >= start_date,
+            events.c.timestamp <= end_date
+        )
         
-        async with self.db.acquire() as conn:
-            result = await conn.fetch(
-                query,
-                org_id=organization_id,
-                start_date=start_date,
-                end_date=end_date
-            )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(query)
             
-        return [dict(row) for row in result]
+        return [dict(row) for row in result.mappings()]
         
     def _analyze_threat_trends(self, threats: List[Dict]) -> Dict[str, Any]:
         """Analyze trends in threat data"""
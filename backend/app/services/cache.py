@@ -1,59 +1,4 @@
-from typing import Optional, Any
-import json
-from redis import Redis
-from ..core.config import settings
+# The cache lives in core/cache.py; RedisCache is kept for existing imports
+from ..core.cache import CacheManager as RedisCache, cache_manager
 
-class RedisCache:
-    def __init__(self):
-        self.redis_client = Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            decode_responses=True
-        )
-        self.default_ttl = 3600  # 1 hour
-
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        try:
-            data = self.redis_client.get(key)
-            return json.loads(data) if data else None
-        except Exception as e:
-            logger.error(f"Redis get error: {str(e)}")
-            return None
-
-    async def set(
-        self,
-        key: str,
-        value: Any,
-        ttl: int = None
-    ) -> bool:
-        """Set value in cache"""
-        try:
-            return self.redis_client.setex(
-                key,
-                ttl or self.default_ttl,
-                json.dumps(value)
-            )
-        except Exception as e:
-            logger.error(f"Redis set error: {str(e)}")
-            return False
-
-    async def delete(self, key: str) -> bool:
-        """Delete value from cache"""
-        try:
-            return bool(self.redis_client.delete(key))
-        except Exception as e:
-            logger.error(f"Redis delete error: {str(e)}")
-            return False
-
-    async def clear_pattern(self, pattern: str) -> bool:
-        """Clear all keys matching pattern"""
-        try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return bool(self.redis_client.delete(*keys))
-            return True
-        except Exception as e:
-            logger.error(f"Redis clear pattern error: {str(e)}")
-            return False 
\ No newline at end of file
+__all__ = ["RedisCache", "cache_manager"]
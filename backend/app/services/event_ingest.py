@@ -0,0 +1,83 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Annotated, Any, Dict, Iterator, List, Optional, Sequence
+from pydantic import Field, TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from ..models.models import SecurityEvent, generate_uuid
+from ..schemas import schemas
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+class EventBatchTooLarge(ValueError):
+    """A batch holds more events than allowed"""
+
+@lru_cache(maxsize=None)
+def _event_batch(max_events: Optional[int]) -> TypeAdapter:
+    return TypeAdapter(Annotated[List[schemas.SecurityEventCreate], Field(max_length=max_events)])
+
+def parse_event_batch(
+    body: bytes,
+    content_type: str = "application/json",
+    max_events: Optional[int] = None
+) -> List[schemas.SecurityEventCreate]:
+    """Validate a JSON array or NDJSON body of events in a single pass.
+
+    NDJSON lines are spliced into one array so the whole batch goes through
+    pydantic's JSON validator at once; blank lines are skipped. Raises
+    EventBatchTooLarge before validating any event if there are more than
+    ``max_events``, and pydantic.ValidationError with the offending indices.
+    """
+    if content_type.split(";", 1)[0].strip().lower() in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        if max_events is not None and len(lines) > max_events:
+            raise EventBatchTooLarge(max_events)
+        body = b"[" + b",".join(lines) + b"]"
+    try:
+        return _event_batch(max_events).validate_json(body)
+    except ValidationError as e:
+        # Validation stops at the first event past the limit
+        if any(error["type"] == "too_long" and not error["loc"] for error in e.errors()):
+            raise EventBatchTooLarge(max_events) from e
+        raise
+
+def chunked(rows: Sequence[Dict[str, Any]], size: int) -> Iterator[Sequence[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+async def bulk_insert_events(
+    db: AsyncSession,
+    agent_id: str,
+    organization_id: str,
+    events: Sequence[schemas.SecurityEventCreate],
+    chunk_size: int = None
+) -> List[Dict[str, Any]]:
+    """Write events with one multi-row INSERT per chunk and a single commit.
+
+    Ids and timestamps are assigned here, so nothing has to be read back;
+    the returned rows are exactly what was stored.
+    """
+    timestamp = datetime.utcnow()
+    rows = [
+        {
+            "id": generate_uuid(),
+            "agent_id": agent_id,
+            "organization_id": organization_id,
+            "event_type": event.event_type,
+            "severity": int(event.severity),
+            "description": event.description,
+            "raw_data": event.raw_data,
+            "timestamp": timestamp,
+            "is_resolved": False
+        }
+        for event in events
+    ]
+    table = SecurityEvent.__table__
+    try:
+        for chunk in chunked(rows, chunk_size or settings.EVENT_BATCH_CHUNK_SIZE):
+            await db.execute(table.insert().values(list(chunk)))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return rows
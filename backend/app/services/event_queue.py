@@ -0,0 +1,278 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import os
+import socket
+import uuid
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+from ..core.config import settings
+from ..core.metrics import MetricsCollector
+from ..schemas.schemas import SecurityEvent
+import logging
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[List[SecurityEvent]], Awaitable[Any]]
+Entry = Tuple[bytes, SecurityEvent]
+
+class EventQueue:
+    """Durable queue of events awaiting analysis, on a Redis stream.
+
+    Ingestion appends events with ``publish``; analysis workers in any
+    process read them through one consumer group, so each event is handled
+    by one worker and survives restarts until it is acknowledged. Workers
+    take up to ``batch_size`` entries at a time. If a batch fails its
+    entries are retried one by one, so one bad event cannot hold back the
+    rest; failed entries stay pending and are claimed again once idle for
+    ``claim_idle_ms``. After ``max_deliveries`` attempts an entry moves to
+    the ``<stream>:dead`` stream, as does any entry that cannot be decoded.
+
+    Entries not yet delivered plus those pending are exported as the event
+    queue gauge. Beyond ``max_lag`` the queue reports itself saturated so
+    ingestion can push back instead of growing the backlog.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        stream: str,
+        group: str,
+        workers: int,
+        batch_size: int,
+        block_ms: int,
+        claim_idle_ms: int,
+        max_deliveries: int,
+        max_lag: int,
+        max_len: int,
+        lag_interval: float
+    ):
+        self.redis_url = redis_url
+        self.stream = stream
+        self.dead_letter_stream = f"{stream}:dead"
+        self.group = group
+        self.workers = workers
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.max_lag = max_lag
+        self.max_len = max_len
+        self.lag_interval = lag_interval
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lag = 0
+        self._tasks: List[asyncio.Task] = []
+        self._redis = None
+
+    @property
+    def saturated(self) -> bool:
+        return self.lag >= self.max_lag
+
+    async def publish(self, events: Sequence[SecurityEvent]) -> bool:
+        """Append events in one round trip; False if Redis is unavailable"""
+        if not events:
+            return True
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                for event in events:
+                    # Approximate trimming is a safety net; backpressure keeps the stream far below it
+                    pipe.xadd(
+                        self.stream,
+                        {"event": event.model_dump_json()},
+                        maxlen=self.max_len,
+                        approximate=True
+                    )
+                await pipe.execute()
+            self.lag += len(events)
+            MetricsCollector.record_event_queue("published", len(events))
+            return True
+        except Exception as e:
+            logger.error(f"Event queue publish error: {str(e)}")
+            return False
+
+    async def start(self, handler: Handler) -> None:
+        """Start the workers and lag monitor; they wait out Redis outages themselves"""
+        self._tasks.append(asyncio.create_task(self._monitor_lag()))
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._work(handler)))
+
+    async def close(self) -> None:
+        """Stop the workers; unacknowledged entries are retried by other consumers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def ensure_group(self) -> None:
+        try:
+            await self._client().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def poll(self, handler: Handler) -> int:
+        """Handle one batch: stale pending entries first, then new ones; returns its size"""
+        entries = await self._claim_stale()
+        if not entries:
+            entries = await self._read_new()
+        if entries:
+            await self._handle(handler, entries)
+        return len(entries)
+
+    async def refresh_lag(self) -> int:
+        """Entries waiting for or in processing, from the consumer group's counters"""
+        redis = self._client()
+        try:
+            groups = await redis.xinfo_groups(self.stream)
+        except ResponseError:  # No stream yet
+            groups = []
+        for group in groups:
+            name = group["name"].decode() if isinstance(group["name"], bytes) else group["name"]
+            if name == self.group:
+                lag = group.get("lag")
+                if lag is None:  # Before Redis 7, or after trimming: count the whole stream
+                    lag = await redis.xlen(self.stream)
+                self.lag = lag + group["pending"]
+                break
+        else:
+            # No worker has created the group yet, so nothing was delivered
+            self.lag = await redis.xlen(self.stream)
+        MetricsCollector.update_event_queue_size(self.lag)
+        return self.lag
+
+    async def _claim_stale(self) -> List[Entry]:
+        redis = self._client()
+        pending = await redis.xpending_range(
+            self.stream,
+            self.group,
+            min="-",
+            max="+",
+            count=self.batch_size,
+            idle=self.claim_idle_ms
+        )
+        retry = {}
+        for entry in pending:
+            if entry["times_delivered"] >= self.max_deliveries:
+                await self._dead_letter(entry["message_id"], entry["times_delivered"])
+            else:
+                retry[entry["message_id"]] = entry["times_delivered"] + 1
+        if not retry:
+            return []
+        claimed = await redis.xclaim(
+            self.stream, self.group, self.consumer, self.claim_idle_ms, list(retry)
+        )
+        MetricsCollector.record_event_queue("retried", len(claimed))
+        return await self._decode(claimed, retry)
+
+    async def _read_new(self) -> List[Entry]:
+        response = await self._client().xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.batch_size,
+            block=self.block_ms if self.block_ms > 0 else None
+        )
+        if not response:
+            return []
+        _, messages = response[0]
+        return await self._decode(messages)
+
+    async def _handle(self, handler: Handler, entries: List[Entry]) -> None:
+        try:
+            await handler([event for _, event in entries])
+            await self._ack([entry_id for entry_id, _ in entries])
+            return
+        except Exception as e:
+            if len(entries) == 1:
+                logger.error(f"Event analysis failed, will retry: {str(e)}")
+                MetricsCollector.record_event_queue("failed")
+                return
+            logger.warning(f"Event batch of {len(entries)} failed, retrying one by one: {str(e)}")
+        for entry in entries:
+            await self._handle(handler, [entry])
+
+    async def _ack(self, entry_ids: List[bytes]) -> None:
+        await self._client().xack(self.stream, self.group, *entry_ids)
+        self.lag = max(0, self.lag - len(entry_ids))
+        MetricsCollector.record_event_queue("acked", len(entry_ids))
+
+    async def _dead_letter(self, entry_id: bytes, deliveries: int, fields: Optional[dict] = None) -> None:
+        redis = self._client()
+        if fields is None:
+            messages = await redis.xrange(self.stream, min=entry_id, max=entry_id)
+            fields = messages[0][1] if messages else None
+        async with redis.pipeline(transaction=True) as pipe:
+            if fields:
+                pipe.xadd(self.dead_letter_stream, {
+                    **fields,
+                    "source_id": entry_id,
+                    "deliveries": deliveries
+                })
+            pipe.xack(self.stream, self.group, entry_id)
+            await pipe.execute()
+        logger.error(f"Event {entry_id!r} dead-lettered after {deliveries} deliveries")
+        MetricsCollector.record_event_queue("dead_lettered")
+
+    async def _decode(
+        self,
+        messages: List[Tuple[bytes, dict]],
+        deliveries: Optional[Dict[bytes, int]] = None
+    ) -> List[Entry]:
+        """Events of the delivered entries; undecodable ones are dead-lettered at once"""
+        entries = []
+        for entry_id, fields in messages:
+            if not fields:  # Trimmed from the stream while pending
+                continue
+            try:
+                entries.append((entry_id, SecurityEvent.model_validate_json(fields[b"event"])))
+            except Exception as e:
+                # Retrying cannot fix it, and it must not take the rest of the batch with it
+                logger.error(f"Undecodable event {entry_id!r}: {str(e)}")
+                await self._dead_letter(entry_id, (deliveries or {}).get(entry_id, 1), fields)
+        return entries
+
+    async def _work(self, handler: Handler) -> None:
+        group_ready = False
+        while True:
+            try:
+                if not group_ready:
+                    await self.ensure_group()
+                    group_ready = True
+                if not await self.poll(handler) and self.block_ms <= 0:
+                    await asyncio.sleep(1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis unavailable (or the group was deleted): recreate the
+                # group if needed and try again shortly
+                logger.error(f"Event queue worker error: {str(e)}")
+                group_ready = False
+                await asyncio.sleep(1.0)
+
+    async def _monitor_lag(self) -> None:
+        while True:
+            try:
+                await self.refresh_lag()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event queue lag check error: {str(e)}")
+            await asyncio.sleep(self.lag_interval)
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+event_queue = EventQueue(
+    redis_url=settings.REDIS_URL,
+    stream=settings.EVENT_QUEUE_STREAM,
+    group=settings.EVENT_QUEUE_GROUP,
+    workers=settings.EVENT_QUEUE_WORKERS,
+    batch_size=settings.EVENT_QUEUE_BATCH_SIZE,
+    block_ms=settings.EVENT_QUEUE_BLOCK_MS,
+    claim_idle_ms=settings.EVENT_QUEUE_CLAIM_IDLE_MS,
+    max_deliveries=settings.EVENT_QUEUE_MAX_DELIVERIES,
+    max_lag=settings.EVENT_QUEUE_MAX_LAG,
+    max_len=settings.EVENT_QUEUE_MAX_LEN,
+    lag_interval=settings.EVENT_QUEUE_LAG_INTERVAL
+)
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import aiohttp
 from datetime import datetime
 import json
@@ -8,7 +8,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 class SIEMIntegration:
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        # A shared session reuses connections; without one each call opens its own
+        self.session = session
         self.siem_url = settings.SIEM_URL
         self.api_key = settings.SIEM_API_KEY
         self.headers = {
@@ -19,22 +21,27 @@ class SIEMIntegration:
     async def send_event(self, event: Dict[str, Any]):
         """Send event to SIEM system"""
         try:
+            if self.session is not None:
+                return await self._post(self.session, event)
             async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.siem_url}/events",
-                    headers=self.headers,
-                    json=self._format_event(event)
-                ) as response:
-                    if response.status not in (200, 201):
-                        logger.error(
-                            f"Failed to send event to SIEM: {await response.text()}"
-                        )
-                    return await response.json()
+                return await self._post(session, event)
                     
         except Exception as e:
             logger.error(f"Error sending event to SIEM: {str(e)}")
             raise
             
+    async def _post(self, session: aiohttp.ClientSession, event: Dict[str, Any]):
+        async with session.post(
+            f"{self.siem_url}/events",
+            headers=self.headers,
+            json=self._format_event(event)
+        ) as response:
+            if response.status not in (200, 201):
+                logger.error(
+                    f"Failed to send event to SIEM: {await response.text()}"
+                )
+            return await response.json()
+            
     def _format_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Format event for SIEM system"""
         return {
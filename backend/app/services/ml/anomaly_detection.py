@@ -1,6 +1,9 @@
+from typing import Dict, Any, Iterable, Optional
 import numpy as np
+import joblib
 from sklearn.ensemble import IsolationForest
 from .base import BaseMLModel
+from .feature_extraction import reservoir_sample
 from ...core.config import settings
 import logging
 
@@ -12,6 +15,11 @@ class AnomalyDetector(BaseMLModel):
         self.threshold = settings.ANOMALY_THRESHOLD
         
     def load_model(self):
+        try:
+            return joblib.load(f"{self.model_path}.pkl")
+        except FileNotFoundError:
+            logger.warning("No saved anomaly detector found; starting untrained")
+        
         try:
             return IsolationForest(
                 n_estimators=100,
@@ -43,6 +51,22 @@ class AnomalyDetector(BaseMLModel):
             logger.error(f"Error in anomaly detection: {str(e)}")
             raise
             
+    def score_batch(self, features: np.ndarray) -> np.ndarray:
+        """Probability-like anomaly scores for every row (lower is more anomalous)"""
+        scores = self.model.score_samples(features)
+        return np.exp(scores) / (1 + np.exp(scores))
+        
+    def train_from_stream(
+        self,
+        blocks: Iterable[np.ndarray],
+        max_samples: Optional[int] = None
+    ):
+        """Train on a uniform sample of a FeatureExtractor.iter_features stream"""
+        X = reservoir_sample(blocks, max_samples or settings.TRAINING_MAX_SAMPLES)
+        if not len(X):
+            raise ValueError("Cannot train anomaly detector on an empty stream")
+        self.train(X)
+        
     def train(self, X: np.ndarray, y: np.ndarray = None):
         """Train the anomaly detector"""
         try:
@@ -50,4 +74,12 @@ class AnomalyDetector(BaseMLModel):
             self.save()
         except Exception as e:
             logger.error(f"Error training anomaly detector: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+            
+    def save(self):
+        """Save the anomaly detector"""
+        try:
+            joblib.dump(self.model, f"{self.model_path}.pkl")
+        except Exception as e:
+            logger.error(f"Error saving anomaly detector: {str(e)}")
+            raise
@@ -0,0 +1,151 @@
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import numpy as np
+from .inference import inference_executor
+from ...core.config import settings
+from ...core.metrics import MetricsCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Coalesce concurrent inference requests into one vectorized model pass.
+
+    Callers submit feature rows and await their own results. A single worker
+    task drains the queue until either ``max_batch_size`` rows are collected
+    or ``max_wait`` seconds have passed since the first row arrived, awaits
+    ``process_batch`` once over the stacked rows, and fans the per-row results
+    back out to the waiting callers.
+
+    Every row must have ``n_features`` columns; when that is not given the
+    first submission fixes it. Mismatched rows are rejected in ``submit``
+    rather than breaking the batch they would land in.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        process_batch: Callable[[np.ndarray], Awaitable[List[Any]]],
+        max_batch_size: int,
+        max_wait: float,
+        n_features: Optional[int] = None
+    ):
+        self.model_name = model_name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.n_features = n_features
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, features: np.ndarray) -> List[Any]:
+        """Queue feature rows for the next batch and wait for their results"""
+        features = np.atleast_2d(features)
+        if features.ndim != 2:
+            raise ValueError(f"Expected 2-D feature rows, got shape {features.shape}")
+        if self.n_features is None:
+            self.n_features = features.shape[1]
+        elif features.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected {self.n_features} features for {self.model_name}, got {features.shape[1]}"
+            )
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, future))
+        MetricsCollector.update_inference_queue_depth(
+            self.model_name,
+            self._queue.qsize()
+        )
+        return await future
+
+    async def close(self) -> None:
+        """Stop the worker task and cancel requests still waiting"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._queue = None
+
+    def _ensure_worker(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            # Keep the existing queue so requests already waiting are served
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            MetricsCollector.update_inference_queue_depth(
+                self.model_name,
+                self._queue.qsize()
+            )
+            try:
+                await self._process(batch)
+            except Exception as e:
+                # Fail only this batch's callers and keep serving the queue
+                logger.error(f"Error in {self.model_name} batch worker: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _collect_batch(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        batch = [first]
+        rows = first[0].shape[0]
+        deadline = loop.time() + self.max_wait
+
+        while rows < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            batch.append(item)
+            rows += item[0].shape[0]
+
+        return batch
+
+    async def _process(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        try:
+            stacked = np.vstack([features for features, _ in batch])
+            MetricsCollector.record_inference_batch_size(self.model_name, stacked.shape[0])
+            results = await self.process_batch(stacked)
+        except Exception as e:
+            logger.error(f"Error processing {self.model_name} batch: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for features, future in batch:
+            count = features.shape[0]
+            if not future.done():
+                future.set_result(results[offset:offset + count])
+            offset += count
+
+async def _detect_zero_day_batch(features: np.ndarray) -> List[Any]:
+    # Dispatched by name so the worker resolves the currently served detector
+    return await inference_executor.run("zero_day", "detect_zero_day_rows", features)
+
+zero_day_batcher = MicroBatcher(
+    "zero_day",
+    _detect_zero_day_batch,
+    max_batch_size=settings.ZERO_DAY_BATCH_MAX_SIZE,
+    max_wait=settings.ZERO_DAY_BATCH_MAX_WAIT_MS / 1000
+)
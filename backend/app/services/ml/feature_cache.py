@@ -0,0 +1,170 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from collections import OrderedDict
+import hashlib
+import inspect
+import json
+import threading
+import numpy as np
+from redis import asyncio as aioredis
+from ...core.config import settings
+from ...core.metrics import MetricsCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+ComputeResult = Union[np.ndarray, Awaitable[np.ndarray]]
+
+class FeatureCache:
+    """Extracted feature vectors keyed by a fingerprint of their source fields.
+
+    The first tier is an in-process LRU bounded by the total bytes of the
+    stored vectors. The optional second tier is Redis, holding packed
+    float32 bytes so that every worker reuses the same extraction. Keys
+    include the stage name and its feature-schema version, so changing how
+    a stage extracts features never serves stale vectors.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        redis_url: Optional[str] = None,
+        ttl: int = 3600,
+        prefix: str = "features"
+    ):
+        self.max_bytes = max_bytes
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._redis = None
+
+    @staticmethod
+    def fingerprint(stage: str, schema_version: str, fields: Dict[str, Any]) -> str:
+        """Stable key for an event's relevant fields (independent of dict order)"""
+        payload = json.dumps(fields, sort_keys=True, default=str, separators=(",", ":"))
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{stage}:{schema_version}:{digest}"
+
+    async def get_or_compute(
+        self,
+        stage: str,
+        schema_version: str,
+        fields: Dict[str, Any],
+        compute: Callable[[], ComputeResult]
+    ) -> np.ndarray:
+        """Cached feature vector for one event; ``compute`` runs on a miss"""
+        async def compute_missing(missing: List[int]) -> np.ndarray:
+            result = compute()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        return (await self.get_or_compute_many(stage, schema_version, [fields], compute_missing))[0]
+
+    async def get_or_compute_many(
+        self,
+        stage: str,
+        schema_version: str,
+        fields: List[Dict[str, Any]],
+        compute: Callable[[List[int]], ComputeResult]
+    ) -> np.ndarray:
+        """Cached feature rows for many events.
+
+        ``compute`` receives the positions of the events that missed both
+        tiers and returns their feature rows in the same order, so misses
+        are still extracted in a single batch.
+        """
+        if not fields:
+            return np.empty((0, 0), dtype=np.float32)
+        keys = [self.fingerprint(stage, schema_version, f) for f in fields]
+        rows: List[Optional[np.ndarray]] = [self._get_local(key) for key in keys]
+        local_hits = sum(row is not None for row in rows)
+
+        missing = [i for i, row in enumerate(rows) if row is None]
+        redis_hits = 0
+        if missing and self.redis_url:
+            for i, row in zip(missing, await self._get_remote([keys[i] for i in missing])):
+                if row is not None:
+                    rows[i] = row
+                    self._put_local(keys[i], row)
+                    redis_hits += 1
+            missing = [i for i in missing if rows[i] is None]
+
+        if missing:
+            computed = compute(missing)
+            if inspect.isawaitable(computed):
+                computed = await computed
+            computed = np.atleast_2d(np.asarray(computed, dtype=np.float32))
+            for i, row in zip(missing, computed):
+                rows[i] = row
+                self._put_local(keys[i], row)
+            if self.redis_url:
+                await self._set_remote({keys[i]: rows[i] for i in missing})
+
+        MetricsCollector.record_feature_cache_lookups(stage, "hit_local", local_hits)
+        MetricsCollector.record_feature_cache_lookups(stage, "hit_redis", redis_hits)
+        MetricsCollector.record_feature_cache_lookups(stage, "miss", len(missing))
+        return np.vstack(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        MetricsCollector.update_feature_cache_bytes(0)
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._entries.get(key)
+            if row is not None:
+                self._entries.move_to_end(key)
+            return row
+
+    def _put_local(self, key: str, row: np.ndarray) -> None:
+        row = np.array(row, dtype=np.float32)
+        row.setflags(write=False)  # Shared between callers
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = row
+            self._bytes += row.nbytes
+
+            # Evict least recently used vectors until back under budget
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+            size = self._bytes
+        MetricsCollector.update_feature_cache_bytes(size)
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    async def _get_remote(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        try:
+            values = await self._client().mget([f"{self.prefix}:{key}" for key in keys])
+        except Exception as e:
+            logger.error(f"Feature cache Redis get error: {str(e)}")
+            return [None] * len(keys)
+        return [
+            np.frombuffer(value, dtype=np.float32) if value else None
+            for value in values
+        ]
+
+    async def _set_remote(self, rows: Dict[str, np.ndarray]) -> None:
+        try:
+            pipeline = self._client().pipeline(transaction=False)
+            for key, row in rows.items():
+                pipeline.setex(f"{self.prefix}:{key}", self.ttl, row.astype(np.float32).tobytes())
+            await pipeline.execute()
+        except Exception as e:
+            logger.error(f"Feature cache Redis set error: {str(e)}")
+
+feature_cache = FeatureCache(
+    max_bytes=settings.FEATURE_CACHE_MAX_BYTES,
+    redis_url=settings.REDIS_URL if settings.FEATURE_CACHE_REDIS_ENABLED else None,
+    ttl=settings.FEATURE_CACHE_TTL
+)
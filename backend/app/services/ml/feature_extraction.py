@@ -1,25 +1,80 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, AsyncIterable, AsyncIterator, Union
+from itertools import islice
+import asyncio
+import hashlib
 import numpy as np
-from sklearn.feature_selection import VarianceThreshold, mutual_info_classif
-from sklearn.preprocessing import StandardScaler, RobustScaler
+from sklearn.feature_selection import mutual_info_classif
+from .streaming_stats import StreamingRobustScaler
 from ...core.config import settings
 import logging
 from datetime import datetime
+import math
 import psutil
-from numba import jit
 import pandas as pd
-from dask import dataframe as dd
+from .feature_kernels import finalize_features
 
 logger = logging.getLogger(__name__)
 
+def reservoir_sample(
+    blocks: Iterable[np.ndarray],
+    max_rows: int,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Uniformly sample up to ``max_rows`` rows from a stream of feature blocks.
+    
+    Lets training jobs consume iter_features over an unbounded source while
+    holding at most ``max_rows`` rows in memory.
+    """
+    rng = np.random.default_rng(seed)
+    reservoir: Optional[np.ndarray] = None
+    filled = 0
+    seen = 0
+    
+    for block in blocks:
+        if reservoir is None:
+            reservoir = np.empty((max_rows, block.shape[1]), dtype=block.dtype)
+            
+        # Fill the reservoir first, then replace rows with decreasing probability
+        take = min(max_rows - filled, len(block))
+        reservoir[filled:filled + take] = block[:take]
+        filled += take
+        seen += take
+        
+        rest = block[take:]
+        if len(rest):
+            slots = rng.integers(0, np.arange(seen, seen + len(rest)) + 1)
+            keep = slots < max_rows
+            reservoir[slots[keep]] = rest[keep]
+            seen += len(rest)
+            
+    if reservoir is None:
+        return np.empty((0, 0), dtype=np.float32)
+    return reservoir[:filled]
+
 class FeatureExtractor:
     def __init__(self):
-        self.scaler = RobustScaler()  # More robust to outliers
+        self.scaler = StreamingRobustScaler()  # More robust to outliers
         self.feature_selector = None
         self.selected_features: List[int] = []
         self.feature_names: List[str] = []
+        self.vocabularies: Dict[str, List[str]] = self._default_vocabularies()
+        self._index_vocabularies()
         self._initialize_metrics()
         
+    @staticmethod
+    def _default_vocabularies() -> Dict[str, List[str]]:
+        """Seed vocabularies; codes are 1-based list positions (0 means missing)"""
+        vocabularies = {feature: [] for feature in settings.CATEGORICAL_FEATURES}
+        vocabularies["protocol"] = ["tcp", "udp", "icmp"]
+        return vocabularies
+        
+    def _index_vocabularies(self) -> None:
+        """Rebuild the value -> code lookup kept next to each vocabulary"""
+        self._vocabulary_codes: Dict[str, Dict[str, int]] = {
+            feature: {value: code for code, value in enumerate(vocabulary, start=1)}
+            for feature, vocabulary in self.vocabularies.items()
+        }
+        
     def _initialize_metrics(self):
         """Initialize performance metrics tracking"""
         self.metrics = {
@@ -29,12 +84,10 @@ class FeatureExtractor:
             "last_update": datetime.now()
         }
         
-    @jit(nopython=True)
-    def _normalize_numeric(self, value: float) -> float:
-        """Normalize numeric values with JIT compilation"""
-        if np.isnan(value) or np.isinf(value):
-            return 0.0
-        return float(value)
+    @staticmethod
+    def _normalize_numeric(value: float) -> float:
+        """Map NaN/inf to 0 for the single-event path"""
+        return value if math.isfinite(value) else 0.0
         
     def extract_network_features(self, event_data: Dict[str, Any]) -> np.ndarray:
         """Extract network-related features with enhanced error handling"""
@@ -56,14 +109,67 @@ class FeatureExtractor:
             return np.zeros(len(settings.NETWORK_FEATURES))
             
     def _encode_categorical(self, value: str, feature_name: str) -> float:
-        """Enhanced categorical encoding with feature-specific handling"""
-        if feature_name == "protocol":
-            protocols = {"tcp": 1, "udp": 2, "icmp": 3}
-            return float(protocols.get(value.lower(), 0))
-        elif feature_name == "flags":
-            return float(len(value))  # Count flags as a feature
-        else:
-            return float(hash(value) % 100)  # Fallback to hash encoding
+        """Encode one string value the way _column_to_numeric encodes a column.
+        
+        Numeric strings are parsed as numbers; anything else goes through
+        the feature's vocabulary.
+        """
+        number = float(pd.to_numeric(value, errors="coerce"))
+        if not math.isnan(number):
+            return number
+        normalized = str(value).strip().lower()
+        codes = self._vocabulary_codes.get(feature_name, {})
+        code = codes.get(normalized)
+        if code is not None:
+            return float(code)
+        return float(len(codes) + 1 + self._hash_bucket(normalized))
+        
+    def _encode_categories(self, values: np.ndarray, feature_name: str) -> np.ndarray:
+        """Vectorized vocabulary lookup for an array of distinct string values.
+        
+        Known values map to their 1-based vocabulary position. Unknown values
+        map to one of CATEGORICAL_HASH_BUCKETS buckets placed after the
+        vocabulary, using a blake2b digest so every worker and restart
+        produces the same code (unlike the salted builtin ``hash``).
+        """
+        normalized = pd.Index([str(value).strip().lower() for value in values], dtype=object)
+        vocabulary = self.vocabularies.get(feature_name, [])
+        positions = pd.Index(vocabulary, dtype=object).get_indexer(normalized)
+        
+        codes = (positions + 1).astype(np.float64)
+        for k in np.flatnonzero(positions < 0):
+            codes[k] = len(vocabulary) + 1 + self._hash_bucket(normalized[k])
+        return codes
+        
+    @staticmethod
+    def _hash_bucket(value: str) -> int:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % settings.CATEGORICAL_HASH_BUCKETS
+        
+    def fit_vocabularies(self, df: pd.DataFrame) -> None:
+        """Extend the categorical vocabularies with values seen in training data.
+        
+        Existing codes never change; new values are appended in sorted order
+        so the result does not depend on event order within a batch.
+        """
+        for _, feature in self._feature_columns():
+            if feature not in df.columns or pd.api.types.is_numeric_dtype(df[feature].dtype):
+                continue
+                
+            uniques = pd.unique(df[feature].dropna())
+            categorical = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").isna().to_numpy()
+            if not categorical.any():
+                continue
+                
+            vocabulary = self.vocabularies.setdefault(feature, [])
+            codes = self._vocabulary_codes.setdefault(feature, {})
+            new_values = sorted({
+                str(value).strip().lower() for value in uniques[categorical]
+            } - codes.keys())
+            room = settings.CATEGORICAL_MAX_VOCABULARY - len(vocabulary)
+            for value in new_values[:max(room, 0)]:
+                vocabulary.append(value)
+                codes[value] = len(vocabulary)
             
     def extract_system_features(self, event_data: Dict[str, Any]) -> np.ndarray:
         """Extract system-related features with validation"""
@@ -134,13 +240,18 @@ class FeatureExtractor:
             
         try:
             if settings.FEATURE_SELECTION_METHOD == "variance":
-                if self.feature_selector is None:
-                    self.feature_selector = VarianceThreshold(threshold=0.01)
-                    self.feature_selector.fit(X)
-                    self.selected_features = self.feature_selector.get_support(indices=True)
+                if not len(self.selected_features):
+                    # Prefer the streaming statistics over whichever X came first
+                    if self.scaler.n_samples_seen_:
+                        variances = self.scaler.var_
+                    else:
+                        variances = np.var(X, axis=0)
+                    self.selected_features = np.flatnonzero(
+                        variances > settings.FEATURE_VARIANCE_THRESHOLD
+                    )
                 
-                selected_X = self.feature_selector.transform(X)
-                selected_names = [self.feature_names[i] for i in self.selected_features]
+                selected_X = X[:, self.selected_features]
+                selected_names = [self.get_feature_names()[i] for i in self.selected_features]
                 return selected_X, selected_names
                 
             elif settings.FEATURE_SELECTION_METHOD == "mutual_info" and y is not None:
@@ -181,42 +292,29 @@ class FeatureExtractor:
                     max(settings.MIN_BATCH_SIZE, int(available_memory / (1024 * 1024 * 10)))
                 )
                 
-            # Convert to Dask DataFrame for out-of-core processing
             df = pd.DataFrame(events)
-            ddf = dd.from_pandas(df, npartitions=max(1, len(events) // batch_size))
+            if not self.scaler.n_samples_seen_:
+                # First training pass: learn the categorical encodings
+                self.fit_vocabularies(df)
+                
+            # Columnar extraction: one vectorized pass per feature column
+            features = self.extract_features_frame(df)
+            del df
             
-            # Process in parallel with progress tracking
+            # Fold every slice into the streaming statistics before scaling
+            # any of them, so the result does not depend on arrival order
+            for offset in range(0, len(features), batch_size):
+                self.scaler.partial_fit(features[offset:offset + batch_size])
+                
             processed_features = []
             total_batches = int(np.ceil(len(events) / batch_size))
             
-            for i, batch_df in enumerate(ddf.partitions):
-                batch = batch_df.compute().to_dict('records')
-                batch_features = []
-                
-                for event in batch:
-                    network_features = self.extract_network_features(event)
-                    system_features = self.extract_system_features(event)
-                    user_features = self.extract_user_features(event)
-                    
-                    combined = self.combine_features(
-                        network_features,
-                        system_features,
-                        user_features
-                    )
-                    batch_features.append(combined)
-                    
-                batch_features = np.array(batch_features)
-                
-                # Incremental scaling for memory efficiency
-                if not self.scaler.n_samples_seen_:
-                    batch_features = self.scaler.fit_transform(batch_features)
-                else:
-                    batch_features = self.scaler.transform(batch_features)
-                    
+            for i, offset in enumerate(range(0, len(features), batch_size)):
+                batch_features = self.scaler.transform(features[offset:offset + batch_size])
                 processed_features.append(batch_features)
                 
                 # Update metrics
-                self._update_metrics(len(batch), start_time)
+                self._update_metrics(len(batch_features), start_time)
                 
                 # Log progress
                 if (i + 1) % max(1, total_batches // 10) == 0:
@@ -228,6 +326,147 @@ class FeatureExtractor:
             logger.error(f"Error in batch processing: {str(e)}")
             raise
             
+    def merge(self, other: "FeatureExtractor") -> None:
+        """Fold in the scaling statistics gathered by another worker's extractor"""
+        self.scaler.merge(other.scaler)
+        
+    def iter_features(
+        self,
+        source: Iterable[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+        scale: bool = False
+    ) -> Iterator[np.ndarray]:
+        """Stream float32 feature blocks from any iterable of events.
+        
+        At most ``chunk_size`` events are held at a time, so peak memory is
+        independent of the size of the source (CSV reader, DB cursor, ...).
+        Every block has ``chunk_size`` rows except possibly the last. With
+        ``scale`` the already fitted scaler is applied to each block.
+        """
+        chunk_size = chunk_size or settings.MAX_BATCH_SIZE
+        events = iter(source)
+        
+        while True:
+            chunk = list(islice(events, chunk_size))
+            if not chunk:
+                return
+            yield self._extract_chunk(chunk, scale)
+            
+    async def aiter_features(
+        self,
+        source: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]],
+        chunk_size: Optional[int] = None,
+        scale: bool = False
+    ) -> AsyncIterator[np.ndarray]:
+        """Async variant of iter_features for async sources such as Redis streams.
+        
+        Extraction runs in the default executor so the event loop keeps
+        serving requests while large sources are processed.
+        """
+        chunk_size = chunk_size or settings.MAX_BATCH_SIZE
+        loop = asyncio.get_running_loop()
+        chunk: List[Dict[str, Any]] = []
+        
+        async for event in self._aiter_events(source):
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                yield await loop.run_in_executor(None, self._extract_chunk, chunk, scale)
+                chunk = []
+                
+        if chunk:
+            yield await loop.run_in_executor(None, self._extract_chunk, chunk, scale)
+            
+    @staticmethod
+    async def _aiter_events(
+        source: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if hasattr(source, "__aiter__"):
+            async for event in source:
+                yield event
+        else:
+            for event in source:
+                yield event
+                
+    def _extract_chunk(self, chunk: List[Dict[str, Any]], scale: bool) -> np.ndarray:
+        start_time = datetime.now()
+        features = self.extract_features_frame(pd.DataFrame.from_records(chunk))
+        if scale:
+            features = self.scaler.transform(features)
+        self._update_metrics(len(features), start_time)
+        return features.astype(np.float32, copy=False)
+        
+    def extract_features_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Columnar equivalent of the per-event extract_*/combine_features path.
+        
+        Each configured feature maps onto one DataFrame column; encoding,
+        NaN/inf scrubbing, range clipping and group weighting each run as a
+        single vectorized operation over the whole column.
+        """
+        columns = self._feature_columns()
+        features = np.zeros((len(df), len(columns)), dtype=np.float64)
+        
+        for j, (group, feature) in enumerate(columns):
+            if feature in df.columns:
+                features[:, j] = self._column_to_numeric(df[feature], feature)
+                
+        lower, upper, weights = self._column_bounds()
+        return finalize_features(features, lower, upper, weights)
+        
+    def _feature_columns(self) -> List[Tuple[str, str]]:
+        """(group, feature) pairs in combined feature-vector order"""
+        return (
+            [("network", f) for f in settings.NETWORK_FEATURES] +
+            [("system", f) for f in settings.SYSTEM_FEATURES] +
+            [("user", f) for f in settings.USER_FEATURES]
+        )
+        
+    def _column_bounds(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-column clip bounds and importance weights"""
+        group_weights = {
+            "network": settings.NETWORK_FEATURE_WEIGHT,
+            "system": settings.SYSTEM_FEATURE_WEIGHT,
+            "user": settings.USER_FEATURE_WEIGHT
+        }
+        columns = self._feature_columns()
+        lower = np.full(len(columns), -np.inf)
+        upper = np.full(len(columns), np.inf)
+        weights = np.empty(len(columns))
+        
+        for j, (group, feature) in enumerate(columns):
+            weights[j] = group_weights[group]
+            if feature in ["cpu_usage", "memory_usage"]:
+                lower[j], upper[j] = 0.0, 100.0  # Ensure 0-100 range
+            elif feature == "process_count":
+                lower[j] = 0.0  # Ensure non-negative
+            elif group == "user":
+                lower[j], upper[j] = 0.0, settings.MAX_USER_FEATURE_VALUE
+                
+        return lower, upper, weights
+        
+    def _column_to_numeric(self, column: pd.Series, feature: str) -> np.ndarray:
+        """Convert one raw event column to floats, encoding strings per unique value"""
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            return column.to_numpy(dtype=np.float64, na_value=np.nan)
+            
+        # Factorize so that encoding work is done once per distinct value
+        # instead of once per event
+        codes, uniques = pd.factorize(column)
+        
+        # Text sources such as CSV readers deliver numbers as strings; parse
+        # those in bulk and only encode what is genuinely categorical
+        try:
+            mapped = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(
+                dtype=np.float64, copy=True
+            )
+        except (TypeError, ValueError):
+            mapped = np.full(len(uniques), np.nan)
+        unparsed = np.flatnonzero(np.isnan(mapped))
+        if len(unparsed):
+            mapped[unparsed] = self._encode_categories(np.asarray(uniques, dtype=object)[unparsed], feature)
+            
+        mapped = np.append(mapped, 0.0)  # Missing values (code -1)
+        return mapped[codes]
+        
     def _update_metrics(self, batch_size: int, start_time: datetime):
         """Update performance metrics"""
         self.metrics["processed_events"] += batch_size
@@ -265,7 +504,8 @@ class FeatureExtractor:
                 "feature_names": self.feature_names,
                 "metrics": self.metrics,
                 "feature_importance": getattr(self, 'feature_importance', {}),
-                "version": "2.0.0",  # Add versioning
+                "vocabularies": self.vocabularies,
+                "version": "2.2.0",  # Add versioning
                 "timestamp": datetime.now().isoformat()
             }
             joblib.dump(state, path)
@@ -283,12 +523,20 @@ class FeatureExtractor:
             # Version compatibility check
             if state.get("version", "1.0.0") >= "2.0.0":
                 self.scaler = state["scaler"]
+                if not isinstance(self.scaler, StreamingRobustScaler):
+                    # Pre-2.2.0 states hold a batch-fitted sklearn scaler that
+                    # cannot be updated incrementally; refit from new data
+                    logger.warning("Discarding non-streaming scaler from saved state")
+                    self.scaler = StreamingRobustScaler()
                 self.feature_selector = state["feature_selector"]
                 self.selected_features = state["selected_features"]
                 self.feature_names = state["feature_names"]
                 self.metrics = state["metrics"]
                 if "feature_importance" in state:
                     self.feature_importance = state["feature_importance"]
+                # 2.0.0 states predate vocabularies and keep the seeded tables
+                self.vocabularies = state.get("vocabularies", self._default_vocabularies())
+                self._index_vocabularies()
                     
                 logger.info(f"Feature extraction state loaded from {path}")
             else:
@@ -0,0 +1,186 @@
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import threading
+import time
+from ...core.config import settings
+from ...core.metrics import MetricsCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _model_registry():
+    # Imported lazily: the registry imports the model modules, which in turn
+    # route their own inference through this executor
+    from .registry import model_registry
+    return model_registry
+
+def _preload_worker_models(model_names: List[str]) -> None:
+    """Process pool initializer: load every served model once per worker"""
+    registry = _model_registry()
+    for name in model_names:
+        try:
+            registry.get(name)
+        except Exception as e:
+            logger.error(f"Error preloading model {name} in worker: {str(e)}")
+
+def _timed_call(target: Any, method: str, args: Tuple) -> Tuple[float, float, Any]:
+    started = time.time()
+    result = getattr(target, method)(*args)
+    return started, time.time(), result
+
+def _call_worker_model(model_name: str, method: str, args: Tuple) -> Tuple[float, float, Any]:
+    """Runs on a pool worker against that worker's registry-served model"""
+    return _timed_call(_model_registry().get(model_name), method, args)
+
+class InferenceExecutor:
+    """Runs CPU-bound model inference off the event loop.
+
+    In ``thread`` mode calls run on a thread pool against the in-process
+    models; sklearn and TensorFlow release the GIL for most of their work.
+    In ``process`` mode every worker process preloads the registry-served
+    models at start-up and calls are dispatched to them by model name;
+    the pool is recycled whenever the registry swaps one of those models.
+    Each model has its own concurrency limit so one slow model cannot
+    occupy every worker.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 4,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 4,
+        preload_models: Optional[List[str]] = None
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Invalid inference executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.concurrency_limits = concurrency_limits or {}
+        self.default_concurrency = default_concurrency
+        self.preload_models = preload_models or []
+        self._executor: Optional[Executor] = None
+        # Explicit model instances cannot be shipped to worker processes
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the worker pool (and preload models in process mode)"""
+        if self._executor is not None:
+            return
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+        logger.info(f"Started {self.mode} inference executor with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for executor in (self._executor, self._thread_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._thread_executor = None
+
+    def restart(self) -> None:
+        """Recycle the pool, e.g. so process workers pick up swapped models.
+
+        The new pool is in place before the old one shuts down, and calls
+        already running on the old pool finish there.
+        """
+        with self._lock:
+            old = self._executor
+            self._executor = self._create_executor()
+        if old is not None:
+            old.shutdown(wait=False)
+        logger.info(f"Restarted {self.mode} inference executor")
+
+    async def run(
+        self,
+        model_name: str,
+        method: str,
+        *args: Any,
+        model: Optional[Any] = None
+    ) -> Any:
+        """Call ``method`` on a model in the worker pool and await the result.
+
+        Without ``model`` the registry-served instance is used. An explicit
+        instance cannot be shipped to a worker process, so it always runs on
+        a thread, even in process mode.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+
+        async with self._semaphore(model_name):
+            if model is None:
+                future = loop.run_in_executor(
+                    self._executor, _call_worker_model, model_name, method, args
+                )
+            else:
+                future = loop.run_in_executor(
+                    self._explicit_executor(), _timed_call, model, method, args
+                )
+
+            started, finished, result = await future
+
+        MetricsCollector.record_inference_queue_time(model_name, started - submitted)
+        MetricsCollector.record_prediction_time(model_name, finished - started)
+        return result
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "process":
+            registry = _model_registry()
+            # Watch the preloaded models' artifacts even though this process
+            # may never load them, and recycle the workers when one changes
+            for name in self.preload_models:
+                registry.track(name)
+            registry.add_swap_listener(self._on_model_swap)
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_preload_worker_models,
+                initargs=(self.preload_models,)
+            )
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference"
+        )
+        # Warm the shared in-process models without blocking the caller
+        executor.submit(_preload_worker_models, self.preload_models)
+        return executor
+
+    def _explicit_executor(self) -> Executor:
+        if self.mode == "thread":
+            return self._executor
+        with self._lock:
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference"
+                )
+            return self._thread_executor
+
+    def _on_model_swap(self, name: str) -> None:
+        # Runs on the registry's refresh thread; restart() holds the lock
+        if self._executor is not None and name in self.preload_models:
+            self.restart()
+
+    def _semaphore(self, model_name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(
+                self.concurrency_limits.get(model_name, self.default_concurrency)
+            )
+            self._semaphores[model_name] = semaphore
+        return semaphore
+
+inference_executor = InferenceExecutor(
+    mode=settings.INFERENCE_EXECUTOR_MODE,
+    max_workers=settings.INFERENCE_WORKERS,
+    concurrency_limits=settings.INFERENCE_CONCURRENCY_LIMITS,
+    default_concurrency=settings.INFERENCE_DEFAULT_CONCURRENCY,
+    preload_models=settings.INFERENCE_PRELOAD_MODELS
+)
@@ -0,0 +1,182 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import threading
+from ...core.config import settings
+from .zero_day_detection import ZeroDayDetector
+from .anomaly_detection import AnomalyDetector
+from .threat_classifier import ThreatClassifier
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """Process-wide registry of warm, shared model instances.
+
+    Models are loaded lazily the first time they are requested and the same
+    instance is handed to every caller in the worker. New versions are loaded
+    off to the side and swapped in with a single reference assignment, so
+    in-flight requests keep using the instance they already hold.
+    ``watch`` checks for new versions in the background.
+
+    Models served by other processes can be ``track``-ed without loading
+    them here; swap listeners are told when any model changes version so
+    those processes can be recycled.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._version_fns: Dict[str, Callable[[], Optional[str]]] = {}
+        self._models: Dict[str, Any] = {}
+        self._versions: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._swap_listeners: List[Callable[[str], None]] = []
+        self._watcher: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        version_fn: Optional[Callable[[], Optional[str]]] = None
+    ) -> None:
+        """Register a loader (and optional artifact version probe) for a model"""
+        self._loaders[name] = loader
+        if version_fn is not None:
+            self._version_fns[name] = version_fn
+
+    def get(self, name: str) -> Any:
+        """Return the shared instance for a model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(name)
+            if model is None:
+                model, version = self._load(name)
+                self._versions[name] = version
+                self._models[name] = model
+            return model
+
+    def track(self, name: str) -> None:
+        """Watch a model's artifact version without loading it in this process"""
+        version_fn = self._version_fns.get(name)
+        if version_fn is not None and name not in self._versions:
+            self._versions[name] = version_fn()
+
+    def add_swap_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(name)`` whenever a model changes version"""
+        if listener not in self._swap_listeners:
+            self._swap_listeners.append(listener)
+
+    def swap(self, name: str, model: Any, version: Optional[str] = None) -> None:
+        """Atomically replace the shared instance for a model"""
+        self._versions[name] = version
+        self._models[name] = model
+        logger.info(f"Swapped model {name} to version {version}")
+        self._notify_swap(name)
+
+    def reload(self, name: str) -> Any:
+        """Load a fresh instance from disk and swap it in"""
+        model, version = self._load(name)
+        self.swap(name, model, version)
+        return model
+
+    def refresh(self, name: str) -> bool:
+        """Reload a model if a newer artifact version has landed on disk"""
+        version_fn = self._version_fns.get(name)
+        if version_fn is None or name not in self._versions:
+            return False
+
+        try:
+            current = version_fn()
+        except Exception as e:
+            logger.error(f"Error probing version for model {name}: {str(e)}")
+            return False
+
+        if current is None or current == self._versions.get(name):
+            return False
+
+        if name not in self._models:
+            # Tracked only: the processes serving it reload from disk
+            self._versions[name] = current
+            self._notify_swap(name)
+            return True
+
+        try:
+            self.reload(name)
+        except Exception as e:
+            # Keep serving the current instance until the artifact is fixed
+            logger.error(f"Error reloading model {name}: {str(e)}")
+            return False
+        return True
+
+    def refresh_all(self) -> Dict[str, bool]:
+        """Check every loaded or tracked model for a newer artifact version"""
+        return {name: self.refresh(name) for name in list(self._versions)}
+
+    def watch(self, interval: float = settings.MODEL_REFRESH_INTERVAL) -> None:
+        """Periodically hot-swap models whose artifacts have changed"""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def close(self) -> None:
+        """Stop the background version checks"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def version(self, name: str) -> Optional[str]:
+        """Version of the currently served instance, if known"""
+        return self._versions.get(name)
+
+    def _notify_swap(self, name: str) -> None:
+        for listener in self._swap_listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                logger.error(f"Error in swap listener for model {name}: {str(e)}")
+
+    async def _watch(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Loading artifacts is blocking disk and CPU work
+                await loop.run_in_executor(None, self.refresh_all)
+            except Exception as e:
+                logger.error(f"Error refreshing models: {str(e)}")
+
+    def _load(self, name: str) -> Tuple[Any, Optional[str]]:
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        version_fn = self._version_fns.get(name)
+        version = version_fn() if version_fn else None
+        try:
+            model = self._loaders[name]()
+        except Exception as e:
+            logger.error(f"Error loading model {name}: {str(e)}")
+            raise
+
+        # Prefer the version the instance actually loaded over the probe
+        version = getattr(model, "version", None) or version
+        logger.info(f"Loaded model {name} (version {version})")
+        return model, version
+
+model_registry = ModelRegistry()
+model_registry.register(
+    "zero_day",
+    ZeroDayDetector,
+    version_fn=ZeroDayDetector.artifact_version
+)
+model_registry.register("anomaly_detector", AnomalyDetector)
+model_registry.register("threat_classifier", ThreatClassifier)
+
+def get_zero_day_detector() -> ZeroDayDetector:
+    """FastAPI dependency returning the shared zero-day detector"""
+    return model_registry.get("zero_day")
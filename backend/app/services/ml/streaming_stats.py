@@ -0,0 +1,235 @@
+from typing import List, Optional, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RunningMoments:
+    """Per-feature count, mean and variance updated batch by batch.
+
+    Uses Welford's algorithm in the pairwise form of Chan et al., so batches
+    and whole workers can be combined without revisiting any data.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean: Optional[np.ndarray] = None
+        self.m2: Optional[np.ndarray] = None
+
+    def update(self, X: np.ndarray) -> None:
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if not len(X):
+            return
+        batch_mean = X.mean(axis=0)
+        batch_m2 = np.square(X - batch_mean).sum(axis=0)
+        self._combine(len(X), batch_mean, batch_m2)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Population variance, matching sklearn's VarianceThreshold"""
+        if not self.count:
+            raise ValueError("No samples seen")
+        return self.m2 / self.count
+
+    def _combine(self, count: int, mean: np.ndarray, m2: np.ndarray) -> None:
+        if not self.count:
+            self.count, self.mean, self.m2 = count, mean.copy(), m2.copy()
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + np.square(delta) * self.count * count / total
+        self.count = total
+
+class TDigest:
+    """Mergeable quantile sketch for one feature (merging t-digest).
+
+    Points and centroids are sorted together and grouped by the integer part
+    of the k1 scale function, which keeps centroids small near the tails and
+    bounds the digest to roughly ``compression`` centroids. Sorting dominates
+    the cost, so callers should update with large arrays at a time.
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))])
+        )
+
+    def merge(self, other: "TDigest") -> None:
+        if not len(other.means):
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights])
+        )
+
+    def quantile(self, q: float) -> float:
+        if not len(self.means):
+            raise ValueError("No samples seen")
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(
+            q * total,
+            np.concatenate([[0.0], centers, [total]]),
+            np.concatenate([[self.min], self.means, [self.max]])
+        ))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means)
+        means, weights = means[order], weights[order]
+
+        q = (np.cumsum(weights) - weights / 2) / weights.sum()
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+        starts = np.flatnonzero(np.concatenate([[True], k[1:] != k[:-1]]))
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+class StreamingRobustScaler:
+    """RobustScaler fitted incrementally from streaming statistics.
+
+    Median and IQR come from one t-digest per feature, and mean and variance
+    (used for variance-based feature selection) from RunningMoments. Every
+    ``partial_fit`` refines the statistics, so scaling no longer depends on
+    which batch happened to arrive first, and scalers fitted on different
+    workers can be merged. Small batches are buffered and folded into the
+    digests ``buffer_size`` rows at a time.
+    """
+
+    def __init__(
+        self,
+        quantile_range: Tuple[float, float] = (25.0, 75.0),
+        compression: int = 100,
+        buffer_size: int = 10000
+    ):
+        self.quantile_range = quantile_range
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.moments = RunningMoments()
+        self.digests: List[TDigest] = []
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+        self._center: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+
+    @property
+    def n_samples_seen_(self) -> int:
+        return self.moments.count
+
+    @property
+    def center_(self) -> np.ndarray:
+        self._check_fitted()
+        self.flush()
+        if self._center is None:
+            self._center = np.array([digest.quantile(0.5) for digest in self.digests])
+        return self._center
+
+    @property
+    def scale_(self) -> np.ndarray:
+        self._check_fitted()
+        self.flush()
+        if self._scale is None:
+            low, high = (q / 100 for q in self.quantile_range)
+            scale = np.array([
+                digest.quantile(high) - digest.quantile(low)
+                for digest in self.digests
+            ])
+            # Constant features are left unscaled, as in sklearn
+            scale[scale == 0.0] = 1.0
+            self._scale = scale
+        return self._scale
+
+    @property
+    def var_(self) -> np.ndarray:
+        return self.moments.variance
+
+    def partial_fit(self, X: np.ndarray) -> "StreamingRobustScaler":
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if not len(X):
+            return self
+        if not self.digests:
+            self.digests = [TDigest(self.compression) for _ in range(X.shape[1])]
+        elif X.shape[1] != len(self.digests):
+            raise ValueError(f"Expected {len(self.digests)} features, got {X.shape[1]}")
+
+        self._buffer.append(X)
+        self._buffered += len(X)
+        self.moments.update(X)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+        return self
+
+    def flush(self) -> None:
+        """Fold buffered rows into the per-feature digests"""
+        if not self._buffered:
+            return
+        # Feature-major copy so every digest sorts a contiguous column
+        columns = np.concatenate(self._buffer).T.copy()
+        self._buffer = []
+        self._buffered = 0
+        for digest, column in zip(self.digests, columns):
+            digest.update(column)
+        self._invalidate()
+
+    def fit(self, X: np.ndarray) -> "StreamingRobustScaler":
+        self.moments = RunningMoments()
+        self.digests = []
+        self._buffer = []
+        self._buffered = 0
+        return self.partial_fit(X)
+
+    def merge(self, other: "StreamingRobustScaler") -> "StreamingRobustScaler":
+        """Fold in the statistics of a scaler fitted elsewhere (e.g. another worker)"""
+        if not other.digests:
+            return self
+        if not self.digests:
+            self.digests = [TDigest(self.compression) for _ in other.digests]
+        elif len(other.digests) != len(self.digests):
+            raise ValueError("Cannot merge scalers fitted on different feature sets")
+
+        self.flush()
+        other.flush()
+        for digest, other_digest in zip(self.digests, other.digests):
+            digest.merge(other_digest)
+        self.moments.merge(other.moments)
+        self._invalidate()
+        return self
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.center_) / self.scale_
+
+    def fit_transform(self, X: np.ndarray) -> np.ndarray:
+        return self.fit(X).transform(X)
+
+    def _check_fitted(self) -> None:
+        if not self.n_samples_seen_:
+            raise ValueError("StreamingRobustScaler has not seen any samples")
+
+    def _invalidate(self) -> None:
+        self._center = None
+        self._scale = None
@@ -1,3 +1,4 @@
+from typing import Dict, Any
 import numpy as np
 import tensorflow as tf
 from .base import BaseMLModel
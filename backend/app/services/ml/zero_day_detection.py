@@ -5,25 +5,58 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.neural_network import MLPRegressor
 from .base import BaseMLModel
+from .inference import inference_executor
 from ...core.config import settings
 import logging
+import json
+import os
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 class ZeroDayDetector(BaseMLModel):
-    def __init__(self):
-        super().__init__(f"{settings.MODEL_PATH}/zero_day_detector")
+    def __init__(self, model_path: Optional[str] = None):
         self.isolation_forest = None
         self.autoencoder = None
-        self.scaler = StandardScaler()
-        self.pca = PCA(n_components=0.95)  # Preserve 95% of variance
+        self.scaler = None
+        self.pca = None
         self.threshold = settings.ZERO_DAY_THRESHOLD
-        self.initialize_models()
-        
+        self.version: Optional[str] = None
+        self.is_fitted = False
+        self.score_stats = self._default_score_stats()
+        # BaseMLModel.__init__ calls load_model(), which either restores the
+        # saved artifacts or falls back to fresh, unfitted models
+        super().__init__(model_path or self.default_model_path())
+
+    @staticmethod
+    def default_model_path() -> str:
+        return f"{settings.MODEL_PATH}/zero_day_detector"
+
+    @staticmethod
+    def _default_score_stats() -> Dict[str, float]:
+        return {
+            "autoencoder_error_scale": 1.0,
+            "pca_error_scale": 1.0,
+            "threshold": settings.ZERO_DAY_THRESHOLD
+        }
+
+    @classmethod
+    def artifact_version(cls, model_path: Optional[str] = None) -> Optional[str]:
+        """Version of the artifacts currently on disk, read from the manifest"""
+        manifest_path = f"{model_path or cls.default_model_path()}_manifest.json"
+        try:
+            with open(manifest_path, "r") as f:
+                return json.load(f).get("version")
+        except (OSError, ValueError):
+            return None
+
     def initialize_models(self):
         """Initialize all detection models"""
         try:
+            self.scaler = StandardScaler()
+            self.pca = PCA(n_components=0.95)  # Preserve 95% of variance
+            self.is_fitted = False
+
             # Initialize Isolation Forest for outlier detection
             self.isolation_forest = IsolationForest(
                 n_estimators=100,  # Reduced from 200 for CPU efficiency
@@ -53,107 +86,126 @@ class ZeroDayDetector(BaseMLModel):
         )
         
     async def detect_zero_day(self, features: np.ndarray) -> Dict[str, Any]:
-        """Detect potential zero-day attacks using multiple methods"""
+        """Detect potential zero-day attacks in a single event"""
+        results = await inference_executor.run(
+            "zero_day",
+            "detect_zero_day_rows",
+            features,
+            model=self
+        )
+        return results[0]
+        
+    def predict(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """Score a batch of events (see detect_zero_day_batch)"""
+        return self.detect_zero_day_batch(features)
+        
+    def detect_zero_day_batch(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """Score many events in one vectorized pass.
+        
+        Every output is per-row: reconstruction errors are normalized against
+        statistics captured at training time rather than against the batch, so
+        a row's verdict does not depend on which other rows it is scored with.
+        """
         try:
+            features = self._validate_features(features)
+            
             # Normalize features
-            scaled_features = self.scaler.transform(features)
+            scaled = self.scaler.transform(features)
             
             # 1. Isolation Forest Detection (efficient on CPU)
-            if_scores = self.isolation_forest.score_samples(scaled_features)
+            if_scores = self.isolation_forest.score_samples(scaled)
             if_probs = np.exp(if_scores) / (1 + np.exp(if_scores))
             
             # 2. Autoencoder Reconstruction
-            reconstructed = self.autoencoder.predict(scaled_features)
-            reconstruction_errors = np.mean(np.square(scaled_features - reconstructed.reshape(scaled_features.shape)), axis=1)
+            ae_residuals = scaled - self.autoencoder.predict(scaled).reshape(scaled.shape)
+            ae_squared = np.square(ae_residuals)
+            ae_errors = ae_squared.mean(axis=1)
             
             # 3. PCA Transformation and Analysis
-            pca_features = self.pca.transform(scaled_features)
-            pca_reconstructed = self.pca.inverse_transform(pca_features)
-            pca_errors = np.mean(np.square(scaled_features - pca_reconstructed), axis=1)
+            pca_reconstructed = self.pca.inverse_transform(self.pca.transform(scaled))
+            pca_residuals = scaled - pca_reconstructed
+            pca_errors = np.square(pca_residuals).mean(axis=1)
             
             # Combine detection methods
-            combined_score = self._combine_detection_scores(
-                if_probs,
-                reconstruction_errors,
-                pca_errors
-            )
+            scores = self._combine_detection_scores(if_probs, ae_errors, pca_errors)
             
-            # Determine if it's a potential zero-day attack
-            is_zero_day = combined_score < self.threshold
+            # Per-row attribution: share of each feature in the reconstruction error
+            attributions = ae_squared / (ae_squared.sum(axis=1, keepdims=True) + 1e-10)
             
             return {
-                "is_zero_day": bool(is_zero_day),
-                "confidence": float(abs(combined_score - self.threshold)),
-                "anomaly_scores": {
-                    "isolation_forest": float(if_probs[0]),
-                    "autoencoder": float(reconstruction_errors[0]),
-                    "pca": float(pca_errors[0])
-                },
-                "details": self._generate_detection_details(
-                    scaled_features,
-                    reconstructed.reshape(scaled_features.shape),
-                    pca_reconstructed
-                )
+                "scores": scores,
+                "is_zero_day": scores < self.threshold,
+                "confidence": np.minimum(np.abs(scores - self.threshold), 1.0),
+                "isolation_forest": if_probs,
+                "autoencoder": ae_errors,
+                "pca": pca_errors,
+                "autoencoder_diff": np.abs(ae_residuals).mean(axis=1),
+                "pca_diff": np.abs(pca_residuals).mean(axis=1),
+                "feature_attributions": attributions
             }
             
         except Exception as e:
             logger.error(f"Error in zero-day detection: {str(e)}")
             raise
             
+    def detect_zero_day_rows(self, features: np.ndarray) -> List[Dict[str, Any]]:
+        """Score many events in one pass and return one API result per row"""
+        batch = self.detect_zero_day_batch(features)
+        timestamp = datetime.utcnow().isoformat()
+        
+        return [
+            {
+                "is_zero_day": bool(batch["is_zero_day"][i]),
+                "confidence": float(batch["confidence"][i]),
+                "anomaly_scores": {
+                    "isolation_forest": float(batch["isolation_forest"][i]),
+                    "autoencoder": float(batch["autoencoder"][i]),
+                    "pca": float(batch["pca"][i])
+                },
+                "details": {
+                    "feature_importance": {
+                        f"feature_{j}": float(weight)
+                        for j, weight in enumerate(batch["feature_attributions"][i])
+                    },
+                    "reconstruction_analysis": {
+                        "autoencoder_diff": float(batch["autoencoder_diff"][i]),
+                        "pca_diff": float(batch["pca_diff"][i])
+                    },
+                    "timestamp": timestamp
+                }
+            }
+            for i in range(len(batch["scores"]))
+        ]
+        
+    def _validate_features(self, features: np.ndarray) -> np.ndarray:
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        expected = getattr(self.scaler, "n_features_in_", settings.FEATURE_DIMENSION)
+        if features.shape[1] != expected:
+            raise ValueError(
+                f"Expected {expected} features, got {features.shape[1]}"
+            )
+        return features
+        
     def _combine_detection_scores(
         self,
         if_scores: np.ndarray,
         ae_errors: np.ndarray,
         pca_errors: np.ndarray
-    ) -> float:
-        """Combine scores from different detection methods"""
-        # Normalize errors to [0, 1] range
-        ae_scores = 1 - (ae_errors / (np.max(ae_errors) + 1e-10))
-        pca_scores = 1 - (pca_errors / (np.max(pca_errors) + 1e-10))
+    ) -> np.ndarray:
+        """Combine scores from different detection methods, row by row"""
+        # 1 at zero error, 0 at the training-time error scale and negative
+        # beyond it, so far outliers keep scoring lower than near ones
+        ae_scores = 1 - ae_errors / self.score_stats["autoencoder_error_scale"]
+        pca_scores = 1 - pca_errors / self.score_stats["pca_error_scale"]
         
         # Weighted combination
         weights = [0.4, 0.4, 0.2]  # Isolation Forest, Autoencoder, PCA
-        combined = (
+        return (
             weights[0] * if_scores +
             weights[1] * ae_scores +
             weights[2] * pca_scores
         )
         
-        return float(np.mean(combined))
-        
-    def _generate_detection_details(
-        self,
-        original: np.ndarray,
-        ae_reconstructed: np.ndarray,
-        pca_reconstructed: np.ndarray
-    ) -> Dict[str, Any]:
-        """Generate detailed analysis of the detection"""
-        return {
-            "feature_importance": self._calculate_feature_importance(
-                original,
-                ae_reconstructed
-            ),
-            "reconstruction_analysis": {
-                "autoencoder_diff": float(np.mean(np.abs(original - ae_reconstructed))),
-                "pca_diff": float(np.mean(np.abs(original - pca_reconstructed)))
-            },
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-    def _calculate_feature_importance(
-        self,
-        original: np.ndarray,
-        reconstructed: np.ndarray
-    ) -> Dict[str, float]:
-        """Calculate feature importance based on reconstruction error"""
-        feature_errors = np.mean(np.square(original - reconstructed), axis=0)
-        total_error = np.sum(feature_errors) + 1e-10  # Avoid division by zero
-        
-        return {
-            f"feature_{i}": float(error / total_error)
-            for i, error in enumerate(feature_errors)
-        }
-        
     async def train(
         self,
         X_train: np.ndarray,
@@ -162,6 +214,11 @@ class ZeroDayDetector(BaseMLModel):
     ):
         """Train the zero-day detection models"""
         try:
+            if X_train.shape[1] != settings.FEATURE_DIMENSION:
+                raise ValueError(
+                    f"Expected {settings.FEATURE_DIMENSION} features, got {X_train.shape[1]}"
+                )
+                
             # Fit the scaler
             self.scaler.fit(X_train)
             X_scaled = self.scaler.transform(X_train)
@@ -175,6 +232,32 @@ class ZeroDayDetector(BaseMLModel):
             # Train Autoencoder
             self.autoencoder.fit(X_scaled, X_scaled)  # Autoencoder reconstructs input
             
+            # Capture the reconstruction error scale on normal traffic so
+            # inference can normalize each row without looking at its batch;
+            # p99 rather than the max, so one noisy row does not set it
+            ae_errors = np.mean(np.square(X_scaled - self.autoencoder.predict(X_scaled)), axis=1)
+            pca_errors = np.mean(
+                np.square(X_scaled - self.pca.inverse_transform(self.pca.transform(X_scaled))),
+                axis=1
+            )
+            self.score_stats = {
+                "autoencoder_error_scale": float(np.percentile(ae_errors, 99)) + 1e-10,
+                "pca_error_scale": float(np.percentile(pca_errors, 99)) + 1e-10
+            }
+            
+            # Flag only as much of the training traffic as the tolerated
+            # false positive rate: the threshold is that low percentile of
+            # the blended scores, which are strictly below it
+            if_scores = self.isolation_forest.score_samples(X_scaled)
+            scores = self._combine_detection_scores(
+                np.exp(if_scores) / (1 + np.exp(if_scores)), ae_errors, pca_errors
+            )
+            self.score_stats["threshold"] = float(np.percentile(
+                scores, settings.MAX_FALSE_POSITIVE_RATE * 100, method="lower"
+            ))
+            self.threshold = self.score_stats["threshold"]
+            self.is_fitted = True
+            
             return {
                 "isolation_forest_score": self.isolation_forest.score_samples(X_scaled).mean(),
                 "autoencoder_loss": self.autoencoder.loss_,
@@ -190,11 +273,25 @@ class ZeroDayDetector(BaseMLModel):
         try:
             import joblib
             
+            os.makedirs(os.path.dirname(self.model_path) or ".", exist_ok=True)
+            
             # Save all components
             joblib.dump(self.isolation_forest, f"{self.model_path}_isolation_forest.pkl")
             joblib.dump(self.autoencoder, f"{self.model_path}_autoencoder.pkl")
             joblib.dump(self.scaler, f"{self.model_path}_scaler.pkl")
             joblib.dump(self.pca, f"{self.model_path}_pca.pkl")
+            joblib.dump(self.score_stats, f"{self.model_path}_score_stats.pkl")
+            
+            # The manifest is written last (and renamed into place) so that
+            # readers watching it never see a partially written version
+            self.version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+            manifest_path = f"{self.model_path}_manifest.json"
+            with open(f"{manifest_path}.tmp", "w") as f:
+                json.dump({
+                    "version": self.version,
+                    "timestamp": datetime.utcnow().isoformat()
+                }, f)
+            os.replace(f"{manifest_path}.tmp", manifest_path)
             
         except Exception as e:
             logger.error(f"Error saving zero-day detector: {str(e)}")
@@ -210,6 +307,18 @@ class ZeroDayDetector(BaseMLModel):
             self.autoencoder = joblib.load(f"{self.model_path}_autoencoder.pkl")
             self.scaler = joblib.load(f"{self.model_path}_scaler.pkl")
             self.pca = joblib.load(f"{self.model_path}_pca.pkl")
+            try:
+                # Artifacts from before the threshold was fitted keep the configured one
+                self.score_stats = {
+                    **self._default_score_stats(),
+                    **joblib.load(f"{self.model_path}_score_stats.pkl")
+                }
+            except FileNotFoundError:
+                logger.warning("Zero-day artifacts have no score statistics; using defaults")
+                self.score_stats = self._default_score_stats()
+            self.threshold = self.score_stats["threshold"]
+            self.version = self.artifact_version(self.model_path)
+            self.is_fitted = True
             
         except Exception as e:
             logger.error(f"Error loading zero-day detector: {str(e)}")
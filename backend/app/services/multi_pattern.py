@@ -0,0 +1,142 @@
+from typing import Dict, FrozenSet, List, Optional
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:  # pyahocorasick is an optional accelerator
+    AHOCORASICK_AVAILABLE = False
+
+# Patterns whose group numbering or names would break once combined
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P[=<]|\(\?<[A-Za-z_]|\(\?\(\d|^\(\?[aiLmsux]+\)")
+
+class MultiPatternMatcher:
+    """Matches many substring literals and regexes against a value in one pass.
+
+    Literals are compiled into a single Aho-Corasick automaton (or, without
+    pyahocorasick, into one overlapping-lookahead regex). Regexes keep
+    ``re.match`` semantics and are combined into one anchored expression of
+    optional named lookaheads, so a single ``match`` call reports every
+    pattern that matches. Pattern ids are stable as patterns are added.
+    """
+
+    def __init__(self):
+        self._literals: List[str] = []
+        self._literal_ids: Dict[str, int] = {}
+        self._regexes: List[str] = []
+        self._regex_ids: Dict[str, int] = {}
+        self._literal_matcher = None
+        self._contained: Dict[str, FrozenSet[int]] = {}
+        self._combined_regex: Optional[re.Pattern] = None
+        self._standalone_regexes: List[tuple] = []
+        self._dirty = False
+
+    def add_literal(self, literal: str) -> int:
+        """Register a substring pattern; identical literals share an id"""
+        if not literal:
+            raise ValueError("Empty literal would match every value")
+        pattern_id = self._literal_ids.get(literal)
+        if pattern_id is None:
+            pattern_id = self._literal_ids[literal] = self._next_id()
+            self._literals.append(literal)
+            self._dirty = True
+        return pattern_id
+
+    def add_regex(self, pattern: str) -> int:
+        """Register a regex (``re.match`` semantics); identical patterns share an id"""
+        pattern_id = self._regex_ids.get(pattern)
+        if pattern_id is None:
+            re.compile(pattern)  # Surface syntax errors when the rule is added
+            pattern_id = self._regex_ids[pattern] = self._next_id()
+            self._regexes.append(pattern)
+            self._dirty = True
+        return pattern_id
+
+    def pattern_id(self, pattern: str, regex: bool = False) -> int:
+        """Id of an already registered literal or regex"""
+        return self._regex_ids[pattern] if regex else self._literal_ids[pattern]
+
+    def match_literals(self, text: str) -> FrozenSet[int]:
+        """Ids of every literal contained in ``text``"""
+        if not self._literals:
+            return frozenset()
+        self._build()
+
+        if AHOCORASICK_AVAILABLE:
+            return frozenset(pattern_id for _, pattern_id in self._literal_matcher.iter(text))
+
+        # The lookahead finds the longest literal starting at each position;
+        # literals contained in it are implied
+        hits = set()
+        for found in self._literal_matcher.findall(text):
+            hits |= self._contained[found]
+        return frozenset(hits)
+
+    def match_regexes(self, text: str) -> FrozenSet[int]:
+        """Ids of every regex that matches at the start of ``text``"""
+        if not self._regexes:
+            return frozenset()
+        self._build()
+
+        hits = set()
+        if self._combined_regex is not None:
+            match = self._combined_regex.match(text)
+            hits.update(
+                int(name[1:]) for name, value in match.groupdict().items()
+                if value is not None
+            )
+        for pattern_id, pattern in self._standalone_regexes:
+            if pattern.match(text):
+                hits.add(pattern_id)
+        return frozenset(hits)
+
+    def build(self) -> None:
+        """Build the automaton and combined regex now instead of on first match"""
+        self._build()
+
+    def _next_id(self) -> int:
+        return len(self._literals) + len(self._regexes)
+
+    def _build(self) -> None:
+        if not self._dirty:
+            return
+
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for literal, pattern_id in self._literal_ids.items():
+                automaton.add_word(literal, pattern_id)
+            if self._literals:
+                automaton.make_automaton()
+            self._literal_matcher = automaton
+        elif self._literals:
+            by_length = sorted(self._literals, key=len, reverse=True)
+            self._literal_matcher = re.compile(
+                "(?=(" + "|".join(map(re.escape, by_length)) + "))"
+            )
+            self._contained = {
+                literal: frozenset(
+                    self._literal_ids[other] for other in self._literals if other in literal
+                )
+                for literal in self._literals
+            }
+
+        combinable, standalone = [], []
+        for pattern in self._regexes:
+            pattern_id = self._regex_ids[pattern]
+            if _UNCOMBINABLE.search(pattern):
+                standalone.append((pattern_id, re.compile(pattern)))
+            else:
+                combinable.append(f"(?:(?=(?P<p{pattern_id}>{pattern})))?")
+        try:
+            self._combined_regex = re.compile("".join(combinable)) if combinable else None
+        except re.error as e:
+            logger.warning(f"Falling back to per-pattern regex matching: {str(e)}")
+            self._combined_regex = None
+            standalone = [
+                (self._regex_ids[pattern], re.compile(pattern)) for pattern in self._regexes
+            ]
+        self._standalone_regexes = standalone
+        self._dirty = False
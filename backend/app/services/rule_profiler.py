@@ -0,0 +1,211 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from collections import Counter
+import math
+import time
+from ..core.config import settings
+from ..core.metrics import MetricsCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# Log-spaced latency buckets: 0.1us * sqrt(2)**i, up to ~1.6s
+_BUCKET_BASE = 1e-7
+_BUCKETS_PER_DOUBLING = 2
+_BUCKET_COUNT = 48
+
+def _latency_bucket(duration: float) -> int:
+    if duration <= _BUCKET_BASE:
+        return 0
+    bucket = int(math.log2(duration / _BUCKET_BASE) * _BUCKETS_PER_DOUBLING) + 1
+    return min(bucket, _BUCKET_COUNT - 1)
+
+def _bucket_upper_bound(bucket: int) -> float:
+    return _BUCKET_BASE * 2 ** (bucket / _BUCKETS_PER_DOUBLING)
+
+class LatencyStats:
+    """Sampled evaluation count, total time and a log-bucketed latency histogram"""
+    __slots__ = ("count", "total_time", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.buckets = [0] * _BUCKET_COUNT
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.buckets[_latency_bucket(duration)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (within a factor of sqrt(2))"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return _bucket_upper_bound(bucket)
+        return _bucket_upper_bound(_BUCKET_COUNT - 1)
+
+class ConditionStats(LatencyStats):
+    """Sampled cost and pass rate of one condition (or nested group) of a rule"""
+    __slots__ = ("label", "passes")
+
+    def __init__(self, label: str):
+        super().__init__()
+        self.label = label
+        self.passes = 0
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passes / self.count if self.count else 0.0
+
+class RuleProfiler:
+    """Per-rule and per-condition evaluation statistics.
+
+    Evaluation and match counts are kept for every event. Timings and
+    condition pass rates come from a sample of events (one in
+    ``1 / sample_rate``), which are evaluated through instrumented copies of
+    the compiled predicates, so the unsampled path pays nothing for timing.
+    Condition statistics are keyed by rule id and condition content and so
+    carry over to recompiled rule sets.
+    """
+
+    def __init__(self, sample_rate: float, min_samples: int):
+        self.sample_every = round(1 / sample_rate) if sample_rate > 0 else 0
+        self.min_samples = min_samples
+        self.evaluations: Counter = Counter()
+        self.matches: Counter = Counter()
+        self.rules: Dict[str, LatencyStats] = {}
+        self.conditions: Dict[Tuple[str, str], ConditionStats] = {}
+        self._events = 0
+        self._exported: Dict[str, Tuple[int, int, int, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_every > 0
+
+    def should_sample(self) -> bool:
+        if not self.sample_every:
+            return False
+        self._events += 1
+        return self._events % self.sample_every == 0
+
+    def count(self, rule_ids: Iterable[str], matched_ids: Iterable[str]) -> None:
+        self.evaluations.update(rule_ids)
+        self.matches.update(matched_ids)
+
+    def profile_rule(self, rule_id: str, predicate: Predicate, event: Dict[str, Any]) -> bool:
+        stats = self.rules.get(rule_id)
+        if stats is None:
+            stats = self.rules[rule_id] = LatencyStats()
+        started = time.perf_counter()
+        matched = predicate(event)
+        stats.record(time.perf_counter() - started)
+        return matched
+
+    def instrument(self, rule_id: str, key: str, label: str, predicate: Predicate) -> Predicate:
+        """Wrap a compiled condition so sampled evaluations record its cost and outcome"""
+        stats = self.conditions.get((rule_id, key))
+        if stats is None:
+            stats = self.conditions[(rule_id, key)] = ConditionStats(label)
+        stats.label = label
+        perf_counter = time.perf_counter
+
+        def profiled(event: Dict[str, Any]) -> bool:
+            started = perf_counter()
+            result = predicate(event)
+            stats.record(perf_counter() - started)
+            if result:
+                stats.passes += 1
+            return result
+        return profiled
+
+    def condition_cost(self, rule_id: str, key: str) -> Optional[Tuple[float, float]]:
+        """Observed (mean cost, pass rate) of a condition, once it has enough samples"""
+        stats = self.conditions.get((rule_id, key))
+        if stats is None or stats.count < self.min_samples:
+            return None
+        return stats.mean, stats.pass_rate
+
+    def rule_stats(self, rule_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Statistics per rule, most expensive (by estimated total time) first"""
+        rule_ids = set(self.evaluations) | set(self.rules) if rule_ids is None else set(rule_ids)
+        conditions_by_rule: Dict[str, List[ConditionStats]] = {}
+        # Copied: rule sets compiled in an executor register conditions concurrently
+        for (rule_id, _), stats in list(self.conditions.items()):
+            if rule_id in rule_ids:
+                conditions_by_rule.setdefault(rule_id, []).append(stats)
+
+        stats = []
+        for rule_id in rule_ids:
+            latency = self.rules.get(rule_id) or LatencyStats()
+            stats.append({
+                "rule_id": rule_id,
+                "evaluations": self.evaluations[rule_id],
+                "matches": self.matches[rule_id],
+                "profiled_evaluations": latency.count,
+                "mean_time": latency.mean,
+                "p99_time": latency.quantile(0.99),
+                "estimated_total_time": latency.mean * self.evaluations[rule_id],
+                "conditions": [
+                    {
+                        "condition": condition.label,
+                        "evaluations": condition.count,
+                        "pass_rate": condition.pass_rate,
+                        "mean_time": condition.mean
+                    }
+                    for condition in sorted(conditions_by_rule.get(rule_id, []), key=lambda c: c.label)
+                ]
+            })
+        stats.sort(key=lambda rule: rule["estimated_total_time"], reverse=True)
+        return stats
+
+    def export(self, rule_ids: Optional[Iterable[str]] = None) -> None:
+        """Push changes since the last export to Prometheus"""
+        for rule in self.rule_stats(rule_ids):
+            rule_id = rule["rule_id"]
+            latency = self.rules.get(rule_id) or LatencyStats()
+            previous = self._exported.get(rule_id, (0, 0, 0, 0.0))
+            current = (rule["evaluations"], rule["matches"], latency.count, latency.total_time)
+            if current == previous:
+                continue
+            MetricsCollector.record_rule_evaluations(
+                rule_id,
+                evaluations=current[0] - previous[0],
+                matches=current[1] - previous[1],
+                profiled=current[2] - previous[2],
+                profiled_time=current[3] - previous[3]
+            )
+            MetricsCollector.update_rule_latency(rule_id, rule["p99_time"])
+            for condition in rule["conditions"]:
+                MetricsCollector.update_rule_condition_selectivity(
+                    rule_id,
+                    condition["condition"],
+                    condition["pass_rate"]
+                )
+            self._exported[rule_id] = current
+
+    def forget(self, rule_ids: Iterable[str]) -> None:
+        """Drop statistics of rules that no longer exist"""
+        rule_ids = set(rule_ids)
+        for rule_id in rule_ids:
+            self.evaluations.pop(rule_id, None)
+            self.matches.pop(rule_id, None)
+            self.rules.pop(rule_id, None)
+            self._exported.pop(rule_id, None)
+        self.conditions = {
+            key: stats for key, stats in self.conditions.items() if key[0] not in rule_ids
+        }
+
+rule_profiler = RuleProfiler(
+    sample_rate=settings.RULE_PROFILE_SAMPLE_RATE,
+    min_samples=settings.RULE_REORDER_MIN_SAMPLES
+)
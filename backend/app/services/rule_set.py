@@ -0,0 +1,540 @@
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+from collections import Counter
+from datetime import datetime
+from types import MappingProxyType
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from ..schemas.schemas import Rule
+from .multi_pattern import MultiPatternMatcher
+from .rule_profiler import RuleProfiler
+import logging
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[Dict[str, Any]], bool]
+IndexKey = Tuple[str, Hashable]
+
+# Bump whenever compilation or the cached state layout changes
+COMPILER_VERSION = "1"
+
+def _field_getter(field: str) -> Callable[[Dict[str, Any]], Any]:
+    """Accessor for a (possibly dotted) field path; missing fields read as None"""
+    parts = field.split(".")
+    if len(parts) == 1:
+        return lambda event: event.get(field)
+
+    def get(event: Dict[str, Any]) -> Any:
+        value = event
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return get
+
+def _all_of(predicates: List[Predicate]) -> Predicate:
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def match(event: Dict[str, Any]) -> bool:
+        for predicate in predicates:
+            if not predicate(event):
+                return False
+        return True
+    return match
+
+def _any_of(predicates: List[Predicate]) -> Predicate:
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def match(event: Dict[str, Any]) -> bool:
+        for predicate in predicates:
+            if predicate(event):
+                return True
+        return False
+    return match
+
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+class _PatternKey(NamedTuple):
+    """Index value for "pattern N on this field matched", not a literal value"""
+    pattern_id: int
+
+class _CompiledNode(NamedTuple):
+    key: str  # Condition content, identifying its profile across recompiles
+    predicate: Predicate
+    profiled: Predicate
+
+class EvaluationContext(dict):
+    """Event fields plus a per-event memo of multi-pattern hits per field"""
+    __slots__ = ("pattern_hits",)
+
+    def __init__(self, event: Dict[str, Any]):
+        super().__init__(event)
+        self.pattern_hits: Dict[str, FrozenSet[int]] = {}
+
+class RuleSet:
+    """Immutable, fully compiled snapshot of a set of detection rules.
+
+    Each rule is compiled once into a tree of short-circuiting closures.
+    Rules are also indexed by the ``equals``/``in`` conditions that must
+    hold for them to match, so an event is only checked against rules whose
+    discriminating field values it actually carries (plus the rules that
+    have no such condition).
+
+    All ``contains`` literals and ``matches`` regexes on a field share one
+    MultiPatternMatcher, so each field value is scanned once per event no
+    matter how many string rules reference it. Rules without an equality
+    key are indexed on their pattern ids instead.
+
+    Everything is built in the constructor and never modified afterwards,
+    so a snapshot can be compiled off to the side and swapped in whole.
+    ``content_hash`` identifies the rules it was compiled from.
+
+    With a profiler, every rule also gets an instrumented copy of its
+    predicate tree for sampled evaluations. With ``cost_ordered``, the
+    children of each AND/OR group are ordered by the profiler's observed
+    cost and pass rate, so the checks most likely to decide the group
+    cheaply run first.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        content_hash: Optional[str] = None,
+        compiled_state: Optional[Dict[str, Any]] = None,
+        profiler: Optional[RuleProfiler] = None,
+        cost_ordered: bool = False
+    ):
+        self.content_hash = content_hash or self.hash_rules(rules)
+        self.created_at = datetime.utcnow()
+        self.profiler = profiler
+        self.cost_ordered = cost_ordered and profiler is not None
+        self.matchers: Dict[str, MultiPatternMatcher] = (
+            compiled_state["matchers"] if compiled_state else {}
+        )
+        self._field_getters: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+        rules_by_id: Dict[str, Rule] = {}
+        compiled_rules: Dict[str, Dict[str, Any]] = {}
+        for rule in rules:
+            self._validate_rule(rule)
+            rules_by_id[rule.id] = rule
+            compiled_rules[rule.id] = self._compile_rule(rule)
+        self.rules: Mapping[str, Rule] = MappingProxyType(rules_by_id)
+        self.compiled_rules: Mapping[str, Dict[str, Any]] = MappingProxyType(compiled_rules)
+        self.rule_order: Dict[str, int] = {rule_id: i for i, rule_id in enumerate(rules_by_id)}
+
+        if compiled_state:
+            self.index = compiled_state["index"]
+            self.pattern_index = compiled_state["pattern_index"]
+            self.unindexed_rules = compiled_state["unindexed_rules"]
+        else:
+            self._build_index()
+
+        # Build automata now so evaluation never mutates the snapshot
+        for matcher in self.matchers.values():
+            matcher.build()
+
+    @classmethod
+    def from_source(
+        cls,
+        source: bytes,
+        parse: Callable[[bytes], List[Rule]],
+        cache_dir: Optional[str] = None,
+        profiler: Optional[RuleProfiler] = None
+    ) -> "RuleSet":
+        """Compile a rule file's contents, reusing the parsed rules, indexes
+        and automata cached on disk for byte-identical sources"""
+        cache_path = (
+            os.path.join(cache_dir, f"{cls.source_key(source)}.pkl") if cache_dir else None
+        )
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    compiled_state = pickle.load(f)
+                return cls(
+                    compiled_state["rules"],
+                    compiled_state["content_hash"],
+                    compiled_state,
+                    profiler=profiler
+                )
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable rule cache {cache_path}: {str(e)}")
+
+        ruleset = cls(parse(source), profiler=profiler)
+        if cache_path:
+            ruleset._save(cache_path)
+        return ruleset
+
+    def reordered(self) -> "RuleSet":
+        """Recompile with the conditions of every group in observed-cost order,
+        reusing this snapshot's indexes and automata"""
+        return RuleSet(
+            list(self.rules.values()),
+            self.content_hash,
+            self._compiled_state(),
+            profiler=self.profiler,
+            cost_ordered=True
+        )
+
+    @staticmethod
+    def source_key(source: bytes) -> str:
+        """Cache key of a rule file's raw contents (and compiler version)"""
+        return hashlib.sha256(COMPILER_VERSION.encode("utf-8") + b"\0" + source).hexdigest()
+
+    @staticmethod
+    def hash_rules(rules: List[Rule]) -> str:
+        """Content hash of the rules (and compiler version), in rule order"""
+        payload = json.dumps(
+            [COMPILER_VERSION] + [rule.model_dump() for rule in rules],
+            sort_keys=True,
+            default=str,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def candidate_rules(self, event: Dict[str, Any]) -> List[str]:
+        """Rules that could match the event, in rule order"""
+        candidates = set(self.unindexed_rules)
+        for field, rules_by_value in self.index.items():
+            try:
+                rule_ids = rules_by_value.get(self.field_value(event, field))
+            except TypeError:  # Unhashable event value
+                continue
+            if rule_ids:
+                candidates.update(rule_ids)
+
+        for field, rules_by_pattern in self.pattern_index.items():
+            value = self.field_value(event, field)
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                # contains on lists/dicts is a membership test, not a scan
+                for rule_ids in rules_by_pattern.values():
+                    candidates.update(rule_ids)
+                continue
+            for pattern_id in self.pattern_hits(event, field):
+                candidates.update(rules_by_pattern.get(pattern_id, ()))
+
+        return sorted(candidates, key=self.rule_order.__getitem__)
+
+    def matched_conditions(
+        self,
+        event: Dict[str, Any],
+        compiled_rule: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Top-level conditions of a rule that hold for the event"""
+        return [
+            {key: value for key, value in condition.items() if key != "predicate"}
+            for condition in compiled_rule["conditions"]
+            if condition["predicate"](event)
+        ]
+
+    def pattern_hits(self, event: Dict[str, Any], field: str) -> FrozenSet[int]:
+        """Ids of every literal/regex on ``field`` that matches the event,
+        scanned once per event and field"""
+        memo = getattr(event, "pattern_hits", None)
+        if memo is not None and field in memo:
+            return memo[field]
+
+        value = self.field_value(event, field)
+        hits = frozenset()
+        if value is not None:
+            matcher = self.matchers[field]
+            if isinstance(value, str):
+                hits = matcher.match_literals(value)
+            hits = hits | matcher.match_regexes(str(value))
+
+        if memo is not None:
+            memo[field] = hits
+        return hits
+
+    def field_value(self, event: Dict[str, Any], field: str) -> Any:
+        getter = self._field_getters.get(field)
+        if getter is None:
+            getter = self._field_getters[field] = _field_getter(field)
+        return getter(event)
+
+    def matcher(self, field: str) -> MultiPatternMatcher:
+        matcher = self.matchers.get(field)
+        if matcher is None:
+            matcher = self.matchers[field] = MultiPatternMatcher()
+        return matcher
+
+    def compile_condition(self, condition: Dict[str, Any]) -> Predicate:
+        """Compile one condition (or nested group) into a closure"""
+        if "all" in condition:
+            return _all_of([self.compile_condition(c) for c in condition["all"]])
+        if "any" in condition:
+            return _any_of([self.compile_condition(c) for c in condition["any"]])
+
+        get = _field_getter(condition["field"])
+        operator = condition["operator"]
+        expected = condition.get("value")
+
+        if operator == "equals":
+            return lambda event: get(event) == expected
+        elif operator == "not_equals":
+            return lambda event: get(event) != expected
+        elif operator == "in":
+            allowed = frozenset(expected) if all(map(_is_hashable, expected)) else list(expected)
+            def is_in(event: Dict[str, Any]) -> bool:
+                try:
+                    return get(event) in allowed
+                except TypeError:
+                    return False
+            return is_in
+        elif operator == "contains" and isinstance(expected, str):
+            field = condition["field"]
+            pattern_id = self.matcher(field).add_literal(expected)
+            def contains(event: Dict[str, Any]) -> bool:
+                value = get(event)
+                if isinstance(value, str):
+                    return pattern_id in self.pattern_hits(event, field)
+                try:
+                    return value is not None and expected in value
+                except TypeError:
+                    return False
+            return contains
+        elif operator in ("greater_than", "less_than", "contains"):
+            compare = {
+                "greater_than": lambda value: value > expected,
+                "less_than": lambda value: value < expected,
+                "contains": lambda value: expected in value
+            }[operator]
+            def compare_field(event: Dict[str, Any]) -> bool:
+                value = get(event)
+                if value is None:
+                    return False
+                try:
+                    return compare(value)
+                except TypeError:
+                    return False
+            return compare_field
+        elif operator == "matches":
+            field = condition["field"]
+            pattern_id = self.matcher(field).add_regex(expected)
+            def matches(event: Dict[str, Any]) -> bool:
+                return get(event) is not None and pattern_id in self.pattern_hits(event, field)
+            return matches
+        else:
+            raise ValueError(f"Invalid operator: {operator}")
+
+    def _validate_rule(self, rule: Rule) -> None:
+        """Validate rule syntax and structure"""
+        required_fields = ["id", "name", "severity", "conditions"]
+        for field in required_fields:
+            if not getattr(rule, field):
+                raise ValueError(f"Missing required field: {field}")
+
+        # Validate conditions syntax
+        for condition in rule.conditions:
+            self._validate_condition(rule, condition)
+
+        if (rule.logic or "AND") not in ("AND", "OR"):
+            raise ValueError(f"Invalid rule logic: {rule.logic}")
+
+        # Validate severity level
+        valid_severities = ["low", "medium", "high", "critical"]
+        if rule.severity not in valid_severities:
+            raise ValueError(f"Invalid severity level in rule {rule.id}")
+
+    def _validate_condition(self, rule: Rule, condition: Dict[str, Any]) -> None:
+        # Nested groups: {"all": [...]} / {"any": [...]}
+        for group in ("all", "any"):
+            if group in condition:
+                if not condition[group]:
+                    raise ValueError(f"Empty condition group in rule {rule.id}")
+                for child in condition[group]:
+                    self._validate_condition(rule, child)
+                return
+
+        if "field" not in condition or "operator" not in condition:
+            raise ValueError(f"Invalid condition in rule {rule.id}")
+        if condition["operator"] == "contains" and condition.get("value") == "":
+            raise ValueError(f"Empty contains value in rule {rule.id}")
+
+    def _compile_rule(self, rule: Rule) -> Dict[str, Any]:
+        """Compile rule conditions into a short-circuiting predicate tree"""
+        compiled = {
+            "conditions": [],
+            "logic": rule.logic or "AND"
+        }
+
+        nodes = []
+        for i, condition in enumerate(rule.conditions):
+            node = self._compile_node(rule.id, condition, str(i))
+            compiled["conditions"].append({
+                **condition,
+                "predicate": node.predicate
+            })
+            nodes.append(node)
+
+        group = "all" if compiled["logic"] == "AND" else "any"
+        compiled["predicate"], compiled["profiled_predicate"] = self._combine(rule.id, group, nodes)
+        return compiled
+
+    def _compile_node(self, rule_id: str, condition: Dict[str, Any], label: str) -> _CompiledNode:
+        """Plain and instrumented predicates for a condition; ``label`` is its
+        position in the rule as written (e.g. "2.0")"""
+        for group in ("all", "any"):
+            if group in condition:
+                children = [
+                    self._compile_node(rule_id, child, f"{label}.{i}")
+                    for i, child in enumerate(condition[group])
+                ]
+                predicate, profiled = self._combine(rule_id, group, children)
+                break
+        else:
+            predicate = profiled = self.compile_condition(condition)
+
+        if self.profiler is None:
+            return _CompiledNode("", predicate, profiled)
+        key = json.dumps(condition, sort_keys=True, default=str)
+        return _CompiledNode(key, predicate, self.profiler.instrument(rule_id, key, label, profiled))
+
+    def _combine(self, rule_id: str, group: str, nodes: List[_CompiledNode]) -> Tuple[Predicate, Predicate]:
+        if self.cost_ordered:
+            nodes = self._cost_order(rule_id, group, nodes)
+        combine = _all_of if group == "all" else _any_of
+        return (
+            combine([node.predicate for node in nodes]),
+            combine([node.profiled for node in nodes])
+        )
+
+    def _cost_order(self, rule_id: str, group: str, nodes: List[_CompiledNode]) -> List[_CompiledNode]:
+        """Order a group's children by expected cost to decide the group.
+
+        An AND group is decided by the first child that fails and an OR group
+        by the first that holds, so children are ranked by mean cost divided
+        by that probability. Groups keep their written order until every
+        child has enough samples.
+        """
+        if len(nodes) < 2:
+            return nodes
+        costs = [self.profiler.condition_cost(rule_id, node.key) for node in nodes]
+        if any(cost is None for cost in costs):
+            return nodes
+
+        def rank(i: int) -> float:
+            mean, pass_rate = costs[i]
+            decisive = 1.0 - pass_rate if group == "all" else pass_rate
+            return mean / max(decisive, 1e-6)
+        return [nodes[i] for i in sorted(range(len(nodes)), key=rank)]
+
+    def _build_index(self) -> None:
+        """Build the (field, value) -> rules inverted index"""
+        # How many rules constrain each (field, value); rarer keys discriminate better
+        key_counts: Counter = Counter()
+        for compiled_rule in self.compiled_rules.values():
+            for condition in compiled_rule["conditions"]:
+                key_counts.update(self._leaf_keys(condition))
+
+        index: Dict[str, Dict[Hashable, List[str]]] = {}
+        pattern_index: Dict[str, Dict[int, List[str]]] = {}
+        unindexed = []
+        for rule_id, compiled_rule in self.compiled_rules.items():
+            group = "all" if compiled_rule["logic"] == "AND" else "any"
+            keys = self._condition_keys({group: compiled_rule["conditions"]}, key_counts)
+            if not keys:
+                unindexed.append(rule_id)
+                continue
+            for field, value in keys:
+                if isinstance(value, _PatternKey):
+                    pattern_index.setdefault(field, {}).setdefault(value.pattern_id, []).append(rule_id)
+                else:
+                    index.setdefault(field, {}).setdefault(value, []).append(rule_id)
+
+        self.index = index
+        self.pattern_index = pattern_index
+        self.unindexed_rules = unindexed
+        logger.info(
+            f"Indexed {len(self.compiled_rules) - len(unindexed)} rules on "
+            f"{len(index)} fields ({len(unindexed)} unindexed)"
+        )
+
+    def _leaf_keys(self, condition: Dict[str, Any]):
+        for group in ("all", "any"):
+            if group in condition:
+                for child in condition[group]:
+                    yield from self._leaf_keys(child)
+                return
+        yield from self._condition_keys(condition, Counter()) or ()
+
+    def _condition_keys(
+        self,
+        condition: Dict[str, Any],
+        key_counts: Counter
+    ) -> Optional[FrozenSet[IndexKey]]:
+        """(field, value) keys of which at least one must be present for the
+        condition to hold, or None if the condition cannot be indexed"""
+        if "all" in condition:
+            # Any single child's keys are necessary; pick the most selective
+            options = [
+                keys for keys in (self._condition_keys(c, key_counts) for c in condition["all"])
+                if keys
+            ]
+            if not options:
+                return None
+            # Equality keys are free to look up; pattern keys need a scan
+            return min(options, key=lambda keys: (
+                any(isinstance(value, _PatternKey) for _, value in keys),
+                sum(key_counts[k] for k in keys)
+            ))
+
+        if "any" in condition:
+            # Every branch must be indexable, and any branch may be the one that matches
+            union = set()
+            for child in condition["any"]:
+                keys = self._condition_keys(child, key_counts)
+                if not keys:
+                    return None
+                union |= keys
+            return frozenset(union)
+
+        operator = condition["operator"]
+        field = condition["field"]
+        if operator == "matches" or (operator == "contains" and isinstance(condition["value"], str)):
+            pattern_id = self.matcher(field).pattern_id(condition["value"], regex=operator == "matches")
+            return frozenset({(field, _PatternKey(pattern_id))})
+
+        values = None
+        if operator == "equals":
+            values = [condition["value"]]
+        elif operator == "in":
+            values = list(condition["value"])
+        if not values or not all(map(_is_hashable, values)):
+            return None
+        return frozenset((condition["field"], value) for value in values)
+
+    def _compiled_state(self) -> Dict[str, Any]:
+        return {
+            "rules": list(self.rules.values()),
+            "content_hash": self.content_hash,
+            "matchers": self.matchers,
+            "index": self.index,
+            "pattern_index": self.pattern_index,
+            "unindexed_rules": self.unindexed_rules
+        }
+
+    def _save(self, cache_path: str) -> None:
+        """Persist the expensive parts of compilation (parsed rules, indexes
+        and automata); closures are cheap to rebuild and cannot be pickled"""
+        state = self._compiled_state()
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)  # Readers never see a partial file
+        except Exception as e:
+            logger.warning(f"Could not write rule cache {cache_path}: {str(e)}")
@@ -1,31 +1,45 @@
 from typing import Dict, Any, List
 import numpy as np
-from .ml.anomaly_detection import AnomalyDetector
-from .ml.threat_classifier import ThreatClassifier
+from .ml.inference import inference_executor
+from .ml.feature_cache import feature_cache
 from ..schemas.schemas import SecurityEvent
 from ..core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever _extract_features changes so cached vectors are not reused
+FEATURE_SCHEMA_VERSION = "1"
+
 class ThreatAnalysisService:
-    def __init__(self):
-        self.anomaly_detector = AnomalyDetector()
-        self.threat_classifier = ThreatClassifier()
+    """Analyzes events with the registry-served models via the inference executor"""
         
     async def analyze_event(self, event: SecurityEvent) -> Dict[str, Any]:
         """Analyze a security event for threats"""
         try:
-            # Extract features
-            features = self._extract_features(event)
+            # Extract features (reused if this event was seen before)
+            features = (await feature_cache.get_or_compute(
+                "threat_analysis",
+                FEATURE_SCHEMA_VERSION,
+                self._feature_fields(event),
+                lambda: self._extract_features(event)
+            )).reshape(1, -1)
             
             # Detect anomalies
-            anomaly_result = self.anomaly_detector.predict(features)
+            anomaly_result = await inference_executor.run(
+                "anomaly_detector",
+                "predict",
+                features
+            )
             
             # If anomaly detected, classify the threat
             threat_result = None
             if anomaly_result["is_anomaly"]:
-                threat_result = self.threat_classifier.predict(features)
+                threat_result = await inference_executor.run(
+                    "threat_classifier",
+                    "predict",
+                    features
+                )
                 
             return {
                 "event_id": event.id,
@@ -41,6 +55,53 @@ class ThreatAnalysisService:
             logger.error(f"Error in threat analysis: {str(e)}")
             raise
             
+    async def analyze_events(self, events: List[SecurityEvent]) -> List[Dict[str, Any]]:
+        """Analyze a batch of events with one anomaly-detector call for the whole batch"""
+        if not events:
+            return []
+        try:
+            features = await feature_cache.get_or_compute_many(
+                "threat_analysis",
+                FEATURE_SCHEMA_VERSION,
+                [self._feature_fields(event) for event in events],
+                lambda missing: np.vstack([self._extract_features(events[i]) for i in missing])
+            )
+            scores = await inference_executor.run("anomaly_detector", "score_batch", features)
+            
+            results = []
+            for row, (event, score) in enumerate(zip(events, scores)):
+                anomaly_result = {
+                    "is_anomaly": bool(score < settings.ANOMALY_THRESHOLD),
+                    "anomaly_score": float(score),
+                    "confidence": float(abs(score - settings.ANOMALY_THRESHOLD))
+                }
+                # Anomalies are rare, so only those rows reach the classifier
+                threat_result = None
+                if anomaly_result["is_anomaly"]:
+                    threat_result = await inference_executor.run(
+                        "threat_classifier",
+                        "predict",
+                        features[row:row + 1]
+                    )
+                results.append({
+                    "event_id": event.id,
+                    "anomaly_detection": anomaly_result,
+                    "threat_classification": threat_result,
+                    "risk_score": self._calculate_risk_score(
+                        anomaly_result,
+                        threat_result
+                    )
+                })
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in batch threat analysis: {str(e)}")
+            raise
+            
+    def _feature_fields(self, event: SecurityEvent) -> Dict[str, Any]:
+        """Event fields the extracted features depend on"""
+        return {"event_type": event.event_type, "raw_data": event.raw_data}
+        
     def _extract_features(self, event: SecurityEvent) -> np.ndarray:
         """Extract features from security event"""
         # Implement feature extraction based on your event data
@@ -72,4 +133,6 @@ class ThreatAnalysisService:
             )
             base_score *= multiplier
             
-        return min(100, base_score) 
\ No newline at end of file
+        return min(100, base_score) 
+
+threat_analysis_service = ThreatAnalysisService()
@@ -3,10 +3,14 @@ import numpy as np
 from datetime import datetime, timedelta
 from ..schemas.schemas import SecurityEvent, CorrelationResult
 from ..core.config import settings
+from .ml.feature_cache import feature_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever _extract_event_features changes so cached vectors are not reused
+FEATURE_SCHEMA_VERSION = "1"
+
 class ThreatCorrelationService:
     def __init__(self):
         self.time_window = settings.CORRELATION_TIME_WINDOW
@@ -38,8 +42,13 @@ class ThreatCorrelationService:
     async def _analyze_window(self, events: List[SecurityEvent]) -> CorrelationResult:
         """Analyze events within a time window for correlations"""
         try:
-            # Extract features from events
-            event_features = self._extract_event_features(events)
+            # Extract features from events, reusing previously extracted ones
+            event_features = await feature_cache.get_or_compute_many(
+                "correlation",
+                FEATURE_SCHEMA_VERSION,
+                [self._feature_fields(event) for event in events],
+                lambda missing: self._extract_event_features([events[i] for i in missing])
+            )
             
             # Find event clusters
             clusters = self._cluster_events(event_features)
@@ -62,6 +71,15 @@ class ThreatCorrelationService:
             logger.error(f"Error analyzing event window: {str(e)}")
             raise
             
+    def _feature_fields(self, event: SecurityEvent) -> Dict[str, Any]:
+        """Event fields the correlation features depend on"""
+        return {
+            "severity": event.severity,
+            "confidence": event.confidence,
+            "type": event.type,
+            "source": event.source
+        }
+        
     def _extract_event_features(self, events: List[SecurityEvent]) -> np.ndarray:
         """Extract numerical features from events for analysis"""
         features = []
@@ -1,10 +1,15 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, AsyncIterable, Optional, Union
 import asyncio
 from datetime import datetime, timedelta
 import numpy as np
+from sqlalchemy import select
 from ..schemas.schemas import SecurityEvent, ThreatHuntingResult
 from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models import models
 from .ml.anomaly_detection import AnomalyDetector
+from .ml.feature_extraction import FeatureExtractor
+from .ml.inference import inference_executor
 from .threat_intelligence import ThreatIntelligence
 import logging
 
@@ -14,6 +19,7 @@ class ThreatHuntingService:
     def __init__(self):
         self.anomaly_detector = AnomalyDetector()
         self.threat_intel = ThreatIntelligence()
+        self.feature_extractor = FeatureExtractor()
         self.hunting_patterns = {
             "lateral_movement": self._detect_lateral_movement,
             "privilege_escalation": self._detect_privilege_escalation,
@@ -42,6 +48,49 @@ class ThreatHuntingService:
             logger.error(f"Error in threat hunting: {str(e)}")
             raise
 
+    async def _get_historical_events(
+        self,
+        start_time: datetime,
+        end_time: Optional[datetime] = None
+    ) -> List[SecurityEvent]:
+        """Events in [start_time, end_time), read only from the partitions that overlap it"""
+        query = select(models.SecurityEvent).where(models.SecurityEvent.timestamp >= start_time)
+        if end_time is not None:
+            query = query.where(models.SecurityEvent.timestamp < end_time)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(query)
+            return [SecurityEvent.model_validate(event) for event in result.scalars()]
+
+    async def hunt_anomalous_events(
+        self,
+        source: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]],
+        chunk_size: Optional[int] = None
+    ) -> ThreatHuntingResult:
+        """Score an event source of any size against the anomaly detector.
+        
+        Events are streamed through the feature extractor in fixed-size
+        blocks, so only the offsets of anomalous events are retained.
+        """
+        try:
+            anomalous_offsets: List[int] = []
+            offset = 0
+            async for block in self.feature_extractor.aiter_features(source, chunk_size):
+                scores = await inference_executor.run("anomaly_detector", "score_batch", block)
+                anomalous = np.flatnonzero(scores < settings.ANOMALY_THRESHOLD) + offset
+                anomalous_offsets.extend(anomalous.tolist())
+                offset += len(block)
+                
+            return ThreatHuntingResult(
+                pattern_type="statistical_anomaly",
+                threats_found=len(anomalous_offsets) > 0,
+                indicators=anomalous_offsets,
+                confidence=self._calculate_confidence(anomalous_offsets)
+            )
+            
+        except Exception as e:
+            logger.error(f"Error hunting anomalous events: {str(e)}")
+            raise
+
     async def _detect_lateral_movement(self, events: List[SecurityEvent]) -> ThreatHuntingResult:
         """Detect lateral movement patterns"""
         try:
@@ -1,14 +1,19 @@
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal import principal_cache
+from app.core.response_cache import response_cache
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from .base import BaseService
 
+# Changes to these retire the user's cached principal and token claims
+AUTHORIZATION_FIELDS = ("is_active", "is_superuser", "organization_id")
+
 class UserService(BaseService[User, UserCreate, UserUpdate]):
-    def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
-        user = self.get_by_email(db, email=email)
+    async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
+        user = await self.get_by_email(db, email=email)
         if not user:
             return None
         if not verify_password(password, user.hashed_password):
@@ -21,7 +26,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
     def is_superuser(self, user: User) -> bool:
         return user.is_superuser
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         db_obj = User(
             email=obj_in.email,
             hashed_password=get_password_hash(obj_in.password),
@@ -30,8 +35,32 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
             organization_id=obj_in.organization_id,
         )
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        before = [getattr(db_obj, field) for field in AUTHORIZATION_FIELDS]
+        organization_before = db_obj.organization_id
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        # After the commit, so a principal reloaded in between is retired too
+        if [getattr(db_obj, field) for field in AUTHORIZATION_FIELDS] != before:
+            await principal_cache.invalidate(db_obj.id)
+            # And the lists cached for the organizations the user could see
+            for organization_id in {organization_before, db_obj.organization_id}:
+                await response_cache.invalidate(organization_id)
         return db_obj
 
+    async def delete(self, db: AsyncSession, *, id: Any) -> User:
+        obj = await super().delete(db, id=id)
+        await principal_cache.invalidate(id)
+        await response_cache.invalidate(obj.organization_id)
+        return obj
+
 user_service = UserService(User) 
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Compare request throughput of sync and async database sessions on one worker.
+
+Usage:
+    python -m scripts.benchmark_db_concurrency --requests 2000 --latency-ms 5
+
+Needs the PostgreSQL server from DATABASE_URL. Two handlers run the same
+query, ``SELECT pg_sleep(latency)``, which stands in for a query with that
+much server time. One handler uses the blocking ``SessionLocal`` inside
+``async def``, the pattern the API used to follow. The other uses the
+``AsyncSession`` dependency the handlers use now. Requests are sent
+in-process over ASGI at each concurrency level, so everything shares one
+event loop like a single uvicorn worker. Async throughput should grow with
+concurrency up to DB_POOL_SIZE + DB_MAX_OVERFLOW. Sync throughput stays
+near one query at a time.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import SessionLocal, async_engine, get_async_db
+
+QUERY = text("SELECT pg_sleep(:seconds)")
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_handler():
+        db = SessionLocal()
+        try:
+            db.execute(QUERY, {"seconds": latency})
+        finally:
+            db.close()
+        return {}
+
+    @app.get("/async")
+    async def async_handler(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(QUERY, {"seconds": latency})
+        return {}
+
+    return app
+
+async def run(client: httpx.AsyncClient, path: str, n_requests: int, concurrency: int) -> float:
+    remaining = iter(range(n_requests))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return n_requests / (time.perf_counter() - start)
+
+async def main_async(n_requests: int, latency_ms: float, levels: List[int]):
+    app = build_app(latency_ms / 1000)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Open the pools before timing
+        await run(client, "/async", levels[-1], levels[-1])
+        await run(client, "/sync", 1, 1)
+
+        print(f"Pool: size={settings.DB_POOL_SIZE} overflow={settings.DB_MAX_OVERFLOW}, "
+              f"query latency {latency_ms:g} ms, {n_requests:,} requests per run")
+        print(f"{'concurrency':>11}  {'sync req/s':>10}  {'async req/s':>11}  {'speedup':>7}")
+        for concurrency in levels:
+            sync_rate = await run(client, "/sync", n_requests, concurrency)
+            async_rate = await run(client, "/async", n_requests, concurrency)
+            print(f"{concurrency:>11}  {sync_rate:>10,.0f}  {async_rate:>11,.0f}  {async_rate / sync_rate:>6.1f}x")
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.latency_ms, sorted(args.concurrency)))
+
+if __name__ == "__main__":
+    main()
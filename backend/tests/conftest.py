@@ -7,7 +7,7 @@ from typing import Generator, AsyncGenerator
 from ..app.core.config import settings
 from ..app.db.base import Base
 from ..app.main import app
-from ..app.api.deps import get_db
+from ..app.api.deps import get_db_async
 from ..app.services.ml.anomaly_detection import AnomalyDetector
 from ..app.services.threat_analysis import ThreatAnalysisService
 
@@ -44,7 +44,7 @@ def client(test_db) -> Generator:
     async def override_get_db():
         yield test_db
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_async] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from ....app.services.action_queue import ActionQueue
+from ....app.services.rule_engine import RuleEngine
+from ....app.schemas.schemas import Rule, SecurityEvent
+from datetime import datetime
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def queue():
+    return ActionQueue(max_size=100, workers=2, dedup_window=60.0, timeout=5.0)
+
+def _event(event_id, **raw_data):
+    return SecurityEvent(
+        id=event_id,
+        agent_id="agent-1",
+        timestamp=datetime(2024, 1, 1),
+        is_resolved=False,
+        event_type="network",
+        severity=2,
+        description="",
+        raw_data=raw_data
+    )
+
+async def test_actions_for_the_same_target_are_coalesced(queue):
+    runs = []
+
+    async def job(target):
+        runs.append(target)
+
+    assert queue.submit("block", lambda: job("10.0.0.1"), dedup_key=("block", "10.0.0.1"))
+    assert not queue.submit("block", lambda: job("10.0.0.1"), dedup_key=("block", "10.0.0.1"))
+    assert queue.submit("block", lambda: job("10.0.0.2"), dedup_key=("block", "10.0.0.2"))
+    assert queue.submit("block", lambda: job("10.0.0.3"), dedup_key=("block", "10.0.0.3"), dedup_window=0)
+    assert queue.submit("block", lambda: job("10.0.0.3"), dedup_key=("block", "10.0.0.3"), dedup_window=0)
+    await queue.join()
+    await queue.close()
+
+    assert sorted(runs) == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.3"]
+
+async def test_failed_action_can_be_retried_within_window(queue):
+
+    async def fail():
+        raise RuntimeError("firewall unavailable")
+
+    assert queue.submit("block", fail, dedup_key=("block", "10.0.0.1"))
+    await queue.join()
+    assert queue.submit("block", fail, dedup_key=("block", "10.0.0.1"))
+    await queue.join()
+    await queue.close()
+
+async def test_full_queue_drops_instead_of_blocking():
+    queue = ActionQueue(max_size=2, workers=1, dedup_window=60.0, timeout=5.0)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+
+    assert queue.submit("alert", slow)
+    await asyncio.sleep(0)  # The worker takes the first action
+    assert queue.submit("alert", slow)
+    assert queue.submit("alert", slow)
+    assert not queue.submit("alert", slow)
+
+    release.set()
+    await queue.join()
+    await queue.close()
+
+async def test_close_runs_queued_actions_before_stopping():
+    queue = ActionQueue(max_size=100, workers=1, dedup_window=60.0, timeout=5.0)
+    runs = []
+
+    async def block(target):
+        await asyncio.sleep(0.01)
+        runs.append(target)
+
+    for i in range(3):
+        assert queue.submit("block", lambda i=i: block(i))
+    await queue.close()
+
+    assert runs == [0, 1, 2]
+
+async def test_close_gives_up_after_drain_timeout():
+    queue = ActionQueue(max_size=100, workers=1, dedup_window=60.0, timeout=5.0, drain_timeout=0.05)
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    assert queue.submit("isolate", hang)
+    await asyncio.wait_for(queue.close(), timeout=1.0)
+
+async def test_slow_actions_do_not_delay_rule_evaluation():
+    queue = ActionQueue(max_size=100, workers=1, dedup_window=60.0, timeout=5.0)
+    engine = RuleEngine(actions=queue)
+    blocked = []
+    release = asyncio.Event()
+
+    async def slow_block(rule, event, action, target):
+        await release.wait()
+        blocked.append(target)
+
+    engine._block_threat = slow_block
+    await engine.add_rule(Rule(
+        id="ssh",
+        name="ssh",
+        severity="high",
+        conditions=[{"field": "raw_data.port", "operator": "equals", "value": 22}],
+        actions=[{"type": "block"}]
+    ))
+
+    for i in range(5):
+        matches = await asyncio.wait_for(
+            engine.evaluate_event(_event(f"evt-{i}", port=22, source_ip="10.0.0.9")),
+            timeout=1.0
+        )
+        assert [m.rule_id for m in matches] == ["ssh"]
+
+    release.set()
+    await queue.join()
+    await engine.close()
+
+    # One block per source within the dedup window
+    assert blocked == ["10.0.0.9"]
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+import numpy as np
+from ....app.core.cache import CacheManager
+
+pytestmark = pytest.mark.asyncio
+
+def _local_cache(**kwargs):
+    options = {"redis_url": None, "max_bytes": 1024, "local_ttl": 60, "default_ttl": 60}
+    options.update(kwargs)
+    return CacheManager(**options)
+
+def _shared_caches(count):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.aioredis.FakeRedis()
+    caches = [_local_cache(redis_url="redis://unused") for _ in range(count)]
+    for cache in caches:
+        cache._redis = redis
+    return caches
+
+async def test_concurrent_misses_compute_once():
+    cache = _local_cache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"score": 0.9}
+
+    results = await asyncio.gather(*[cache.get_or_set("threat", compute) for _ in range(10)])
+
+    assert len(calls) == 1
+    assert all(result == {"score": 0.9} for result in results)
+    assert await cache.get("threat") == {"score": 0.9}
+
+async def test_local_tier_is_bounded_by_bytes():
+    cache = _local_cache(max_bytes=100)
+    for i in range(10):
+        await cache.set(f"key-{i}", "x" * 30)
+
+    assert cache._bytes <= 100
+    assert await cache.get("key-0") is None
+    assert await cache.get("key-9") == "x" * 30
+
+async def test_stale_values_are_served_while_one_refresh_runs():
+    cache = _local_cache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    assert await cache.get_or_set("count", compute, ttl=0, stale_ttl=60) == 1
+    stale = await asyncio.gather(*[
+        cache.get_or_set("count", compute, ttl=0, stale_ttl=60) for _ in range(5)
+    ])
+    assert stale == [1] * 5
+
+    await asyncio.sleep(0.05)
+    assert len(calls) == 2
+    assert await cache.get_or_set("count", compute, ttl=0, stale_ttl=60) == 2
+
+async def test_redis_tier_is_shared_between_workers():
+    first, second = _shared_caches(2)
+    await first.set("vector", np.arange(3, dtype=np.float32), namespace="features")
+
+    assert await second.get("vector", namespace="features") == [0.0, 1.0, 2.0]
+    assert await second.get_or_set("vector", lambda: pytest.fail("recomputed"), namespace="features") == [
+        0.0, 1.0, 2.0
+    ]
+
+    await first.delete("vector", namespace="features")
+    second.clear_local()
+    assert await second.get("vector", namespace="features") is None
+
+async def test_clear_namespace_leaves_other_namespaces():
+    cache, = _shared_caches(1)
+    for i in range(3):
+        await cache.set(f"report-{i}", i, namespace="reports")
+    await cache.set("report-0", "kept", namespace="intel")
+
+    await cache.clear_namespace("reports")
+    cache.clear_local()
+
+    assert [await cache.get(f"report-{i}", namespace="reports") for i in range(3)] == [None] * 3
+    assert await cache.get("report-0", namespace="intel") == "kept"
+
+async def test_redis_outage_falls_back_to_local_tier():
+    cache = _local_cache(redis_url="redis://unused")
+
+    class Unavailable:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    cache._redis = Unavailable()
+    assert await cache.get_or_set("key", lambda: "value") == "value"
+    assert await cache.get_or_set("key", lambda: pytest.fail("recomputed")) == "value"
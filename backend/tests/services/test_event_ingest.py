@@ -0,0 +1,70 @@
+import json
+import pytest
+import pytest_asyncio
+from pydantic import ValidationError
+from sqlalchemy import event as sa_event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from ....app.db.base_class import Base
+from ....app.models import models
+from ....app.services.event_ingest import EventBatchTooLarge, bulk_insert_events, parse_event_batch
+
+aiosqlite = pytest.importorskip("aiosqlite")
+
+def _events(count):
+    return [
+        {"event_type": "network", "severity": 2, "description": f"event {i}", "raw_data": {"port": i}}
+        for i in range(count)
+    ]
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        session.add(models.Agent(id="agent-1", hostname="host", organization_id="org-1"))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+def test_json_and_ndjson_bodies_parse_the_same():
+    events = _events(3)
+    as_json = parse_event_batch(json.dumps(events).encode())
+    ndjson = "\n".join(json.dumps(e) for e in events) + "\n\n"
+    as_ndjson = parse_event_batch(ndjson.encode(), "application/x-ndjson; charset=utf-8")
+    assert as_json == as_ndjson
+    assert [e.raw_data["port"] for e in as_json] == [0, 1, 2]
+
+def test_invalid_rows_are_reported_by_index():
+    events = _events(3)
+    events[1]["severity"] = 9
+    with pytest.raises(ValidationError) as excinfo:
+        parse_event_batch(json.dumps(events).encode())
+    assert excinfo.value.errors()[0]["loc"][0] == 1
+
+def test_oversized_batches_are_rejected_before_validation():
+    events = _events(5)
+    events[4]["severity"] = 9
+    with pytest.raises(EventBatchTooLarge):
+        parse_event_batch(json.dumps(events).encode(), max_events=3)
+    ndjson = "\n".join(json.dumps(e) for e in events)
+    with pytest.raises(EventBatchTooLarge):
+        parse_event_batch(ndjson.encode(), "application/x-ndjson", max_events=3)
+    assert len(parse_event_batch(json.dumps(events[:3]).encode(), max_events=3)) == 3
+
+@pytest.mark.asyncio
+async def test_bulk_insert_uses_one_statement_per_chunk(db):
+    statements = []
+    sa_event.listen(
+        db.bind.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    rows = await bulk_insert_events(db, "agent-1", "org-1", parse_event_batch(json.dumps(_events(25)).encode()), chunk_size=10)
+
+    inserts = [s for s in statements if s.startswith("INSERT")]
+    assert len(inserts) == 3
+    stored = (await db.execute(select(models.SecurityEvent))).scalars().all()
+    assert sorted(row["id"] for row in rows) == sorted(e.id for e in stored)
+    assert len({row["id"] for row in rows}) == 25
+    assert all(e.agent_id == "agent-1" and e.organization_id == "org-1" and not e.is_resolved for e in stored)
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from datetime import datetime
+
+pytestmark = pytest.mark.asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from ....app.schemas.schemas import SecurityEvent
+from ....app.services.event_queue import EventQueue
+
+def _event(i, **raw_data):
+    return SecurityEvent(
+        id=f"event-{i}",
+        agent_id="agent-1",
+        event_type="network",
+        severity=1,
+        description="test",
+        raw_data=raw_data,
+        timestamp=datetime(2024, 1, 1),
+        is_resolved=False
+    )
+
+@pytest.fixture
+def queue():
+    queue = EventQueue(
+        redis_url="redis://unused",
+        stream="events:test",
+        group="workers",
+        workers=0,
+        batch_size=10,
+        block_ms=0,
+        claim_idle_ms=0,
+        max_deliveries=2,
+        max_lag=5,
+        max_len=1000,
+        lag_interval=1.0
+    )
+    queue._redis = fakeredis.aioredis.FakeRedis()
+    return queue
+
+async def test_events_are_analyzed_in_batches_and_acknowledged(queue):
+    queue.batch_size = 2
+    await queue.ensure_group()
+    batches = []
+
+    async def handler(events):
+        batches.append([event.id for event in events])
+
+    assert await queue.publish([_event(i) for i in range(3)])
+    while await queue.poll(handler):
+        pass
+
+    assert batches == [["event-0", "event-1"], ["event-2"]]
+    assert (await queue._redis.xpending("events:test", "workers"))["pending"] == 0
+    assert await queue.refresh_lag() == 0
+
+async def test_failing_event_is_retried_then_dead_lettered_without_blocking_others(queue):
+    await queue.ensure_group()
+    analyzed = []
+
+    async def handler(events):
+        if any(event.raw_data.get("poison") for event in events):
+            raise ValueError("cannot analyze")
+        analyzed.extend(event.id for event in events)
+
+    await queue.publish([_event(0), _event(1, poison=True), _event(2)])
+    await queue.poll(handler)  # Batch fails, then the good events go through one by one
+    assert analyzed == ["event-0", "event-2"]
+
+    await asyncio.sleep(0.01)  # fakeredis only claims entries idle for longer than claim_idle_ms
+    await queue.poll(handler)  # Second delivery of the poison event
+    assert await queue._redis.xlen("events:test:dead") == 0
+    await asyncio.sleep(0.01)
+    assert await queue.poll(handler) == 0  # Out of deliveries: dead-lettered
+
+    [(_, fields)] = await queue._redis.xrange("events:test:dead")
+    assert SecurityEvent.model_validate_json(fields[b"event"]).id == "event-1"
+    assert fields[b"deliveries"] == b"2"
+    assert (await queue._redis.xpending("events:test", "workers"))["pending"] == 0
+
+async def test_undecodable_entry_is_dead_lettered_alone(queue):
+    await queue.ensure_group()
+    analyzed = []
+
+    async def handler(events):
+        analyzed.extend(event.id for event in events)
+
+    await queue.publish([_event(0)])
+    await queue._redis.xadd("events:test", {"event": b"{not json"})
+    await queue.publish([_event(1)])
+
+    assert await queue.poll(handler) == 2
+    assert analyzed == ["event-0", "event-1"]
+    [(_, fields)] = await queue._redis.xrange("events:test:dead")
+    assert fields[b"event"] == b"{not json" and fields[b"deliveries"] == b"1"
+    assert (await queue._redis.xpending("events:test", "workers"))["pending"] == 0
+
+async def test_lag_counts_entries_published_before_the_group_exists(queue):
+    assert await queue.refresh_lag() == 0
+    await queue.publish([_event(0), _event(1)])
+    assert await queue.refresh_lag() == 2
+
+async def test_workers_keep_running_while_redis_is_unavailable(queue):
+    queue.workers = 2
+
+    class Unavailable:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    async def handler(events):
+        pass
+
+    queue._redis = Unavailable()
+    await queue.start(handler)
+    await asyncio.sleep(0)
+    assert len(queue._tasks) == 3 and not any(task.done() for task in queue._tasks)
+    await queue.close()
+
+async def test_queue_saturates_beyond_max_lag(queue):
+    queue.max_lag = 3
+    await queue.ensure_group()
+    await queue.publish([_event(i) for i in range(2)])
+    assert not queue.saturated
+    await queue.publish([_event(2)])
+    assert queue.saturated
+    assert await queue.refresh_lag() == 3
@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+from ....app.services.ml.feature_cache import FeatureCache
+
+pytestmark = pytest.mark.asyncio
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def setex(self, key, ttl, value):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        self.store.update(self.ops)
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+async def test_second_lookup_hits_without_recomputing():
+    cache = FeatureCache(max_bytes=1024)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(4, dtype=np.float64)
+
+    first = await cache.get_or_compute("stage", "1", {"a": 1, "b": "x"}, compute)
+    second = await cache.get_or_compute("stage", "1", {"b": "x", "a": 1}, compute)
+
+    assert len(calls) == 1
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+
+async def test_schema_version_separates_entries():
+    cache = FeatureCache(max_bytes=1024)
+    await cache.get_or_compute("stage", "1", {"a": 1}, lambda: np.zeros(2))
+    result = await cache.get_or_compute("stage", "2", {"a": 1}, lambda: np.ones(2))
+    assert np.array_equal(result, np.ones(2))
+
+async def test_many_computes_only_misses_in_one_batch():
+    cache = FeatureCache(max_bytes=1024)
+    await cache.get_or_compute("stage", "1", {"id": 1}, lambda: np.full(2, 1.0))
+
+    batches = []
+    def compute(missing):
+        batches.append(missing)
+        return np.array([[10.0 * i, 0.0] for i in missing])
+
+    rows = await cache.get_or_compute_many(
+        "stage", "1", [{"id": 0}, {"id": 1}, {"id": 2}], compute
+    )
+    assert batches == [[0, 2]]
+    assert rows.tolist() == [[0.0, 0.0], [1.0, 1.0], [20.0, 0.0]]
+
+async def test_lru_eviction_is_bounded_by_bytes():
+    cache = FeatureCache(max_bytes=3 * 16)  # three 4 x float32 vectors
+    for i in range(5):
+        await cache.get_or_compute("stage", "1", {"id": i}, lambda: np.zeros(4))
+
+    assert cache._bytes <= cache.max_bytes
+    assert len(cache._entries) == 3
+    assert cache._get_local(FeatureCache.fingerprint("stage", "1", {"id": 0})) is None
+
+async def test_redis_tier_shares_packed_vectors():
+    redis = FakeRedis()
+    producer = FeatureCache(max_bytes=1024, redis_url="redis://test")
+    consumer = FeatureCache(max_bytes=1024, redis_url="redis://test")
+    producer._redis = consumer._redis = redis
+
+    await producer.get_or_compute("stage", "1", {"id": 7}, lambda: np.array([1.5, 2.5]))
+    assert all(isinstance(value, bytes) for value in redis.store.values())
+
+    def fail():
+        raise AssertionError("should have been served from Redis")
+
+    result = await consumer.get_or_compute("stage", "1", {"id": 7}, fail)
+    assert result.tolist() == [1.5, 2.5]
@@ -0,0 +1,157 @@
+import pytest
+import numpy as np
+import pandas as pd
+from ....app.services.ml.feature_extraction import FeatureExtractor, reservoir_sample
+from ....app.core.config import settings
+
+@pytest.fixture
+def extractor():
+    return FeatureExtractor()
+
+@pytest.fixture
+def events():
+    return [
+        {"bytes_sent": 1500, "protocol": "tcp", "cpu_usage": 150, "login_attempts": -1},
+        {"bytes_sent": float("nan"), "protocol": "udp", "process_count": -5},
+        {"bytes_sent": float("inf"), "protocol": None, "memory_usage": 42.5},
+    ]
+
+def _column(name):
+    names = settings.NETWORK_FEATURES + settings.SYSTEM_FEATURES + settings.USER_FEATURES
+    return names.index(name)
+
+def test_columnar_extraction_shape(extractor, events):
+    features = extractor.extract_features_frame(pd.DataFrame(events))
+    assert features.shape == (3, len(extractor.get_feature_names()))
+
+def test_columnar_extraction_values(extractor, events):
+    """Encoding, scrubbing and clipping run per column"""
+    features = extractor.extract_features_frame(pd.DataFrame(events))
+    weight = settings.NETWORK_FEATURE_WEIGHT
+
+    # Non-finite and missing values become 0
+    assert features[1, _column("bytes_sent")] == 0.0
+    assert features[2, _column("bytes_sent")] == 0.0
+    assert features[2, _column("protocol")] == 0.0
+
+    # Categorical protocol encoding
+    assert features[0, _column("protocol")] == 1.0 * weight
+    assert features[1, _column("protocol")] == 2.0 * weight
+
+    # Range clipping
+    assert features[0, _column("cpu_usage")] == 100.0 * settings.SYSTEM_FEATURE_WEIGHT
+    assert features[1, _column("process_count")] == 0.0
+    assert features[0, _column("login_attempts")] == 0.0
+
+def test_missing_columns_are_zero(extractor):
+    features = extractor.extract_features_frame(pd.DataFrame([{"unrelated": 1}]))
+    assert np.all(features == 0.0)
+
+def test_iter_features_yields_fixed_size_blocks(extractor):
+    events = ({"bytes_sent": i, "protocol": "tcp"} for i in range(2500))
+    blocks = list(extractor.iter_features(events, chunk_size=1000))
+
+    assert [len(block) for block in blocks] == [1000, 1000, 500]
+    assert all(block.dtype == np.float32 for block in blocks)
+    assert np.array_equal(
+        np.concatenate(blocks)[:, _column("bytes_sent")],
+        np.arange(2500, dtype=np.float32) * settings.NETWORK_FEATURE_WEIGHT
+    )
+
+@pytest.mark.asyncio
+async def test_aiter_features_matches_sync(extractor, events):
+    async def source():
+        for event in events:
+            yield event
+
+    blocks = [block async for block in extractor.aiter_features(source(), chunk_size=2)]
+    expected = list(extractor.iter_features(events, chunk_size=2))
+    assert len(blocks) == 2
+    for block, other in zip(blocks, expected):
+        assert np.array_equal(block, other)
+
+def test_numeric_strings_are_parsed(extractor):
+    """CSV readers deliver every value as a string"""
+    features = extractor.extract_features_frame(
+        pd.DataFrame([{"bytes_sent": "1500", "protocol": "udp", "cpu_usage": "42.5"}])
+    )
+    assert features[0, _column("bytes_sent")] == 1500.0 * settings.NETWORK_FEATURE_WEIGHT
+    assert features[0, _column("protocol")] == 2.0 * settings.NETWORK_FEATURE_WEIGHT
+    assert features[0, _column("cpu_usage")] == 42.5 * settings.SYSTEM_FEATURE_WEIGHT
+
+def test_single_event_and_columnar_paths_agree(extractor):
+    """The same event must get the same vector whichever path extracts it"""
+    event = {
+        "bytes_sent": "1500",
+        "port": " 443 ",
+        "protocol": "udp",
+        "flags": "syn",
+        "duration": float("inf"),
+        "cpu_usage": 42.5,
+        "login_attempts": 3
+    }
+    single = extractor.combine_features(
+        extractor.extract_network_features(event),
+        extractor.extract_system_features(event),
+        extractor.extract_user_features(event)
+    )
+    columnar = extractor.extract_features_frame(pd.DataFrame([event]))
+
+    np.testing.assert_array_equal(single, columnar[0])
+    assert single[_column("port")] == 443.0 * settings.NETWORK_FEATURE_WEIGHT
+
+def test_reservoir_sample_bounds_rows():
+    blocks = (np.full((100, 3), i, dtype=np.float32) for i in range(50))
+    sample = reservoir_sample(blocks, max_rows=500, seed=0)
+
+    assert sample.shape == (500, 3)
+    # Rows are drawn from across the whole stream, not just the head
+    assert len(np.unique(sample[:, 0])) > 25
+
+def test_vocabulary_built_at_training_and_persisted(extractor, tmp_path):
+    events = [{"protocol": "tcp", "flags": flags} for flags in ["SA", "S", "PA", "S"]]
+    extractor.process_batch(events, batch_size=2)
+    assert extractor.vocabularies["flags"] == ["pa", "s", "sa"]
+
+    path = str(tmp_path / "extractor.pkl")
+    extractor.save(path)
+    restored = FeatureExtractor()
+    restored.load(path)
+
+    frame = pd.DataFrame([{"flags": "S"}, {"flags": "SA"}])
+    assert restored.vocabularies == extractor.vocabularies
+    assert restored._encode_categorical("SA", "flags") == extractor._encode_categorical("sa", "flags") == 3.0
+    assert np.array_equal(
+        restored.extract_features_frame(frame),
+        extractor.extract_features_frame(frame)
+    )
+    assert restored.extract_features_frame(frame)[:, _column("flags")].tolist() == [
+        2.0 * settings.NETWORK_FEATURE_WEIGHT,
+        3.0 * settings.NETWORK_FEATURE_WEIGHT
+    ]
+
+def test_unknown_categories_use_stable_hash_buckets(extractor):
+    """Unknown values must encode identically in every worker process"""
+    codes = extractor._encode_categories(np.array(["gre", "GRE", "sctp"], dtype=object), "protocol")
+    vocabulary_size = len(extractor.vocabularies["protocol"])
+
+    assert codes[0] == codes[1]
+    assert np.all(codes > vocabulary_size)
+    assert np.all(codes <= vocabulary_size + settings.CATEGORICAL_HASH_BUCKETS)
+    assert codes[0] == vocabulary_size + 1 + FeatureExtractor._hash_bucket("gre")
+    # Pinned: independent of PYTHONHASHSEED
+    assert FeatureExtractor._hash_bucket("gre") == 475
+
+def test_scaler_state_survives_save_and_load(extractor, tmp_path):
+    events = [{"bytes_sent": i, "cpu_usage": i % 100} for i in range(500)]
+    extractor.process_batch(events[:250], batch_size=100)
+    extractor.process_batch(events[250:], batch_size=100)
+    assert extractor.scaler.n_samples_seen_ == 500
+
+    path = str(tmp_path / "extractor.pkl")
+    extractor.save(path)
+    restored = FeatureExtractor()
+    restored.load(path)
+
+    assert restored.scaler.n_samples_seen_ == 500
+    assert np.allclose(restored.scaler.center_, extractor.scaler.center_)
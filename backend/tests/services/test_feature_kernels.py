@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from ....app.services.ml import feature_kernels
+from ....app.services.ml.feature_extraction import FeatureExtractor
+
+@pytest.fixture
+def block():
+    rng = np.random.default_rng(0)
+    features = rng.normal(0, 200, (1000, 6))
+    features[::7, 0] = np.nan
+    features[::11, 3] = np.inf
+    features[::13, 4] = -np.inf
+    lower = np.array([-np.inf, 0.0, 0.0, -np.inf, 0.0, -10.0])
+    upper = np.array([np.inf, 100.0, np.inf, np.inf, 10000.0, 10.0])
+    weights = np.array([1.0, 0.5, 2.0, 1.0, 1.0, 3.0])
+    return features, lower, upper, weights
+
+@pytest.mark.skipif(not feature_kernels.NUMBA_AVAILABLE, reason="numba not installed")
+def test_numba_kernel_matches_numpy(block):
+    features, lower, upper, weights = block
+    expected = features.copy()
+    feature_kernels._finalize_features_numpy(expected, lower, upper, weights)
+
+    compiled = features.copy()
+    feature_kernels._finalize_features_numba(compiled, lower, upper, weights)
+    assert np.array_equal(compiled, expected)
+
+def test_numpy_fallback(block, monkeypatch):
+    monkeypatch.setattr(feature_kernels, "NUMBA_AVAILABLE", False)
+    features, lower, upper, weights = block
+    result = feature_kernels.finalize_features(features, lower, upper, weights)
+
+    assert np.all(np.isfinite(result))
+    assert np.all(result[:, 1] <= 50.0)
+    assert np.all(result[::7, 0] == 0.0)
+    feature_kernels.warm_up()
+
+def test_single_event_path_scrubs_non_finite_values():
+    extractor = FeatureExtractor()
+    features = extractor.extract_network_features({"bytes_sent": float("nan"), "port": 443})
+    assert np.all(np.isfinite(features))
+    assert 443.0 in features
@@ -0,0 +1,35 @@
+import pytest
+import threading
+import numpy as np
+from ....app.services.ml.inference import InferenceExecutor
+
+pytestmark = pytest.mark.asyncio
+
+class DummyModel:
+    def predict(self, features):
+        return {
+            "rows": features.shape[0],
+            "thread": threading.current_thread().name
+        }
+
+async def test_inference_runs_off_the_event_loop():
+    """Model calls execute on the worker pool, not the event loop thread"""
+    executor = InferenceExecutor(mode="thread", max_workers=2)
+    result = await executor.run("dummy", "predict", np.ones((3, 4)), model=DummyModel())
+
+    assert result["rows"] == 3
+    assert result["thread"] != threading.current_thread().name
+    executor.shutdown()
+
+async def test_invalid_mode():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="gpu")
+
+async def test_explicit_models_use_a_bounded_pool_in_process_mode():
+    """Calls with an explicit instance stay off the loop's unbounded default executor"""
+    executor = InferenceExecutor(mode="process", max_workers=2)
+    result = await executor.run("dummy", "predict", np.ones((3, 4)), model=DummyModel())
+
+    assert result["thread"].startswith("inference")
+    assert executor._thread_executor._max_workers == 2
+    executor.shutdown()
@@ -0,0 +1,56 @@
+import pytest
+import asyncio
+import numpy as np
+from ....app.services.ml.batching import MicroBatcher
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def batch_sizes():
+    return []
+
+@pytest.fixture
+def batcher(batch_sizes):
+    async def process(features):
+        batch_sizes.append(features.shape[0])
+        return [float(row.sum()) for row in features]
+
+    return MicroBatcher("test", process, max_batch_size=8, max_wait=0.05)
+
+async def test_concurrent_requests_share_one_pass(batcher, batch_sizes):
+    """Concurrent submissions are coalesced and results are fanned back out"""
+    rows = [np.full((1, 4), i, dtype=float) for i in range(5)]
+    results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+
+    assert [result[0] for result in results] == [0.0, 4.0, 8.0, 12.0, 16.0]
+    assert batch_sizes == [5]
+    await batcher.close()
+
+async def test_batch_size_is_capped(batcher, batch_sizes):
+    """No pass ever exceeds the configured maximum batch size"""
+    rows = [np.ones((1, 4)) for _ in range(20)]
+    results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+
+    assert len(results) == 20
+    assert max(batch_sizes) <= 8
+    assert sum(batch_sizes) == 20
+    await batcher.close()
+
+async def test_errors_propagate_to_every_caller():
+    async def process(features):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher("test", process, max_batch_size=8, max_wait=0.01)
+    with pytest.raises(ValueError):
+        await batcher.submit(np.ones((1, 4)))
+    await batcher.close()
+
+async def test_mismatched_rows_are_rejected_without_stalling_the_batcher(batcher):
+    first = await batcher.submit(np.ones((1, 4)))
+    with pytest.raises(ValueError):
+        await batcher.submit(np.ones((1, 3)))
+
+    results = await asyncio.gather(*(batcher.submit(np.ones((1, 4))) for _ in range(3)))
+    assert first == [4.0]
+    assert [result[0] for result in results] == [4.0, 4.0, 4.0]
+    await batcher.close()
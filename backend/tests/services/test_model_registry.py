@@ -0,0 +1,88 @@
+import pytest
+from ....app.services.ml.registry import ModelRegistry
+from ....app.services.ml.zero_day_detection import ZeroDayDetector
+
+class DummyModel:
+    def __init__(self, version):
+        self.version = version
+
+@pytest.fixture
+def registry():
+    state = {"version": "1", "loads": 0}
+
+    def loader():
+        state["loads"] += 1
+        return DummyModel(state["version"])
+
+    registry = ModelRegistry()
+    registry.register("dummy", loader, version_fn=lambda: state["version"])
+    return registry, state
+
+def test_model_loaded_once_and_shared(registry):
+    """The same warm instance is returned on every call"""
+    registry, state = registry
+    first = registry.get("dummy")
+    second = registry.get("dummy")
+
+    assert first is second
+    assert state["loads"] == 1
+    assert registry.version("dummy") == "1"
+
+def test_refresh_swaps_on_new_version(registry):
+    """A new artifact version is loaded and swapped in"""
+    registry, state = registry
+    old = registry.get("dummy")
+
+    assert registry.refresh("dummy") is False
+
+    state["version"] = "2"
+    assert registry.refresh("dummy") is True
+
+    new = registry.get("dummy")
+    assert new is not old
+    assert new.version == "2"
+    assert registry.version("dummy") == "2"
+
+def test_unknown_model(registry):
+    registry, _ = registry
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+def test_artifact_version_from_manifest(tmp_path):
+    """ZeroDayDetector exposes the manifest version for hot-swap checks"""
+    model_path = str(tmp_path / "zero_day_detector")
+    assert ZeroDayDetector.artifact_version(model_path) is None
+
+    (tmp_path / "zero_day_detector_manifest.json").write_text('{"version": "20240101"}')
+    assert ZeroDayDetector.artifact_version(model_path) == "20240101"
+
+def test_refresh_failure_keeps_serving_and_other_models_still_refresh(registry):
+    """A broken artifact for one model does not stop the others from swapping"""
+    registry, state = registry
+
+    def broken_loader():
+        if state["version"] != "1":
+            raise ValueError("corrupt artifact")
+        return DummyModel(state["version"])
+
+    registry.register("broken", broken_loader, version_fn=lambda: state["version"])
+    broken = registry.get("broken")
+    registry.get("dummy")
+
+    state["version"] = "2"
+    assert registry.refresh_all() == {"broken": False, "dummy": True}
+    assert registry.get("broken") is broken
+    assert registry.get("dummy").version == "2"
+
+def test_tracked_models_notify_listeners_without_loading(registry):
+    """Models served by other processes are version-checked but never loaded here"""
+    registry, state = registry
+    swapped = []
+    registry.add_swap_listener(swapped.append)
+    registry.track("dummy")
+
+    state["version"] = "2"
+    assert registry.refresh_all() == {"dummy": True}
+    assert swapped == ["dummy"]
+    assert registry.version("dummy") == "2"
+    assert state["loads"] == 0
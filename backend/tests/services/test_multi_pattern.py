@@ -0,0 +1,54 @@
+import pytest
+from ....app.services import multi_pattern
+from ....app.services.multi_pattern import MultiPatternMatcher
+
+@pytest.fixture(params=["automaton", "regex"])
+def matcher(request, monkeypatch):
+    if request.param == "automaton" and not multi_pattern.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick not installed")
+    if request.param == "regex":
+        monkeypatch.setattr(multi_pattern, "AHOCORASICK_AVAILABLE", False)
+    return MultiPatternMatcher()
+
+def test_literals_report_overlapping_matches(matcher):
+    ids = {literal: matcher.add_literal(literal) for literal in ["evil", "evil.com", "l.co", "bad", "e"]}
+    assert matcher.add_literal("evil") == ids["evil"]
+
+    hits = matcher.match_literals("http://evil.com/x")
+    assert hits == {ids["evil"], ids["evil.com"], ids["l.co"], ids["e"]}
+    assert matcher.match_literals("benign") == {ids["e"]}
+    assert matcher.match_literals("") == frozenset()
+
+def test_regexes_keep_match_semantics(matcher):
+    ids = {pattern: matcher.add_regex(pattern) for pattern in [
+        r"cmd\.exe", r".*powershell", r"(a)\1", r"(?i)MIMIKATZ", r"\d+"
+    ]}
+
+    assert matcher.match_regexes("cmd.exe /c powershell") == {ids[r"cmd\.exe"], ids[r".*powershell"]}
+    # Anchored at the start, like re.match
+    assert matcher.match_regexes("run cmd.exe") == frozenset()
+    assert matcher.match_regexes("aa") == {ids[r"(a)\1"]}
+    assert matcher.match_regexes("mimikatz.exe") == {ids[r"(?i)MIMIKATZ"]}
+    assert matcher.match_regexes("1234") == {ids[r"\d+"]}
+
+def test_patterns_added_after_build_are_matched(matcher):
+    first = matcher.add_literal("abc")
+    assert matcher.match_literals("xabcx") == {first}
+    second = matcher.add_literal("bcx")
+    assert matcher.match_literals("xabcx") == {first, second}
+
+def test_numbered_conditionals_are_matched_standalone(matcher):
+    other = matcher.add_regex(r"(x)?y")
+    conditional = matcher.add_regex(r"(a)?(?(1)b|c)")
+
+    assert matcher.match_regexes("ab") == {conditional}
+    assert matcher.match_regexes("c") == {conditional}
+    assert matcher.match_regexes("y") == {other}
+
+def test_empty_literal_rejected(matcher):
+    with pytest.raises(ValueError):
+        matcher.add_literal("")
+
+def test_invalid_regex_rejected_on_add(matcher):
+    with pytest.raises(Exception):
+        matcher.add_regex("(unclosed")
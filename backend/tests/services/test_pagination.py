@@ -0,0 +1,69 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from ....app.api.pagination import NEXT_CURSOR_HEADER, Cursor, cursor_param, keyset_page, set_next_cursor
+from ....app.db.base_class import Base
+from ....app.models import models
+
+aiosqlite = pytest.importorskip("aiosqlite")
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        start = datetime(2024, 1, 1)
+        # Batches share a timestamp, so the id has to break ties
+        session.add_all([
+            models.SecurityEvent(
+                id=f"event-{i:03d}",
+                agent_id="agent-1",
+                organization_id="org-1" if i % 4 else "org-2",
+                event_type="network",
+                severity=1,
+                timestamp=start + timedelta(seconds=i // 5)
+            )
+            for i in range(40)
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+async def _pages(db, limit):
+    query = select(models.SecurityEvent).where(models.SecurityEvent.organization_id == "org-1")
+    pages, after = [], None
+    while True:
+        response = Response()
+        events = (await db.execute(keyset_page(
+            query, models.SecurityEvent.timestamp, models.SecurityEvent.id, after, limit, descending=True
+        ))).scalars().all()
+        set_next_cursor(response, events, limit, "timestamp")
+        pages.append([event.id for event in events])
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return pages
+        after = cursor_param(response.headers[NEXT_CURSOR_HEADER])
+
+@pytest.mark.asyncio
+async def test_pages_cover_every_row_once_newest_first(db):
+    pages = await _pages(db, limit=7)
+    ids = [event_id for page in pages for event_id in page]
+
+    expected = sorted(
+        (f"event-{i:03d}" for i in range(40) if i % 4),
+        key=lambda event_id: (int(event_id[-3:]) // 5, event_id),
+        reverse=True
+    )
+    assert ids == expected
+    assert all(len(page) == 7 for page in pages[:-1])
+
+def test_cursors_round_trip_and_reject_garbage():
+    cursor = Cursor(datetime(2024, 1, 1, 12, 30, 0, 250000), "event-001")
+    assert Cursor.parse(str(cursor)) == cursor
+    for value in ("event-001", "yesterday,event-001"):
+        with pytest.raises(HTTPException) as excinfo:
+            cursor_param(value)
+        assert excinfo.value.status_code == 400
@@ -0,0 +1,72 @@
+import re
+from datetime import datetime
+from ....app.core.config import settings
+from ....app.db.partitioning import create_partitions, maintain, partition_start
+
+_CREATE = re.compile(
+    r"CREATE TABLE IF NOT EXISTS (\S+) PARTITION OF (\S+) FOR VALUES FROM \('([^']+)'\) TO \('([^']+)'\)"
+)
+_DROP = re.compile(r"DROP TABLE IF EXISTS (\S+)")
+
+class FakeCatalog:
+    """Answers the pg_inherits query and applies partition DDL, per parent table"""
+
+    def __init__(self):
+        self.partitions = {}  # name -> (parent, start, end)
+
+    def add(self, parent, start, end):
+        self.partitions[f"{parent}_p{start:%Y%m%d}"] = (parent, start, end)
+
+    def names(self, parent):
+        return sorted(name for name, (p, _, _) in self.partitions.items() if p == parent)
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        if sql.startswith("SELECT"):
+            return [
+                (name, f"FOR VALUES FROM ('{start}') TO ('{end}')")
+                for name, (parent, start, end) in self.partitions.items()
+                if parent == params["table"]
+            ]
+        created = _CREATE.match(sql)
+        if created:
+            name, parent, start, end = created.groups()
+            self.partitions[name] = (parent, datetime.fromisoformat(start), datetime.fromisoformat(end))
+            return None
+        self.partitions.pop(_DROP.match(sql).group(1))
+
+def test_weekly_partitions_start_on_monday():
+    assert partition_start(datetime(2024, 1, 11, 15, 30), "week") == datetime(2024, 1, 8)
+    assert partition_start(datetime(2024, 1, 11, 15, 30), "day") == datetime(2024, 1, 11)
+
+def test_new_partitions_fill_gaps_around_existing_ones():
+    catalog = FakeCatalog()
+    catalog.add("security_events", datetime(2024, 1, 8), datetime(2024, 1, 15))
+
+    created = create_partitions(catalog, "security_events", datetime(2024, 1, 6, 5), datetime(2024, 1, 17), "day")
+
+    assert created == [
+        "security_events_p20240106",
+        "security_events_p20240107",
+        "security_events_p20240115",
+        "security_events_p20240116"
+    ]
+    ranges = sorted((start, end) for _, start, end in catalog.partitions.values())
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+
+def test_maintenance_premakes_and_drops_expired_partitions(monkeypatch):
+    monkeypatch.setattr(settings, "PARTITION_INTERVAL", "day")
+    monkeypatch.setattr(settings, "PARTITION_PREMAKE", 2)
+    monkeypatch.setattr(settings, "METRICS_RETENTION_PERIOD", 3)
+    monkeypatch.setattr(settings, "ALERT_RETENTION_PERIOD", 5)
+    catalog = FakeCatalog()
+    for day in range(1, 11):
+        for table in ("security_events", "threat_events"):
+            catalog.add(table, datetime(2024, 1, day), datetime(2024, 1, day + 1))
+
+    summary = maintain(catalog, now=datetime(2024, 1, 10, 12))
+
+    assert summary["security_events"]["created"] == ["security_events_p20240111", "security_events_p20240112"]
+    # Only partitions that ended before the cutoff go; Jan 7 still holds rows inside it
+    assert catalog.names("security_events")[0] == "security_events_p20240107"
+    assert catalog.names("threat_events")[0] == "threat_events_p20240105"
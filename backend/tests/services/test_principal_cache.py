@@ -0,0 +1,102 @@
+import pytest
+from types import SimpleNamespace
+from jose import jwt
+from ....app.core.cache import CacheManager
+from ....app.core.config import settings
+from ....app.core.principal import Principal, PrincipalCache
+from ....app.core.security import create_access_token
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def principals():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = CacheManager(redis_url="redis://unused", max_bytes=1024 * 1024, local_ttl=60, default_ttl=60)
+    cache._redis = fakeredis.aioredis.FakeRedis()
+    return PrincipalCache(cache=cache, ttl=60, version_ttl=3600)
+
+@pytest.fixture
+def user():
+    return SimpleNamespace(
+        id="user-1",
+        organization_id="org-1",
+        is_superuser=False,
+        is_active=True,
+        email="analyst@example.com",
+        full_name="Analyst"
+    )
+
+def _loader(user):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return user
+
+    return load, calls
+
+def _claims(principals, user, version):
+    token = create_access_token(user.id, claims=principals.claims(user, version))
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+async def test_current_claims_resolve_without_loading_the_user(principals, user):
+    claims = _claims(principals, user, await principals.version(user.id))
+    load, calls = _loader(user)
+
+    principal = await principals.resolve(claims, load)
+
+    assert principal == Principal(id="user-1", organization_id="org-1", is_superuser=False)
+    assert claims["jti"]
+    assert not calls
+
+async def test_tokens_without_claims_load_the_user_once(principals, user):
+    load, calls = _loader(user)
+    claims = {"sub": user.id}
+
+    first = await principals.resolve(claims, load)
+    second = await principals.resolve(claims, load)
+
+    assert first == second == Principal.from_user(user)
+    assert len(calls) == 1
+
+async def test_invalidation_retires_claims_and_cached_principals(principals, user):
+    user.is_superuser = True
+    claims = _claims(principals, user, await principals.version(user.id))
+    await principals.resolve({"sub": user.id}, _loader(user)[0])
+
+    user.is_superuser = False
+    await principals.invalidate(user.id)
+    load, calls = _loader(user)
+
+    assert not (await principals.resolve(claims, load)).is_superuser
+    assert not (await principals.resolve({"sub": user.id}, load)).is_superuser
+    assert len(calls) == 1
+
+async def test_missing_users_are_not_cached(principals):
+    load, calls = _loader(None)
+
+    assert await principals.resolve({"sub": "gone"}, load) is None
+    assert await principals.resolve({"sub": "gone"}, load) is None
+    assert len(calls) == 2
+
+async def test_unknown_stamps_always_load_the_user(user):
+    class Unavailable:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    unavailable = CacheManager(redis_url="redis://unused", max_bytes=1024 * 1024, local_ttl=60, default_ttl=60)
+    unavailable._redis = Unavailable()
+    local_only = CacheManager(redis_url=None, max_bytes=1024 * 1024, local_ttl=60, default_ttl=60)
+
+    for cache in (unavailable, local_only):
+        principals = PrincipalCache(cache=cache, ttl=60, version_ttl=3600)
+        user.is_superuser = True
+        claims = _claims(principals, user, 0)
+        user.is_superuser = False
+        load, calls = _loader(user)
+
+        assert await principals.version(user.id) is None
+        assert principals.claims(user, None) == {}
+        assert not (await principals.resolve(claims, load)).is_superuser
+        assert not (await principals.resolve(claims, load)).is_superuser
+        assert len(calls) == 2
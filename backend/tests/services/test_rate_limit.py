@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ....app.core.config import settings
+from ....app.core.rate_limit import InMemoryRateLimiter, RedisRateLimiter, _GCRA_SCRIPT
+from ....app.middleware.rate_limit import RateLimitMiddleware
+
+def test_gcra_allows_burst_then_spaces_requests():
+    limiter = InMemoryRateLimiter()
+    results = [limiter.hit_sync("client", limit=60, period=60.0, now=0.0) for _ in range(61)]
+
+    assert all(result.allowed for result in results[:60])
+    assert [result.remaining for result in results[:3]] == [59, 58, 57]
+    assert not results[60].allowed
+    assert results[60].retry_after == pytest.approx(1.0)
+
+    # One emission interval later exactly one more request fits
+    assert limiter.hit_sync("client", limit=60, period=60.0, now=1.0).allowed
+    assert not limiter.hit_sync("client", limit=60, period=60.0, now=1.0).allowed
+
+def test_expired_clients_are_evicted():
+    limiter = InMemoryRateLimiter()
+    for i in range(1000):
+        limiter.hit_sync(f"client-{i}", limit=10, period=60.0, now=float(i))
+    # Each key's TAT is 6s after its request, so only recent clients are kept
+    assert len(limiter) <= 7
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_local_limits():
+    limiter = RedisRateLimiter("redis://unused")
+
+    async def unavailable(keys, args):
+        raise ConnectionError("redis down")
+
+    limiter._script = unavailable
+    results = [await limiter.hit("client", limit=2) for _ in range(3)]
+    assert [result.allowed for result in results] == [True, True, False]
+
+@pytest.mark.asyncio
+async def test_redis_script_is_shared_gcra():
+    fakeredis = pytest.importorskip("fakeredis", reason="needs fakeredis[lua] to run the script")
+    redis = fakeredis.aioredis.FakeRedis()
+    workers = [RedisRateLimiter("redis://unused") for _ in range(2)]
+    for worker in workers:
+        worker._redis = redis
+        worker._script = redis.register_script(_GCRA_SCRIPT)
+
+    results = [await workers[i % 2].hit("client", limit=5) for i in range(6)]
+    assert [result.allowed for result in results] == [True] * 5 + [False]
+    assert [result.remaining for result in results[:5]] == [4, 3, 2, 1, 0]
+    assert 0 < results[5].retry_after <= 12
+    assert 0 < await redis.pttl("ratelimit:client") <= 60000
+
+def test_middleware_applies_route_limits_and_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 3)
+    monkeypatch.setattr(settings, "ML_RATE_LIMIT_PER_MINUTE", 1)
+    monkeypatch.setattr(settings, "ML_RATE_LIMIT_PATHS", ["/api/v1/zero-day"])
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=InMemoryRateLimiter())
+
+    @app.get("/api/v1/zero-day/detect")
+    def detect():
+        return {}
+
+    @app.get("/api/v1/agents")
+    def agents():
+        return {}
+
+    client = TestClient(app)
+    assert client.get("/api/v1/zero-day/detect").status_code == 200
+    limited = client.get("/api/v1/zero-day/detect")
+    assert limited.status_code == 429
+    assert limited.json() == {"detail": "Too many requests"}
+    assert int(limited.headers["Retry-After"]) >= 59
+
+    responses = [client.get("/api/v1/agents") for _ in range(4)]
+    assert [r.status_code for r in responses] == [200, 200, 200, 429]
+    assert responses[0].headers["X-RateLimit-Remaining"] == "2"
@@ -0,0 +1,231 @@
+import pytest
+import httpx
+from fastapi import FastAPI, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from ....app.core.config import settings
+from ....app.core.response_cache import ALL_ORGANIZATIONS, CachedResponse, ResponseCache
+from ....app.middleware.cache import CacheMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+def _app(cache):
+    app = FastAPI()
+
+    async def authenticate(request: Request):
+        # Stands in for deps.authenticate_cache_scope
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        if token in app.state.revoked:
+            return None
+        return app.state.moved.get(token, token)
+
+    app.add_middleware(CacheMiddleware, cache=cache, authenticate=authenticate)
+    app.state.agents = {"a": ["agent-1"], "b": ["agent-2"]}
+    app.state.calls = 0
+    app.state.revoked = set()
+    app.state.moved = {}
+
+    def scope(request: Request, authorization: str) -> str:
+        # Stands in for deps.get_current_user; the token names the organization
+        organization = authorization.removeprefix("Bearer ")
+        request.state.cache_scope = organization
+        return organization
+
+    @app.get("/api/v1/agents")
+    def get_agents(request: Request, authorization: str = Header()):
+        organization = scope(request, authorization)
+        app.state.calls += 1
+        if organization == ALL_ORGANIZATIONS:
+            return sorted(sum(app.state.agents.values(), []))
+        return app.state.agents[organization]
+
+    @app.post("/api/v1/agents")
+    def register_agent(request: Request, name: str, organization: str, authorization: str = Header()):
+        scope(request, authorization)
+        app.state.agents[organization].append(name)
+        return {"name": name}
+
+    @app.get("/api/v1/events")
+    def get_events(request: Request, authorization: str = Header()):
+        scope(request, authorization)
+        app.state.calls += 1
+        return StreamingResponse(
+            (f'{{"event": {i}}}\n' for i in range(3)),
+            media_type="application/x-ndjson"
+        )
+
+    return app
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache("redis://unused", ttl=60)
+    cache._redis = fakeredis.aioredis.FakeRedis()
+    return cache
+
+def _as(organization):
+    return {"Authorization": f"Bearer {organization}"}
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+async def test_hits_are_served_from_redis_with_etag(cache):
+    app = _app(cache)
+    async with _client(app) as client:
+        first = await client.get("/api/v1/agents", headers=_as("a"))
+        second = await client.get("/api/v1/agents", headers=_as("a"))
+
+        assert first.json() == second.json() == ["agent-1"]
+        assert app.state.calls == 1
+        assert first.headers["ETag"] == second.headers["ETag"]
+        assert second.headers["content-type"] == "application/json"
+
+        revalidated = await client.get(
+            "/api/v1/agents",
+            headers={**_as("a"), "If-None-Match": f'W/{first.headers["ETag"]}'}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["ETag"] == first.headers["ETag"]
+
+async def test_hits_require_current_credentials_and_scope(cache):
+    app = _app(cache)
+    async with _client(app) as client:
+        await client.get("/api/v1/agents", headers=_as("a"))
+
+        # A revoked or deactivated caller's token no longer reaches the cache
+        app.state.revoked.add("a")
+        await client.get("/api/v1/agents", headers=_as("a"))
+        assert app.state.calls == 2
+
+        # Nor does one whose scope changed since the entry was stored
+        app.state.revoked.clear()
+        app.state.moved["a"] = "b"
+        await client.get("/api/v1/agents", headers=_as("a"))
+        assert app.state.calls == 3
+
+async def test_writes_invalidate_their_organization_only(cache):
+    app = _app(cache)
+    async with _client(app) as client:
+        for organization in ("a", "b", ALL_ORGANIZATIONS):
+            await client.get("/api/v1/agents", headers=_as(organization))
+        assert app.state.calls == 3
+
+        await client.post(
+            "/api/v1/agents", params={"name": "agent-3", "organization": "a"}, headers=_as("a")
+        )
+
+        assert (await client.get("/api/v1/agents", headers=_as("a"))).json() == ["agent-1", "agent-3"]
+        assert (await client.get("/api/v1/agents", headers=_as("b"))).json() == ["agent-2"]
+        assert (await client.get("/api/v1/agents", headers=_as(ALL_ORGANIZATIONS))).json() == [
+            "agent-1", "agent-2", "agent-3"
+        ]
+        # Organization b was still cached; a and the superuser view were not
+        assert app.state.calls == 5
+
+        # A superuser's write may touch any organization
+        await client.post(
+            "/api/v1/agents", params={"name": "agent-4", "organization": "b"}, headers=_as(ALL_ORGANIZATIONS)
+        )
+        await client.get("/api/v1/agents", headers=_as("b"))
+        assert app.state.calls == 6
+
+async def test_streaming_responses_are_cached(cache):
+    app = _app(cache)
+    async with _client(app) as client:
+        first = await client.get("/api/v1/events", headers=_as("a"))
+        second = await client.get("/api/v1/events", headers=_as("a"))
+
+    assert first.text == second.text == '{"event": 0}\n{"event": 1}\n{"event": 2}\n'
+    assert second.headers["content-type"] == "application/x-ndjson"
+    assert app.state.calls == 1
+
+async def test_oversized_responses_stream_through_uncached(cache, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_MAX_BYTES", 16)
+    app = _app(cache)
+    async with _client(app) as client:
+        responses = [await client.get("/api/v1/events", headers=_as("a")) for _ in range(2)]
+
+    assert responses[0].text == responses[1].text == '{"event": 0}\n{"event": 1}\n{"event": 2}\n'
+    assert "ETag" not in responses[0].headers
+    assert app.state.calls == 2
+
+async def test_repeated_headers_are_kept(cache, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_MAX_BYTES", 16)
+    app = _app(cache)
+
+    def with_cookies(response):
+        response.set_cookie("session", "1")
+        response.set_cookie("region", "eu")
+        return response
+
+    @app.get("/api/v1/events/small")
+    def get_small():
+        return with_cookies(StreamingResponse(iter([b"[]"])))
+
+    @app.get("/api/v1/events/large")
+    def get_large():
+        return with_cookies(StreamingResponse(iter([b"x" * 32])))
+
+    async with _client(app) as client:
+        buffered = await client.get("/api/v1/events/small", headers=_as("a"))
+        streamed = await client.get("/api/v1/events/large", headers=_as("a"))
+
+    for response in (buffered, streamed):
+        assert len(response.headers.get_list("set-cookie")) == 2
+
+async def test_write_during_render_is_not_cached(cache):
+    _, generation = await cache.lookup("key")
+    await cache.invalidate("a")
+    assert not await cache.store("key", "a", CachedResponse.from_body(b"[]", None), generation)
+    assert (await cache.lookup("key"))[0] is None
+
+async def test_pagination_cursor_is_replayed_on_hits(cache):
+    app = _app(cache)
+
+    @app.get("/api/v1/organizations")
+    def get_organizations(request: Request, response: Response, authorization: str = Header()):
+        request.state.cache_scope = authorization.removeprefix("Bearer ")
+        app.state.calls += 1
+        response.headers["X-Next-Cursor"] = "2024-01-01T00:00:00,org-2"
+        return ["org-1", "org-2"]
+
+    async with _client(app) as client:
+        first = await client.get("/api/v1/organizations", headers=_as("a"))
+        second = await client.get("/api/v1/organizations", headers=_as("a"))
+
+    assert first.headers["X-Next-Cursor"] == second.headers["X-Next-Cursor"] == "2024-01-01T00:00:00,org-2"
+    assert app.state.calls == 1
+
+async def test_paths_sharing_a_prefix_are_not_cached(cache):
+    app = _app(cache)
+
+    @app.get("/api/v1/agents-export")
+    def export_agents(request: Request, authorization: str = Header()):
+        request.state.cache_scope = authorization.removeprefix("Bearer ")
+        app.state.calls += 1
+        return []
+
+    async with _client(app) as client:
+        responses = [await client.get("/api/v1/agents-export", headers=_as("a")) for _ in range(2)]
+
+    assert "ETag" not in responses[1].headers
+    assert app.state.calls == 2
+
+async def test_redis_outage_passes_requests_through():
+    cache = ResponseCache("redis://unused", ttl=60)
+
+    class Unavailable:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    cache._redis = Unavailable()
+    app = _app(cache)
+    async with _client(app) as client:
+        responses = [await client.get("/api/v1/agents", headers=_as("a")) for _ in range(2)]
+        await client.post(
+            "/api/v1/agents", params={"name": "agent-3", "organization": "a"}, headers=_as("a")
+        )
+
+    assert [response.json() for response in responses] == [["agent-1"], ["agent-1"]]
+    assert app.state.calls == 2
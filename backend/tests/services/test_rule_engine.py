@@ -0,0 +1,302 @@
+import asyncio
+import os
+import pytest
+import pandas as pd
+import yaml
+from datetime import datetime
+from ....app.services.action_queue import ActionQueue
+from ....app.services.rule_engine import RuleEngine
+from ....app.services.rule_profiler import RuleProfiler
+from ....app.services.rule_set import RuleSet
+from ....app.schemas.schemas import Rule, SecurityEvent
+
+pytestmark = pytest.mark.asyncio
+
+def _rule(rule_id, conditions, logic="AND"):
+    return Rule(
+        id=rule_id,
+        name=rule_id,
+        severity="high",
+        conditions=conditions,
+        actions=[],
+        logic=logic
+    )
+
+async def _engine(*rules):
+    engine = RuleEngine()
+    await engine.add_rules(list(rules))
+    return engine
+
+def _event(**raw_data):
+    return SecurityEvent(
+        id="evt-1",
+        agent_id="agent-1",
+        timestamp=datetime(2024, 1, 1),
+        is_resolved=False,
+        event_type=raw_data.pop("event_type", "network"),
+        severity=2,
+        description="",
+        raw_data=raw_data
+    )
+
+async def test_compiled_operators_and_nested_groups():
+    engine = await _engine(
+        _rule("ssh_bruteforce", [
+            {"field": "raw_data.port", "operator": "equals", "value": 22},
+            {"field": "raw_data.failed_logins", "operator": "greater_than", "value": 5},
+            {"any": [
+                {"field": "raw_data.user", "operator": "in", "value": ["root", "admin"]},
+                {"field": "raw_data.command", "operator": "matches", "value": "sudo "}
+            ]}
+        ])
+    )
+
+    matches = await engine.evaluate_event(_event(port=22, failed_logins=9, user="root"))
+    assert [m.rule_id for m in matches] == ["ssh_bruteforce"]
+    assert len(matches[0].matched_conditions) == 3
+    assert "predicate" not in matches[0].matched_conditions[0]
+
+    assert await engine.evaluate_event(_event(port=22, failed_logins=9, user="bob")) == []
+    # Missing or mistyped fields simply do not match
+    assert await engine.evaluate_event(_event(port=22, failed_logins="many", user="root")) == []
+
+async def test_conditions_short_circuit():
+    engine = await _engine(_rule("r", [
+        {"field": "event_type", "operator": "equals", "value": "process"},
+        {"field": "raw_data.cmd", "operator": "matches", "value": "x"}
+    ]))
+    evaluated = []
+
+    class Command:
+        def __str__(self):
+            evaluated.append(1)
+            return "x"
+
+    predicate = engine.compiled_rules["r"]["predicate"]
+    assert not predicate({"event_type": "network", "raw_data": {"cmd": Command()}})
+    assert evaluated == []
+    assert predicate({"event_type": "process", "raw_data": {"cmd": Command()}})
+    assert evaluated == [1]
+
+async def test_index_limits_candidates():
+    rules = [
+        _rule(f"port_{port}", [
+            {"field": "raw_data.port", "operator": "equals", "value": port},
+            {"field": "raw_data.bytes", "operator": "greater_than", "value": 0}
+        ])
+        for port in range(1000)
+    ]
+    rules.append(_rule("any_port", [{"field": "raw_data.bytes", "operator": "greater_than", "value": 10**6}]))
+    rules.append(_rule("web", [
+        {"field": "raw_data.port", "operator": "equals", "value": 80},
+        {"field": "raw_data.port", "operator": "equals", "value": 443}
+    ], logic="OR"))
+    engine = await _engine(*rules)
+
+    event = _event(port=443, bytes=10)
+    candidates = engine.ruleset.candidate_rules(engine._event_to_dict(event))
+    assert candidates == ["port_443", "any_port", "web"]
+
+    matches = await engine.evaluate_event(event)
+    assert [m.rule_id for m in matches] == ["port_443", "web"]
+
+async def test_index_prefers_rarest_key():
+    engine = await _engine(
+        _rule("a", [
+            {"field": "event_type", "operator": "equals", "value": "network"},
+            {"field": "raw_data.proto", "operator": "equals", "value": "gre"}
+        ]),
+        _rule("b", [{"field": "event_type", "operator": "equals", "value": "network"}])
+    )
+    assert engine.ruleset.index["raw_data.proto"] == {"gre": ["a"]}
+    assert engine.ruleset.index["event_type"] == {"network": ["b"]}
+
+async def test_invalid_operator_rejected():
+    with pytest.raises(ValueError):
+        await _engine(_rule("bad", [{"field": "x", "operator": "roughly", "value": 1}]))
+
+async def test_empty_contains_rejected():
+    with pytest.raises(ValueError):
+        await _engine(_rule("bad", [{"field": "description", "operator": "contains", "value": ""}]))
+
+async def test_string_rules_share_one_scan_per_field():
+    domains = [f"bad{i}.example" for i in range(300)]
+    rules = [
+        _rule(f"ioc_{i}", [{"field": "raw_data.url", "operator": "contains", "value": domain}])
+        for i, domain in enumerate(domains)
+    ]
+    rules.append(_rule("encoded_ps", [
+        {"field": "raw_data.cmd", "operator": "matches", "value": r"powershell .*-enc"}
+    ]))
+    rules.append(_rule("tagged", [
+        {"field": "raw_data.tags", "operator": "contains", "value": "bad7.example"}
+    ]))
+    engine = await _engine(*rules)
+
+    event = _event(url="http://bad7.example/bad42.example", cmd="powershell -nop -enc AAAA")
+    matches = await engine.evaluate_event(event)
+    assert [m.rule_id for m in matches] == ["ioc_7", "ioc_42", "encoded_ps"]
+
+    scans = []
+    original = engine.ruleset.matchers["raw_data.url"].match_literals
+    engine.ruleset.matchers["raw_data.url"].match_literals = lambda text: scans.append(text) or original(text)
+    await engine.evaluate_event(event)
+    assert len(scans) == 1
+
+    # contains on a list is a membership test, not a substring scan
+    matches = await engine.evaluate_event(_event(tags=["bad7.example"]))
+    assert [m.rule_id for m in matches] == ["tagged"]
+
+async def test_batch_evaluation_matches_per_event_evaluation():
+    engine = await _engine(
+        _rule("ssh", [
+            {"field": "raw_data.port", "operator": "equals", "value": 22},
+            {"field": "raw_data.failed_logins", "operator": "greater_than", "value": 5}
+        ]),
+        _rule("admins", [
+            {"field": "raw_data.user", "operator": "in", "value": ["root", "admin"]},
+            {"field": "raw_data.port", "operator": "not_equals", "value": 22}
+        ]),
+        _rule("ioc", [
+            {"field": "raw_data.url", "operator": "contains", "value": "bad.example"},
+            {"field": "raw_data.cmd", "operator": "matches", "value": r"powershell .*-enc"}
+        ], logic="OR"),
+        _rule("quiet", [
+            {"any": [
+                {"field": "raw_data.failed_logins", "operator": "less_than", "value": 1},
+                {"field": "raw_data.missing", "operator": "equals", "value": None}
+            ]},
+            {"field": "event_type", "operator": "equals", "value": "network"}
+        ]),
+        _rule("tagged", [{"field": "raw_data.tags", "operator": "contains", "value": "bad.example"}])
+    )
+    events = [
+        _event(port=22, failed_logins=9, user="bob", url="http://ok.example"),
+        _event(port=443, failed_logins=0, user="root", url="http://bad.example/x"),
+        _event(port=22, user="admin", cmd="powershell -nop -enc AAAA", event_type="process"),
+        _event(failed_logins=3, tags=["bad.example"]),
+        _event(port=8080, failed_logins="n/a", tags="not-bad.example")
+    ]
+
+    df = pd.json_normalize([event.model_dump() for event in events])
+    matrix, rule_ids = engine.evaluate_batch(df)
+
+    assert matrix.shape == (len(events), len(rule_ids))
+    for i, event in enumerate(events):
+        expected = {m.rule_id for m in await engine.evaluate_event(event)}
+        assert {rule_ids[j] for j in matrix[i].indices} == expected
+
+    matrix, rule_ids = engine.evaluate_batch(df, rule_ids=["ioc"])
+    assert rule_ids == ["ioc"]
+    assert matrix.nonzero()[0].tolist() == [1, 2]
+
+def _write_rules(path, port):
+    path.write_text(yaml.safe_dump([{
+        "id": "ssh",
+        "name": "ssh",
+        "severity": "high",
+        "conditions": [
+            {"field": "raw_data.port", "operator": "equals", "value": port},
+            {"field": "raw_data.cmd", "operator": "matches", "value": "sudo "}
+        ]
+    }]))
+
+async def test_reload_swaps_whole_rule_sets(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    _write_rules(rules_path, 22)
+    engine = RuleEngine(cache_dir=str(tmp_path / "cache"))
+
+    assert await engine.load_rules(str(rules_path))
+    first = engine.ruleset
+    assert not await engine.reload_rules()
+    assert engine.ruleset is first
+
+    _write_rules(rules_path, 2222)
+    assert await engine.reload_rules()
+    assert engine.ruleset.content_hash != first.content_hash
+    assert [m.rule_id for m in await engine.evaluate_event(_event(port=2222, cmd="sudo su"))] == ["ssh"]
+    assert await engine.evaluate_event(_event(port=22, cmd="sudo su")) == []
+
+    # Snapshots are never modified once built
+    assert first.rules["ssh"].conditions[0]["value"] == 22
+
+    rules_path.write_text("- id: broken\n")
+    with pytest.raises(Exception):
+        await engine.reload_rules()
+    assert engine.ruleset.rules["ssh"].conditions[0]["value"] == 2222
+
+async def test_unchanged_rules_load_from_disk_cache(tmp_path, monkeypatch):
+    rules_path = tmp_path / "rules.yaml"
+    _write_rules(rules_path, 22)
+    cache_dir = tmp_path / "cache"
+    await RuleEngine(cache_dir=str(cache_dir)).load_rules(str(rules_path))
+    assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    def no_rebuild(self):
+        raise AssertionError("index rebuilt despite cached compilation")
+
+    engine = RuleEngine(cache_dir=str(cache_dir))
+    monkeypatch.setattr(RuleSet, "_build_index", no_rebuild)
+    await engine.load_rules(str(rules_path))
+    assert [m.rule_id for m in await engine.evaluate_event(_event(port=22, cmd="sudo -i"))] == ["ssh"]
+
+async def test_added_rules_survive_a_concurrent_recompile():
+    engine = await _engine(_rule("ssh", [{"field": "raw_data.port", "operator": "equals", "value": 22}]))
+
+    await asyncio.gather(
+        engine.optimize_rules(),
+        engine.add_rule(_rule("rdp", [{"field": "raw_data.port", "operator": "equals", "value": 3389}]))
+    )
+
+    assert set(engine.rules) == {"ssh", "rdp"}
+
+async def test_watcher_reloads_changed_rule_file(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    _write_rules(rules_path, 22)
+    engine = RuleEngine(actions=ActionQueue(10, 1, 60.0, 5.0), cache_dir=None)
+    await engine.load_rules(str(rules_path))
+    first_hash = engine.ruleset.content_hash
+
+    engine.watch_rules(interval=0.01)
+    _write_rules(rules_path, 8022)
+    os.utime(rules_path, ns=(0, 1))  # Guarantee a new mtime on coarse filesystems
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if engine.ruleset.content_hash != first_hash:
+            break
+    await engine.close()
+
+    assert engine.ruleset.rules["ssh"].conditions[0]["value"] == 8022
+
+async def test_profiler_tracks_rules_and_reorders_conditions_by_cost():
+    profiler = RuleProfiler(sample_rate=1.0, min_samples=50)
+    engine = RuleEngine(cache_dir=None, profiler=profiler)
+    await engine.add_rule(_rule("exfil", [
+        {"field": "raw_data.user", "operator": "not_equals", "value": "backup"},
+        {"field": "raw_data.bytes", "operator": "greater_than", "value": 10**6}
+    ]))
+
+    async def evaluate(n):
+        matched = 0
+        for i in range(n):
+            big = i % 10 == 0
+            matches = await engine.evaluate_event(_event(user="alice", bytes=10**7 if big else 10))
+            matched += len(matches)
+        return matched
+
+    assert await evaluate(200) == 20
+    [stats] = engine.rule_stats()
+    assert (stats["evaluations"], stats["matches"], stats["profiled_evaluations"]) == (200, 20, 200)
+    assert stats["p99_time"] > 0
+    assert {c["condition"]: c["pass_rate"] for c in stats["conditions"]} == {"0": 1.0, "1": 0.1}
+
+    # The rarely passing size check now runs first and short-circuits the user check
+    assert await engine.optimize_rules()
+    assert engine.ruleset.cost_ordered
+    user_check = next(c for c in profiler.conditions.values() if c.label == "0")
+    before = user_check.count
+    assert await evaluate(100) == 10
+    assert user_check.count - before == 10
+
+    matches = await engine.evaluate_event(_event(user="alice", bytes=10**7))
+    assert [c["field"] for c in matches[0].matched_conditions] == ["raw_data.user", "raw_data.bytes"]
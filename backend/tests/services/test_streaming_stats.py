@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+from sklearn.preprocessing import RobustScaler
+from ....app.services.ml.streaming_stats import RunningMoments, TDigest, StreamingRobustScaler
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return np.column_stack([
+        rng.normal(10, 2, 20000),
+        rng.exponential(100, 20000),
+        np.full(20000, 3.0)
+    ])
+
+def test_running_moments_match_numpy(data):
+    moments = RunningMoments()
+    for chunk in np.array_split(data, 7):
+        moments.update(chunk)
+
+    assert moments.count == len(data)
+    assert np.allclose(moments.mean, data.mean(axis=0))
+    assert np.allclose(moments.variance, data.var(axis=0))
+
+def test_tdigest_quantiles(data):
+    digest = TDigest()
+    for chunk in np.array_split(data[:, 1], 20):
+        digest.update(chunk)
+
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(data[:, 1], q), rel=0.02)
+    assert len(digest.means) <= 2 * digest.compression
+
+def test_scaler_is_independent_of_arrival_order(data):
+    forward = StreamingRobustScaler()
+    backward = StreamingRobustScaler()
+    for chunk in np.array_split(data, 10):
+        forward.partial_fit(chunk)
+    for chunk in reversed(np.array_split(data, 10)):
+        backward.partial_fit(chunk)
+
+    reference = RobustScaler().fit(data)
+    assert np.allclose(forward.center_, reference.center_, rtol=0.01)
+    assert np.allclose(forward.scale_, reference.scale_, rtol=0.02)
+    assert np.allclose(forward.center_, backward.center_, rtol=0.01)
+
+def test_scalers_merge_across_workers(data):
+    workers = [StreamingRobustScaler().fit(chunk) for chunk in np.array_split(data, 4)]
+    merged = StreamingRobustScaler()
+    for worker in workers:
+        merged.merge(worker)
+
+    single = StreamingRobustScaler().fit(data)
+    assert merged.n_samples_seen_ == len(data)
+    assert np.allclose(merged.var_, single.var_)
+    assert np.allclose(merged.center_, single.center_, rtol=0.01)
+    assert np.allclose(merged.transform(data[:5]), single.transform(data[:5]), atol=0.05)
+
+def test_unfitted_scaler_raises():
+    with pytest.raises(ValueError):
+        StreamingRobustScaler().transform(np.zeros((1, 3)))
@@ -103,6 +103,15 @@ async def test_model_persistence(zero_day_detector, sample_normal_data):
     assert isinstance(result, dict)
     assert "is_zero_day" in result
 
+async def test_threshold_is_fitted_and_persisted(zero_day_detector, sample_normal_data):
+    """The decision threshold comes from training traffic and is saved with the models"""
+    await zero_day_detector.train(sample_normal_data)
+    batch = zero_day_detector.detect_zero_day_batch(sample_normal_data)
+    assert batch["is_zero_day"].mean() <= settings.MAX_FALSE_POSITIVE_RATE
+    
+    zero_day_detector.save()
+    assert ZeroDayDetector().threshold == zero_day_detector.threshold
+
 async def test_detection_performance(
     zero_day_detector,
     sample_normal_data,
@@ -171,4 +180,32 @@ async def test_detection_details(zero_day_detector, sample_normal_data):
     assert "reconstruction_analysis" in result["details"]
     assert "autoencoder_diff" in result["details"]["reconstruction_analysis"]
     assert "pca_diff" in result["details"]["reconstruction_analysis"]
-    assert isinstance(result["details"]["timestamp"], str) 
\ No newline at end of file
+    assert isinstance(result["details"]["timestamp"], str)
+
+async def test_batch_scores_are_row_independent(
+    zero_day_detector,
+    sample_normal_data,
+    sample_anomalous_data
+):
+    """A row's score must not depend on the other rows in its batch"""
+    await zero_day_detector.train(sample_normal_data)
+    
+    alone = zero_day_detector.detect_zero_day_batch(sample_normal_data[:5])
+    mixed = zero_day_detector.detect_zero_day_batch(
+        np.vstack([sample_normal_data[:5], sample_anomalous_data])
+    )
+    
+    np.testing.assert_allclose(alone["scores"], mixed["scores"][:5])
+    np.testing.assert_array_equal(alone["is_zero_day"], mixed["is_zero_day"][:5])
+
+async def test_batch_outputs_are_per_row(zero_day_detector, sample_normal_data):
+    """Batch scoring returns one score, verdict and attribution row per event"""
+    await zero_day_detector.train(sample_normal_data)
+    
+    batch = zero_day_detector.detect_zero_day_batch(sample_normal_data)
+    n_rows = len(sample_normal_data)
+    
+    assert batch["scores"].shape == (n_rows,)
+    assert batch["is_zero_day"].shape == (n_rows,)
+    assert batch["feature_attributions"].shape == (n_rows, settings.FEATURE_DIMENSION)
+    np.testing.assert_allclose(batch["feature_attributions"].sum(axis=1), 1.0)